@@ -0,0 +1,130 @@
+"""Micro-benchmark for include injection in PCO.iterate().
+
+Generates synthetic pages shaped like a People query with several includes and
+compares the (type, id) index used by iterate() against a linear scan of the
+"included" node for each relationship.
+
+Usage: `python -m benchmarks.bench_iterate_includes`
+"""
+
+import sys
+import timeit
+from unittest.mock import patch
+
+sys.path.append('.')
+
+from pypco import PCO  # pylint: disable=wrong-import-position
+
+INCLUDE_TYPES = ('Email', 'PhoneNumber', 'Address', 'Household')
+
+
+def generate_page(per_page, includes_per_type):
+    """Generate a synthetic page of people with associated includes.
+
+    Args:
+        per_page (int): The number of people on the page.
+        includes_per_type (int): The number of included objects of each type per person.
+
+    Returns:
+        dict: A page shaped like a PCO API list response.
+    """
+
+    data = []
+    included = []
+
+    for person_ndx in range(per_page):
+        relationships = {}
+
+        for include_type in INCLUDE_TYPES:
+            related = []
+
+            for include_ndx in range(includes_per_type):
+                include_id = f'{person_ndx}-{include_ndx}'
+                related.append({'type': include_type, 'id': include_id})
+                included.append({
+                    'type': include_type,
+                    'id': include_id,
+                    'attributes': {},
+                })
+
+            relationships[include_type.lower()] = {'data': related}
+
+        data.append({
+            'type': 'Person',
+            'id': str(person_ndx),
+            'attributes': {},
+            'relationships': relationships,
+        })
+
+    return {
+        'data': data,
+        'included': included,
+        'meta': {'can_include': [], 'parent': {}},
+        'links': {},
+    }
+
+
+def linear_scan(page):
+    """Resolve includes by scanning the included node for every relationship.
+
+    This mirrors the approach used by iterate() before includes were indexed.
+
+    Args:
+        page (dict): A page as generated by generate_page().
+
+    Returns:
+        int: The number of includes resolved.
+    """
+
+    resolved = 0
+
+    for cur in page['data']:
+        for key in cur['relationships']:
+            for relationship in cur['relationships'][key]['data']:
+                for include in page['included']:
+                    if include['type'] == relationship['type'] and \
+                            include['id'] == relationship['id']:
+                        resolved += 1
+
+    return resolved
+
+
+def indexed(pco, page):
+    """Resolve includes with PCO.iterate().
+
+    Args:
+        pco (PCO): The PCO object to use.
+        page (dict): A page as generated by generate_page().
+
+    Returns:
+        int: The number of includes resolved.
+    """
+
+    with patch.object(pco, 'get', return_value=page):
+        return sum(len(record['included']) for record in pco.iterate('/people/v2/people'))
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+
+    pco = PCO('app_id', 'secret')
+
+    print(f"{'per_page':>8} {'incl/type':>9} {'included':>8} "
+          f"{'linear (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+
+    for per_page in (25, 50, 100):
+        for includes_per_type in (1, 2, 4):
+            page = generate_page(per_page, includes_per_type)
+
+            assert linear_scan(page) == indexed(pco, page)
+
+            runs = 5
+            linear_ms = timeit.timeit(lambda: linear_scan(page), number=runs) / runs * 1000
+            indexed_ms = timeit.timeit(lambda: indexed(pco, page), number=runs) / runs * 1000
+
+            print(f'{per_page:>8} {includes_per_type:>9} {len(page["included"]):>8} '
+                  f'{linear_ms:>12.2f} {indexed_ms:>13.2f} {linear_ms / indexed_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
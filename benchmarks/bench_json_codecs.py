@@ -0,0 +1,74 @@
+"""Micro-benchmark of the JSON codecs available to PCO objects.
+
+Fetches a page of 100 people with their emails, phone numbers, and addresses from
+pypco.testing.FakePCOServer, then times decoding it and encoding a write payload with
+every installed codec (see pypco.codec.available_codecs()). Install orjson and/or
+msgspec to compare them against the json module.
+
+Usage: `python -m benchmarks.bench_json_codecs`
+"""
+
+import sys
+import timeit
+
+import requests
+
+sys.path.append('.')
+
+from pypco import PCO  # pylint: disable=wrong-import-position
+from pypco.codec import available_codecs  # pylint: disable=wrong-import-position
+from pypco.testing import FakePCOServer  # pylint: disable=wrong-import-position
+
+
+def fetch_page():
+    """Fetch a page of people with includes from a fake PCO API.
+
+    Returns:
+        bytes: The response body.
+    """
+
+    with FakePCOServer(records=100) as server:
+        response = requests.get(
+            f'{server.url}/people/v2/people',
+            params={'per_page': '100', 'include': 'emails,phone_numbers,addresses'},
+            auth=('app_id', 'secret'),
+        )
+        response.raise_for_status()
+
+        return response.content
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+
+    page = fetch_page()
+    payload = PCO.template('Person', {
+        'first_name': 'Ada', 'last_name': 'Lovelace', 'birthdate': '1815-12-10',
+        'gender': 'F', 'status': 'active', 'remote_id': 1815, 'child': False,
+    })
+
+    print(f'Page: {len(page) / 1024:.0f} KiB\n')
+    print(f"{'codec':<8} {'decode (ms)':>12} {'decode MB/s':>12} {'speedup':>8} "
+          f"{'encode (us)':>12} {'speedup':>8}")
+
+    baseline = None
+
+    for codec in available_codecs()[::-1]:
+        assert codec.decode(page)['meta']['total_count'] == 100
+        assert codec.decode(codec.encode(payload)) == payload
+
+        runs = 200
+        decode_ms = timeit.timeit(lambda: codec.decode(page), number=runs) / runs * 1000
+        runs = 20000
+        encode_us = timeit.timeit(lambda: codec.encode(payload), number=runs) / runs * 1e6
+
+        if baseline is None:
+            baseline = (decode_ms, encode_us)
+
+        print(f'{codec.name:<8} {decode_ms:>12.3f} {len(page) / decode_ms / 1000:>12.1f} '
+              f'{baseline[0] / decode_ms:>7.1f}x {encode_us:>12.2f} '
+              f'{baseline[1] / encode_us:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""End-to-end benchmarks of the PCO request pipeline against a local fake PCO API.
+
+Drives PCO.get(), iterate() (with and without includes, and as record views),
+iterate_pages(), post_many(), and upload_many() against pypco.testing.FakePCOServer
+and reports, for each benchmark:
+
+- requests/sec and records/sec
+- client CPU time per request (the server runs in its own process, so this is the
+  time spent in pypco, requests, and urllib3)
+- per-request overhead of PCO.get() over a bare requests.Session (get only)
+- peak RSS of the benchmark process (each benchmark runs in a fresh process)
+- allocations: the peak memory traced by tracemalloc during a second, traced pass,
+  and the number of memory blocks still allocated after it (which grows with leaks)
+
+Results are appended to benchmarks/history.jsonl, along with the git commit and
+Python version, and compared with the last comparable run (same Python version and
+sizes), flagging metrics that got worse by more than --threshold percent. The history
+is specific to the machine the benchmarks run on, so it isn't version controlled.
+
+Usage: `python -m benchmarks.bench_pipeline [--quick] [--fail-on-regression]`
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import requests
+
+sys.path.append('.')
+
+from pypco import PCO  # pylint: disable=wrong-import-position
+from pypco.testing import FakePCOServer  # pylint: disable=wrong-import-position
+
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.jsonl')
+
+INCLUDES = 'emails,phone_numbers,addresses'
+
+# Benchmark sizes: (default, --quick)
+SIZES = {
+    'get': (2000, 200),
+    'iterate': (10000, 1000),
+    'iterate_includes': (10000, 1000),
+    'iterate_views': (10000, 1000),
+    'iterate_pages': (10000, 1000),
+    'post_many': (1000, 100),
+    'upload_many': (200, 20),
+}
+
+UPLOAD_SIZE = 64 * 1024
+
+# Metrics where a higher value is better; for all others lower is better
+HIGHER_IS_BETTER = {'requests_per_sec', 'records_per_sec'}
+
+# Metrics compared against earlier runs
+COMPARED = (
+    'requests_per_sec', 'records_per_sec', 'cpu_ms_per_request', 'overhead_ms_per_request',
+    'peak_rss_kib', 'traced_peak_kib', 'retained_blocks',
+)
+
+
+def bench_get(pco, size):
+    """GET a single record size times, one request after the other."""
+
+    for _ in range(size):
+        pco.get('/people/v2/people/1')
+
+    return size, size
+
+
+def bench_iterate(pco, size, **params):
+    """Iterate over a collection of size records, 100 per page."""
+
+    records = sum(1 for _ in pco.iterate('/people/v2/people', per_page=100, **params))
+
+    return -(-size // 100), records
+
+
+def bench_iterate_includes(pco, size):
+    """Iterate over a collection of size records with three includes."""
+
+    return bench_iterate(pco, size, include=INCLUDES)
+
+
+def bench_iterate_views(pco, size):
+    """Iterate over a collection of size records with three includes, as record views."""
+
+    return bench_iterate(pco, size, include=INCLUDES, record_views=True)
+
+
+def bench_iterate_pages(pco, size):
+    """Iterate over the pages of a collection of size records with three includes."""
+
+    pages = records = 0
+
+    for page in pco.iterate_pages('/people/v2/people', per_page=100, include=INCLUDES):
+        pages += 1
+        records += len(page['data'])
+
+    return pages, records
+
+
+def bench_post_many(pco, size):
+    """POST size records with post_many() on 8 workers."""
+
+    payloads = (
+        ('/people/v2/lists', PCO.template('List', {'name': f'List {number}'}))
+        for number in range(size)
+    )
+    results = list(pco.post_many(payloads, max_workers=8))
+
+    assert all(result.error is None for result in results)
+
+    return size, size
+
+
+def bench_upload_many(pco, size):
+    """Upload size files of UPLOAD_SIZE bytes with upload_many() on 4 workers."""
+
+    content = os.urandom(UPLOAD_SIZE)
+    results = list(pco.upload_many((content for _ in range(size)), max_workers=4))
+
+    assert all(result.error is None for result in results)
+
+    return size, size
+
+
+BENCHMARKS = {
+    'get': bench_get,
+    'iterate': bench_iterate,
+    'iterate_includes': bench_iterate_includes,
+    'iterate_views': bench_iterate_views,
+    'iterate_pages': bench_iterate_pages,
+    'post_many': bench_post_many,
+    'upload_many': bench_upload_many,
+}
+
+
+def bench_baseline(url, size):
+    """GET a single record size times with a bare requests.Session.
+
+    Returns:
+        float: Seconds per request.
+    """
+
+    session = requests.Session()
+    session.auth = ('app_id', 'secret')
+
+    start = time.perf_counter()
+
+    for _ in range(size):
+        response = session.get(f'{url}/people/v2/people/1')
+        response.raise_for_status()
+        response.json()
+
+    return (time.perf_counter() - start) / size
+
+
+def run_benchmark(name, url, upload_url, size, results):
+    """Run one benchmark and put its metrics on the results queue.
+
+    This is the target of the process each benchmark runs in.
+    """
+
+    pco = PCO('app_id', 'secret', api_base=url, upload_url=upload_url)
+    benchmark = BENCHMARKS[name]
+
+    # Warm up connections, imports, and the server's collections
+    benchmark(pco, max(1, size // 20))
+
+    gc.collect()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    request_count, records = benchmark(pco, size)
+
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    metrics = {
+        'requests': request_count,
+        'records': records,
+        'seconds': round(elapsed, 4),
+        'requests_per_sec': round(request_count / elapsed, 1),
+        'records_per_sec': round(records / elapsed, 1),
+        'cpu_ms_per_request': round(cpu / request_count * 1000, 4),
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    if name == 'get':
+        bench_baseline(url, max(1, size // 20))
+        baseline = bench_baseline(url, size)
+        metrics['overhead_ms_per_request'] = round((elapsed / size - baseline) * 1000, 4)
+
+    # Allocations are measured on a separate pass, as tracing slows everything down
+    traced_size = max(1, size // 10)
+    gc.collect()
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+
+    benchmark(pco, traced_size)
+
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+
+    metrics['traced_peak_kib'] = traced_peak // 1024
+    metrics['retained_blocks'] = sys.getallocatedblocks() - blocks
+
+    results.put(metrics)
+
+
+def serve(records, addresses, stop):
+    """Run a FakePCOServer until stop is set.
+
+    This is the target of the server process, which keeps the server off the
+    benchmark processes' CPU and GIL.
+    """
+
+    server = FakePCOServer(records=records)
+    server.start()
+    addresses.put((server.url, server.upload_url))
+    stop.wait()
+    server.stop()
+
+
+def git_commit():
+    """Get the current git commit, or None outside of a git checkout."""
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    """Load earlier runs from a JSON lines history file."""
+
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as history:
+        return [json.loads(line) for line in history if line.strip()]
+
+
+def compare(current, previous, threshold):
+    """Compare a run's metrics with an earlier run.
+
+    Args:
+        current (dict): The benchmark results of this run.
+        previous (dict): The benchmark results of the earlier run.
+        threshold (float): The change (percent) beyond which a worse metric is a regression.
+
+    Returns:
+        list: (benchmark, metric, previous value, current value, percent change,
+        regressed) tuples.
+    """
+
+    changes = []
+
+    for name, metrics in current.items():
+        for metric in COMPARED:
+            old = previous.get(name, {}).get(metric)
+            new = metrics.get(metric)
+
+            if old is None or new is None or old == 0:
+                continue
+
+            change = (new - old) / abs(old) * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+
+            changes.append((name, metric, old, new, change, worse > threshold))
+
+    return changes
+
+
+def main():
+    """Run the benchmarks, record the results, and report regressions."""
+
+    parser = argparse.ArgumentParser(description='Benchmark the PCO request pipeline.')
+    parser.add_argument('benchmarks', nargs='*', choices=[[]] + list(BENCHMARKS),
+                        help='The benchmarks to run. Default: all.')
+    parser.add_argument('--quick', action='store_true', help='Run smaller benchmarks.')
+    parser.add_argument('--history', default=HISTORY, help='The JSON lines history file.')
+    parser.add_argument('--no-save', action='store_true', help="Don't record this run.")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent change beyond which a worse metric is a regression.')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if any metric regressed.')
+    args = parser.parse_args()
+
+    names = args.benchmarks or list(BENCHMARKS)
+    sizes = {name: SIZES[name][args.quick] for name in names}
+
+    addresses = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve, args=(max(SIZES['iterate'][args.quick], 100), addresses, stop), daemon=True
+    )
+    server.start()
+    url, upload_url = addresses.get(timeout=30)
+
+    results = {}
+
+    try:
+        for name in names:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=run_benchmark, args=(name, url, upload_url, sizes[name], queue)
+            )
+            process.start()
+            results[name] = queue.get()
+            process.join()
+    finally:
+        stop.set()
+        server.join(timeout=10)
+
+    print(f"{'benchmark':<17} {'req/s':>9} {'records/s':>10} {'cpu ms/req':>11} "
+          f"{'overhead ms':>12} {'peak RSS KiB':>13} {'traced KiB':>11} {'retained':>9}")
+
+    for name, metrics in results.items():
+        overhead = metrics.get('overhead_ms_per_request')
+        print(f"{name:<17} {metrics['requests_per_sec']:>9.1f} {metrics['records_per_sec']:>10.1f} "
+              f"{metrics['cpu_ms_per_request']:>11.3f} "
+              f"{'-' if overhead is None else f'{overhead:.3f}':>12} "
+              f"{metrics['peak_rss_kib']:>13} {metrics['traced_peak_kib']:>11} "
+              f"{metrics['retained_blocks']:>9}")
+
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'sizes': sizes,
+        'benchmarks': results,
+    }
+
+    earlier = [
+        entry for entry in load_history(args.history)
+        if entry['python'] == run['python'] and all(
+            entry['sizes'].get(name) == size for name, size in sizes.items()
+            if name in entry['sizes']
+        )
+    ]
+
+    regressed = False
+
+    if earlier:
+        previous = earlier[-1]
+        print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+
+        for name, metric, old, new, change, worse in compare(results, previous['benchmarks'],
+                                                             args.threshold):
+            regressed = regressed or worse
+            print(f"{'REGRESSION ' if worse else '':>11}{name:<17} {metric:<24} "
+                  f'{old:>12} -> {new:<12} {change:+.1f}%')
+
+    if not args.no_save:
+        with open(args.history, 'a') as history:
+            history.write(json.dumps(run, sort_keys=True) + '\n')
+
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,49 @@ __version__ = "1.2.0"
 # The primary PCO interface object
 from .pco import PCO
 
+# The asyncio PCO interface object (requires aiohttp)
+from .async_pco import AsyncPCO
+
+# Results of concurrent bulk operations
+from .bulk import BulkResult, WritePipeline
+
+# Pluggable JSON codecs
+from .codec import JSONCodec, StdlibJSONCodec, OrjsonCodec, MsgspecCodec, fastest_codec
+
+# Lightweight views of iterated records and pages
+from .records import RecordView, IndexedPage
+
+# Streaming file uploads
+from .upload import FileUpload, UploadProgress, UploadCache
+
+# Request instrumentation and metrics
+from .instrumentation import RequestEvent, RequestListener, RequestMetrics, EndpointMetrics
+
+# Retrying failed requests
+from .retry import RetryPolicy, RetryReason
+
+# Client-side rate limiting
+from .ratelimit import RateLimiter, MemoryRateLimitBackend, FileRateLimitBackend
+
+# GET response caching
+from .cache import ResponseCache, MemoryResponseCache, SQLiteResponseCache
+
+# Incremental synchronization
+from .sync import IncrementalSync, SyncCheckpoint, CheckpointStore, MemoryCheckpointStore, \
+    FileCheckpointStore
+
+# Local SQLite mirror of PCO collections
+from .mirror import SQLiteMirror
+
+# Columnar exports of PCO collections
+from .export import Column, ColumnarExporter, ExportWriter, CSVWriter, ParquetWriter, ArrowIPCWriter
+
+# Resumable NDJSON exports
+from .ndjson import NDJSONExporter, ExportCheckpoint
+
+# Managed OAuth tokens
+from .oauth import OAuthToken, OAuthTokenManager, TokenStore, MemoryTokenStore, FileTokenStore
+
 # Utility functions for OAUTH
 from .user_auth_helpers import *
 
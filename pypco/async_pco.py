@@ -0,0 +1,742 @@
+"""An asyncio variant of the PCO wrapper, built on aiohttp."""
+
+import asyncio
+import json
+import logging
+import time
+
+from typing import Any, AsyncIterator, Optional, Union
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from .auth_config import PCOAuthConfig, PCOAuthType
+from .codec import JSONCodec
+from .exceptions import PCORequestTimeoutException, \
+    PCORequestException, PCOUnexpectedRequestException
+from .helpers import clean_url, parse_retry_after
+from .ratelimit import RateLimiter
+from .records import IndexedPage, RecordView, iterate_page_records, iterate_page_views
+from .retry import RetryPolicy, RetryReason
+
+
+class AsyncPCO:  # pylint: disable=too-many-instance-attributes
+    """The asyncio entry point to the PCO API.
+
+    AsyncPCO mirrors the PCO object, but its request functions are coroutines and
+    never block the event loop. Rate limit pauses use asyncio.sleep(). AsyncPCO
+    requires the aiohttp package (`pip install pypco[async]`).
+
+    AsyncPCO holds an aiohttp session which should be closed when you're done with it,
+    either by awaiting close() or by using AsyncPCO as an async context manager:
+
+        >>> async with AsyncPCO('app_id', 'secret') as pco:
+        >>>     person = await pco.get('/people/v2/people/71059458')
+
+    Args:
+        application_id (str): The application_id; secret must also be specified.
+        secret (str): The secret for your app; application_id must also be specified.
+        token (str): OAUTH token for your app; application_id and secret must not be specified.
+        api_base (str): The base URL against which REST calls will be made.
+            Default: https://api.planningcenteronline.com
+        timeout (int): How long to wait (seconds) for requests to timeout. Default 60.
+        upload_url (str): The URL to which files will be uploaded.
+            Default: https://upload.planningcenteronline.com/v2/files
+        upload_timeout (int): How long to wait (seconds) for uploads to timeout. Default 300.
+        timeout_retries (int): How many times to try requests that time out. Default 3.
+            Ignored if a retry_policy is given.
+        retry_policy (RetryPolicy): Which failed requests to retry and how long to back
+            off before retrying. Waits use asyncio.sleep(). Default: retry timed out
+            requests immediately, up to timeout_retries attempts.
+        rate_limiter (RateLimiter): A client-side rate limiter used to space requests out
+            before the PCO rate limit is hit. Waits use asyncio.sleep(). Default None.
+        json_codec (JSONCodec): The codec used to decode JSON responses and encode request
+            payloads. Default None (the json module, through aiohttp).
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            application_id: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            secret: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            token: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            cc_name: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            api_base: str = 'https://api.planningcenteronline.com',
+            timeout: int = 60,
+            upload_url: str = 'https://upload.planningcenteronline.com/v2/files',
+            upload_timeout: int = 300,
+            timeout_retries: int = 3,
+            retry_policy: Optional[RetryPolicy] = None,  # pylint: disable=unsubscriptable-object
+            rate_limiter: Optional[RateLimiter] = None,  # pylint: disable=unsubscriptable-object
+            json_codec: Optional[JSONCodec] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncPCO requires the aiohttp package. Install it with `pip install pypco[async]`."
+            )
+
+        self._log = logging.getLogger(__name__)
+
+        self._auth_config = PCOAuthConfig(application_id, secret, token, cc_name)
+
+        self.api_base = api_base
+        self.timeout = timeout
+
+        self.upload_url = upload_url
+        self.upload_timeout = upload_timeout
+
+        self.timeout_retries = timeout_retries
+        self.retry_policy = retry_policy
+
+        self.rate_limiter = rate_limiter
+
+        self.json_codec = json_codec
+
+        # The aiohttp session must be created from within a running event loop,
+        # so we wait until the first request to create it.
+        self.session: Optional[aiohttp.ClientSession] = None  # pylint: disable=unsubscriptable-object
+
+        self._log.debug("Pypco (async) has been initialized!")
+
+    async def __aenter__(self) -> 'AsyncPCO':
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the aiohttp session."""
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @property
+    def _auth_header(self) -> str:
+        """str: The authorization header for requests.
+
+        Church Center OrganizationTokens are fetched the first time they are needed and
+        shared by every PCO and AsyncPCO object for the same organization.
+        """
+
+        return self._auth_config.auth_header
+
+    async def _get_auth_header(self) -> str:
+        """Get the authorization header without blocking the event loop."""
+
+        if self._auth_config.auth_type == PCOAuthType.ORGTOKEN:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, lambda: self._auth_header
+            )
+
+        return self._auth_header
+
+    async def _do_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+    ) -> 'aiohttp.ClientResponse':
+        """Builds, executes, and performs a single request against the PCO API.
+
+        Executed request could be one of the standard HTTP verbs or a file upload.
+        The response body is read before returning, so the response can be used
+        after the connection has been released.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request.
+        """
+
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        # Standard header
+        headers = {
+            'User-Agent': 'pypco',
+            'Authorization': await self._get_auth_header(),
+        }
+
+        # Standard params
+        request_params = {
+            'headers': headers,
+            'params': params,
+            'json': payload,
+            'timeout': aiohttp.ClientTimeout(
+                total=self.upload_timeout if upload else self.timeout
+            ),
+        }
+
+        if payload is not None and self.json_codec is not None:
+            headers['Content-Type'] = 'application/json'
+            request_params['json'] = None
+            request_params['data'] = self.json_codec.encode(payload)
+
+        loop = asyncio.get_event_loop()
+
+        # Add files param if upload specified. Opening the file (and closing it) happens
+        # on the loop's executor, as aiohttp does for reading it, so the event loop is
+        # never blocked on disk I/O.
+        if upload:
+            upload_fh = await loop.run_in_executor(None, open, upload, 'rb')
+            form_data = aiohttp.FormData()
+            form_data.add_field('file', upload_fh)
+            request_params['data'] = form_data
+
+        self._log.debug(
+            "Executing %s request to '%s' with args %s",
+            method,
+            url,
+            {param: value for (param, value) in request_params.items() if param != 'headers'}
+        )
+
+        # The moment we've been waiting for...execute the request
+        try:
+            async with self.session.request(method, url, **request_params) as response:
+                await response.read()
+        finally:
+            if upload:
+                await loop.run_in_executor(None, upload_fh.close)
+
+        return response
+
+    async def _do_timeout_managed_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> 'aiohttp.ClientResponse':
+        """Performs a single request against the PCO API, retrying failures per the retry policy.
+
+        By default only timed out requests are retried (see RetryPolicy). Executed request
+        could be one of the standard HTTP verbs or a file upload.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            aiohttp.ClientConnectionError: The connection failed and the request wasn't
+                retried (again).
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request. If it has an error
+            status, it wasn't retried (again).
+        """
+
+        policy = self.retry_policy if self.retry_policy is not None else \
+            RetryPolicy(max_attempts=self.timeout_retries)
+
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            try:
+                response = await self._do_request(method, url, payload, upload, **params)
+
+            except asyncio.TimeoutError as exc:
+                self._log.debug("The request to \"%s\" timed out after %d tries.",
+                                url, attempt)
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.TIMEOUT
+                )
+
+                if delay is None:
+                    self._log.debug("Maximum retries (%d) hit. Will raise exception.",
+                                    policy.max_attempts)
+
+                    raise PCORequestTimeoutException(
+                        f"The request to \"{url}\" timed out after {attempt} tries.") from exc
+
+            except aiohttp.ClientConnectionError as exc:
+                # Certificate problems won't go away by trying again
+                if isinstance(exc, aiohttp.ClientSSLError):
+                    raise
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.CONNECTION_ERROR,
+                    sent=not isinstance(exc, aiohttp.ClientConnectorError)
+                )
+
+                if delay is None:
+                    raise
+
+                self._log.debug("The connection for the request to \"%s\" failed (%s). "
+                                "Will try again after %.2f sec(s).", url, exc, delay)
+
+            else:
+                if response.status not in policy.retry_statuses:
+                    return response
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.STATUS,
+                    status=response.status, retry_after=parse_retry_after(response.headers)
+                )
+
+                if delay is None:
+                    return response
+
+                self._log.debug("The request to \"%s\" failed with status %d. "
+                                "Will try again after %.2f sec(s).", url, response.status, delay)
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _do_auth_managed_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> 'aiohttp.ClientResponse':
+        """Performs a single request against the PCO API, refreshing expired credentials.
+
+        If the request is rejected as unauthorized (401) and the credentials can be
+        refreshed (Church Center OrganizationTokens, or OAuth tokens managed by an
+        OAuthTokenManager), it is retried once with new
+        credentials.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request.
+        """
+
+        auth_header = await self._get_auth_header()
+
+        response = await self._do_timeout_managed_request(method, url, payload, upload, **params)
+
+        # Refreshing OAuth tokens makes a blocking request, so do it off the event loop
+        if response.status == 401 and await asyncio.get_event_loop().run_in_executor(
+                None, self._auth_config.refresh_auth_header, auth_header
+        ):
+            self._log.debug("Credentials were rejected. Retrying with refreshed credentials.")
+
+            response = await self._do_timeout_managed_request(
+                method, url, payload, upload, **params
+            )
+
+        return response
+
+    async def _do_ratelimit_managed_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> 'aiohttp.ClientResponse':
+        """Performs a single request against the PCO API with automatic rate limit handling.
+
+        Rate limit pauses use asyncio.sleep(), and the rate limiter is used from the
+        event loop's executor, so other tasks continue to run while this request waits.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request.
+        """
+
+        # The limiter's backend may lock and read a file (FileRateLimitBackend), so it's
+        # only used from the loop's executor
+        loop = asyncio.get_event_loop()
+
+        while True:
+
+            if self.rate_limiter is not None:
+                wait = await loop.run_in_executor(None, self.rate_limiter.reserve_token)
+
+                if wait > 0:
+                    self._log.debug("Rate limit budget exhausted. Waiting %.2f sec(s).", wait)
+                    await asyncio.sleep(wait)
+
+            response = await self._do_auth_managed_request(
+                method, url, payload, upload, **params
+            )
+
+            if self.rate_limiter is not None:
+                await loop.run_in_executor(None, self.rate_limiter.update, response.headers)
+
+            if response.status == 429:
+                retry_after = int(response.headers['Retry-After'])
+
+                self._log.debug("Received rate limit response. Will try again after %d sec(s).",
+                                retry_after)
+
+                if self.rate_limiter is None or not await loop.run_in_executor(
+                        None, self.rate_limiter.penalize, retry_after):
+                    await asyncio.sleep(retry_after)
+
+                continue
+
+            return response
+
+    async def _do_url_managed_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> 'aiohttp.ClientResponse':
+        """Performs a single request against the PCO API, automatically cleaning up the URL.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request.
+        """
+
+        self._log.debug("URL cleaning input: \"%s\"", url)
+
+        if not upload:
+            url = clean_url(url, self.api_base)
+
+        self._log.debug("URL cleaning output: \"%s\"", url)
+
+        return await self._do_ratelimit_managed_request(method, url, payload, upload, **params)
+
+    async def request_response(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> 'aiohttp.ClientResponse':
+        """A generic entry point for making a managed request against PCO.
+
+        This function will return an aiohttp response object whose body has already
+        been read. If you're just looking for your data (json), use the request_json()
+        function or get(), post(), etc.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            aiohttp.ClientResponse: The response to this request.
+        """
+
+        try:
+            response = await self._do_url_managed_request(method, url, payload, upload, **params)
+        except Exception as err:
+            self._log.debug("Request resulted in unexpected error: \"%s\"", str(err))
+            raise PCOUnexpectedRequestException(str(err)) from err
+
+        try:
+            response.raise_for_status()
+        except aiohttp.ClientResponseError as err:
+            self._log.debug("Request resulted in API error: \"%s\"", str(err))
+            raise PCORequestException(
+                response.status,
+                str(err),
+                response_body=await response.text()
+            ) from err
+
+        return response
+
+    async def request_json(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+    ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """A generic entry point for making a managed request against PCO.
+
+        This function will return the payload from the PCO response (a dict).
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload from the response to this request.
+        """
+
+        response = await self.request_response(method, url, payload, upload, **params)
+        if response.status == 204:
+            return_value = None
+        else:
+            return_value = await response.json(
+                content_type=None,
+                loads=json.loads if self.json_codec is None else self.json_codec.decode
+            )
+
+        return return_value
+
+    async def get(self, url: str, **params) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Perform a GET request against the PCO API.
+
+        See PCO.get() for details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            params: Any named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload returned by the API for this request.
+        """
+
+        return await self.request_json('GET', url, **params)
+
+    async def post(
+            self,
+            url: str,
+            payload: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+        ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Perform a POST request against the PCO API.
+
+        See PCO.post() for details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            payload (dict): The payload for the POST request. Must be serializable to JSON!
+            params: Any named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload returned by the API for this request.
+        """
+
+        return await self.request_json('POST', url, payload, **params)
+
+    async def patch(
+            self,
+            url: str,
+            payload: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+        ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Perform a PATCH request against the PCO API.
+
+        See PCO.patch() for details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            payload (dict): The payload for the PATCH request. Must be serializable to JSON!
+            params: Any named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload returned by the API for this request.
+        """
+
+        return await self.request_json('PATCH', url, payload, **params)
+
+    async def delete(self, url: str, **params: str) -> 'aiohttp.ClientResponse':
+        """Perform a DELETE request against the PCO API.
+
+        See PCO.delete() for details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            params: Any named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            aiohttp.ClientResponse: The response object returned by the API for this request.
+        """
+
+        return await self.request_response('DELETE', url, **params)
+
+    async def iterate(
+            self,
+            url: str,
+            offset: int = 0,
+            per_page: int = 25,
+            record_views: bool = False,
+            **params: str
+        ) -> AsyncIterator[Union[dict, RecordView]]:
+        """Iterate a list of objects in a response, handling pagination.
+
+        This is an async generator; use it with `async for`. See PCO.iterate() for details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            offset (int): The offset at which to start. Usually going to be 0 (the default).
+            per_page (int): The number of results that should be requested in a single page.
+                Valid values are 1 - 100, defaults to the PCO default of 25.
+            record_views (bool): If True, yield read-only RecordViews instead of dicts.
+                Defaults to False.
+            params: Any additional named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Yields:
+            dict: Each object returned by the API for this request, with includes injected.
+            With record_views, each object is a RecordView.
+        """
+
+        split_page = iterate_page_views if record_views else iterate_page_records
+
+        async for page in self.iterate_pages(url, offset, per_page, **params):
+            for record in split_page(page):
+                yield record
+
+    async def iterate_pages(
+            self,
+            url: str,
+            offset: int = 0,
+            per_page: int = 25,
+            index_includes: bool = False,
+            **params: str
+        ) -> AsyncIterator[Union[dict, IndexedPage]]:
+        """Iterate the pages of a list response, handling pagination.
+
+        This is an async generator; use it with `async for`. See PCO.iterate_pages() for
+        details.
+
+        Args:
+            url (str): The URL against which to perform the request.
+            offset (int): The offset at which to start. Usually going to be 0 (the default).
+            per_page (int): The number of results that should be requested in a single page.
+                Valid values are 1 - 100, defaults to the PCO default of 25.
+            index_includes (bool): If True, yield IndexedPages. Defaults to False.
+            params: Any additional named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Yields:
+            dict: Each page returned by the API for this request. With index_includes, each
+            page is an IndexedPage.
+        """
+
+        while True:
+
+            response = await self.get(url, offset=offset, per_page=per_page, **params)
+
+            if response is None:
+                return
+
+            yield IndexedPage(response) if index_includes else response
+
+            offset += per_page
+
+            if 'next' not in response['links']:
+                break
+
+    async def upload(self, file_path: str, **params) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Upload the file at the specified path to PCO.
+
+        Args:
+            file_path (str): The path to the file to be uploaded to PCO.
+            params: Any named arguments will be passed as query parameters.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The PCO response from the file upload.
+        """
+
+        return await self.request_json('POST', self.upload_url, upload=file_path, **params)
+
+    @staticmethod
+    def template(
+            object_type: str,
+            attributes: Optional[dict] = None  # pylint: disable=unsubscriptable-object
+    ) -> dict:
+        """Get template JSON for creating a new object.
+
+        Args:
+            object_type (str): The type of object to be created.
+            attributes (dict): The new objects attributes. Defaults to empty.
+
+        Returns:
+            dict: A template from which to set the new object's attributes.
+        """
+
+        return {
+            'data': {
+                'type': object_type,
+                'attributes': {} if attributes is None else attributes
+            }
+        }
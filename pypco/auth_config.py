@@ -1,9 +1,11 @@
 """Internal authentication helper objects for pypco."""
 
 import base64
+import hashlib
+import threading
 from enum import Enum, auto
 
-from typing import Optional
+from typing import Callable, Dict, Optional, cast
 
 from pypco.user_auth_helpers import get_cc_org_token
 from .exceptions import PCOCredentialsException
@@ -17,6 +19,78 @@ class PCOAuthType(Enum):  # pylint: disable=R0903
     ORGTOKEN = auto()
 
 
+class OrgTokenCache:
+    """Church Center OrganizationTokens, shared by every PCO object in the process.
+
+    Tokens are fetched the first time they are needed and reused until a request
+    shows they have expired. Concurrent requests for the same organization's token
+    result in a single fetch.
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, str] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, cc_name: str) -> str:
+        """Get the token for an organization, fetching it if it isn't cached.
+
+        Args:
+            cc_name (str): The vanity name portion of the <vanity_name>.churchcenter.com url.
+
+        Raises:
+            PCORequestTimeoutException: The request for a token timed out.
+            PCORequestException: Church Center returned an error.
+            PCOUnexpectedRequestException: An unexpected error occurred.
+
+        Returns:
+            str: The OrganizationToken.
+        """
+
+        with self._lock:
+            token = self._tokens.get(cc_name)
+
+            if token is not None:
+                return token
+
+            fetch_lock = self._fetch_locks.setdefault(cc_name, threading.Lock())
+
+        with fetch_lock:
+            with self._lock:
+                token = self._tokens.get(cc_name)
+
+            if token is None:
+                token = str(get_cc_org_token(cc_name))
+
+                with self._lock:
+                    self._tokens[cc_name] = token
+
+        return token
+
+    def invalidate(self, cc_name: str, token: Optional[str] = None) -> None:  # pylint: disable=unsubscriptable-object
+        """Discard an organization's cached token, so a new one is fetched when next needed.
+
+        Args:
+            cc_name (str): The vanity name portion of the <vanity_name>.churchcenter.com url.
+            token (str): Only discard the cached token if it is this one; a token that
+                another thread has already refreshed is kept.
+        """
+
+        with self._lock:
+            if token is None or self._tokens.get(cc_name) == token:
+                self._tokens.pop(cc_name, None)
+
+    def clear(self) -> None:
+        """Discard all cached tokens."""
+
+        with self._lock:
+            self._tokens.clear()
+
+
+ORG_TOKEN_CACHE = OrgTokenCache()
+
+
 class PCOAuthConfig:
     """Auth configuration for PCO.
 
@@ -26,6 +100,11 @@ class PCOAuthConfig:
             token (str): The token for your application (OAUTH).
             cc_name (str): The vanity name portion of the <vanity_name>.churchcenter.com url
             auth_type (PCOAuthType): The authentication type specified by this config object.
+            token_refresher (callable): Called with a rejected OAuth token to get a
+                refreshed one (OAUTH). Set by OAuthTokenManager.
+            identity (str): A stable identifier of the user an OAuth token belongs to,
+                which (unlike the token) doesn't change when the token is refreshed
+                (OAUTH). Set by OAuthTokenManager.
     """
 
     def __init__(
@@ -40,6 +119,8 @@ class PCOAuthConfig:
         self.secret = secret
         self.token = token
         self.cc_name = cc_name
+        self.token_refresher: Optional[Callable[[str], str]] = None  # pylint: disable=unsubscriptable-object
+        self.identity: Optional[str] = None  # pylint: disable=unsubscriptable-object
 
     @property
     def auth_type(self) -> PCOAuthType:
@@ -79,7 +160,68 @@ class PCOAuthConfig:
                    f"{base64.b64encode(f'{self.application_id}:{self.secret}'.encode()).decode()}"
 
         if self.auth_type == PCOAuthType.ORGTOKEN:
-            return f"OrganizationToken {get_cc_org_token(self.cc_name)}"
+            return f"OrganizationToken {ORG_TOKEN_CACHE.get(cast(str, self.cc_name))}"
 
         # Otherwise OAUTH using the Bearer scheme
         return f"Bearer {self.token}"
+
+    def refresh_auth_header(self, auth_header: str) -> bool:
+        """Discard credentials that a 401 response showed to have expired.
+
+        OrganizationTokens can be refreshed (the next auth_header fetches a new one), as
+        can OAuth tokens when a token_refresher is set.
+
+        Args:
+            auth_header (str): The authorization header sent with the rejected request.
+
+        Returns:
+            bool: True if the credentials were refreshed and the request should be
+            retried, False if the credentials can't be refreshed.
+        """
+
+        if self.auth_type == PCOAuthType.OAUTH and self.token_refresher is not None:
+            prefix = 'Bearer '
+            self.token = self.token_refresher(
+                auth_header[len(prefix):] if auth_header.startswith(prefix) else auth_header
+            )
+
+            return True
+
+        if self.auth_type != PCOAuthType.ORGTOKEN:
+            return False
+
+        prefix = 'OrganizationToken '
+
+        ORG_TOKEN_CACHE.invalidate(
+            cast(str, self.cc_name),
+            auth_header[len(prefix):] if auth_header.startswith(prefix) else None
+        )
+
+        return True
+
+    @property
+    def credentials_key(self) -> str:
+        """A stable, non-secret key identifying these credentials.
+
+        Useful for naming state shared between processes using the same credentials
+        (e.g. rate limit budgets) without exposing the credentials themselves. OAuth
+        tokens are identified by their identity, if set, so the key stays the same when
+        the token is refreshed.
+
+        Raises:
+            PCOCredentialsException: You have specified invalid authentication information.
+
+        Returns:
+            str: A hex digest identifying the credentials.
+        """
+
+        auth_type = self.auth_type
+
+        if auth_type == PCOAuthType.PAT:
+            identity = self.application_id
+        elif auth_type == PCOAuthType.ORGTOKEN:
+            identity = self.cc_name
+        else:
+            identity = self.identity or self.token
+
+        return hashlib.sha256(f'{auth_type.name}:{identity}'.encode()).hexdigest()
@@ -0,0 +1,345 @@
+"""Helpers for executing many PCO API requests concurrently."""
+
+import threading
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, \
+    Tuple, Union
+
+
+class BulkResult:  # pylint: disable=too-few-public-methods
+    """The outcome of a single request made as part of a bulk operation.
+
+    Args:
+        index (int): The position of the request in the bulk operation's input.
+        url (str): The URL of the request.
+        payload (dict): The payload of the request, if any.
+        result (obj): The value returned for the request, if it succeeded.
+        error (Exception): The exception raised by the request, if it failed.
+
+    Attributes:
+        index (int): The position of the request in the bulk operation's input.
+        url (str): The URL of the request.
+        payload (dict): The payload of the request, if any.
+        result (obj): The value returned for the request (None if it failed).
+        error (Exception): The exception raised by the request (None if it succeeded). This is
+            usually a PCOException, but errors raised before the request is made (such as
+            an OSError opening a file to upload) are reported too.
+    """
+
+    __slots__ = ('index', 'url', 'payload', 'result', 'error')
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            index: int,
+            url: str,
+            payload: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            result: Any = None,
+            error: Optional[Exception] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        self.index = index
+        self.url = url
+        self.payload = payload
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """bool: True if the request succeeded."""
+
+        return self.error is None
+
+    def __repr__(self) -> str:
+
+        status = 'ok' if self.ok else f'error={self.error!r}'
+
+        return f'BulkResult(index={self.index}, url={self.url!r}, {status})'
+
+
+def execute_bulk(
+        function: Callable[..., Any],
+        items: Iterable[Tuple[str, Optional[dict]]],  # pylint: disable=unsubscriptable-object
+        max_workers: int = 4,
+) -> Iterator[BulkResult]:
+    """Execute requests concurrently, yielding each result as it completes.
+
+    Requests are read from the input lazily and at most 2 * max_workers are pending at
+    any time, so arbitrarily large (or generated) inputs can be processed in constant
+    memory. A failed request doesn't stop the others; its exception is reported on
+    its BulkResult.
+
+    Args:
+        function (callable): Called as function(url, payload) for each request, or
+            function(url) when the payload is None.
+        items (iterable): (url, payload) tuples.
+        max_workers (int): The maximum number of requests to execute concurrently.
+
+    Yields:
+        BulkResult: The outcome of each request, in order of completion.
+    """
+
+    def execute(index: int, url: str, payload: Optional[dict]) -> BulkResult:  # pylint: disable=unsubscriptable-object
+        try:
+            if payload is None:
+                result = function(url)
+            else:
+                result = function(url, payload)
+        except Exception as err:  # pylint: disable=broad-except
+            return BulkResult(index, url, payload, error=err)
+
+        return BulkResult(index, url, payload, result)
+
+    indexed_items = enumerate(items)
+    pending: Dict[Future, int] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            def submit(count: int) -> None:
+                for index, (url, payload) in islice(indexed_items, count):
+                    pending[executor.submit(execute, index, url, payload)] = index
+
+            submit(2 * max_workers)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                completed = sorted(done, key=pending.__getitem__)
+
+                for future in completed:
+                    del pending[future]
+
+                submit(len(completed))
+
+                for future in completed:
+                    yield future.result()
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class WritePipeline:
+    """Pipelines dependent write requests, such as creating objects and then their children.
+
+    Each request returns a Future immediately. A request can depend on an earlier
+    request's Future (its parent); it is started as soon as the parent completes, and
+    its URL can be built from the parent's result. Requests run concurrently on a pool
+    of threads. Requests whose parent has completed run ahead of requests without a
+    parent, so the children of one object are created while the next objects are
+    being created, rather than after all of them.
+
+    If a parent request fails, its children aren't executed; their Futures fail with the
+    parent's exception.
+
+    Use a WritePipeline as a context manager; leaving the context waits for all
+    requests (including children) to complete. All requests go through the same PCO
+    object, so they share its rate limit handling (and rate limiter, if any).
+
+    Args:
+        pco (PCO): The PCO object used to make requests.
+        max_workers (int): The maximum number of requests to execute concurrently.
+            Default 4.
+        max_pending (int): The maximum number of incomplete requests. Submitting a
+            request blocks while this many are outstanding, bounding memory use for
+            large imports. Default 4 * max_workers.
+    """
+
+    def __init__(
+            self,
+            pco: Any,
+            max_workers: int = 4,
+            max_pending: Optional[int] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        self._pco = pco
+        self._max_workers = max_workers
+        self._workers: List[threading.Thread] = []
+        self._queue: Deque[Optional[Callable[[], None]]] = deque()  # pylint: disable=unsubscriptable-object
+        self._queue_ready = threading.Condition()
+        self._pending = threading.BoundedSemaphore(max_pending or 4 * max_workers)
+        self._lock = threading.Lock()
+        self._futures: Set[Future] = set()
+
+    def __enter__(self) -> 'WritePipeline':
+
+        return self
+
+    def __exit__(self, *_) -> None:
+
+        self.close()
+
+    def post(
+            self,
+            url: Union[str, Callable[[Any], str]],  # pylint: disable=unsubscriptable-object
+            payload: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            after: Optional[Future] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+        ) -> Future:
+        """Perform a POST request once its parent (if any) has completed.
+
+        Args:
+            url (str): The URL against which to perform the request. If the request has
+                a parent, "{id}" is replaced with the id of the object the parent
+                returned. Alternatively, a callable taking the parent's result and
+                returning the URL.
+            payload (dict): The payload for the request; see PCO.post().
+            after (Future): A Future returned by this pipeline for the parent request.
+            params: Any named arguments will be passed as query parameters. Values must
+                be of type str!
+
+        Returns:
+            Future: The Future for the payload returned by the API.
+        """
+
+        return self._submit(self._pco.post, url, (payload,), after, params)
+
+    def patch(
+            self,
+            url: Union[str, Callable[[Any], str]],  # pylint: disable=unsubscriptable-object
+            payload: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            after: Optional[Future] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+        ) -> Future:
+        """Perform a PATCH request once its parent (if any) has completed.
+
+        See post() for the arguments.
+
+        Returns:
+            Future: The Future for the payload returned by the API.
+        """
+
+        return self._submit(self._pco.patch, url, (payload,), after, params)
+
+    def delete(
+            self,
+            url: Union[str, Callable[[Any], str]],  # pylint: disable=unsubscriptable-object
+            after: Optional[Future] = None,  # pylint: disable=unsubscriptable-object
+            **params: str
+        ) -> Future:
+        """Perform a DELETE request once its parent (if any) has completed.
+
+        See post() for the arguments.
+
+        Returns:
+            Future: The Future for the response object returned by the API.
+        """
+
+        return self._submit(self._pco.delete, url, (), after, params)
+
+    def close(self) -> None:
+        """Wait for all requests to complete, then release the pipeline's threads."""
+
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+
+            if not futures:
+                break
+
+            wait(futures)
+
+        with self._queue_ready:
+            self._queue.extend([None] * len(self._workers))
+            self._queue_ready.notify_all()
+
+        for worker in self._workers:
+            worker.join()
+
+        self._workers = []
+
+    def _schedule(self, task: Callable[[], None], first: bool) -> None:
+        """Queue a task for the worker threads, starting another worker if possible."""
+
+        with self._queue_ready:
+            if first:
+                self._queue.appendleft(task)
+            else:
+                self._queue.append(task)
+
+            if len(self._workers) < self._max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+            self._queue_ready.notify()
+
+    def _work(self) -> None:
+        """Execute queued tasks until told to stop."""
+
+        while True:
+            with self._queue_ready:
+                while not self._queue:
+                    self._queue_ready.wait()
+
+                task = self._queue.popleft()
+
+            if task is None:
+                return
+
+            task()
+
+    def _submit(  # pylint: disable=too-many-arguments
+            self,
+            function: Callable[..., Any],
+            url: Union[str, Callable[[Any], str]],  # pylint: disable=unsubscriptable-object
+            args: tuple,
+            after: Optional[Future],  # pylint: disable=unsubscriptable-object
+            params: Dict[str, str],
+        ) -> Future:
+        """Schedule a request, after its parent if it has one."""
+
+        self._pending.acquire()  # pylint: disable=consider-using-with
+
+        future: Future = Future()
+        future.add_done_callback(self._release)
+
+        with self._lock:
+            self._futures.add(future)
+
+        def execute(parent_result: Any) -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+
+            try:
+                if callable(url):
+                    request_url = url(parent_result)
+                elif after is not None:
+                    request_url = url.format(id=parent_result['data']['id'])
+                else:
+                    request_url = url
+
+                future.set_result(function(request_url, *args, **params))
+            except Exception as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+
+        def start(parent: Optional[Future]) -> None:  # pylint: disable=unsubscriptable-object
+            if parent is not None:
+                if parent.cancelled():
+                    future.cancel()
+                    return
+
+                error = parent.exception()
+                if error is not None:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(error)
+                    return
+
+            parent_result = None if parent is None else parent.result()
+            self._schedule(lambda: execute(parent_result), first=parent is not None)
+
+        if after is None:
+            start(None)
+        else:
+            after.add_done_callback(start)
+
+        return future
+
+    def _release(self, future: Future) -> None:
+        """Stop tracking a completed request."""
+
+        with self._lock:
+            self._futures.discard(future)
+
+        self._pending.release()
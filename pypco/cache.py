@@ -0,0 +1,381 @@
+"""Response caching for GET requests against the PCO API."""
+
+import abc
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlencode, urlparse
+
+
+def cache_key(url: str, params: dict, credentials: Optional[str] = None) -> str:  # pylint: disable=unsubscriptable-object
+    """Build the cache key for a GET request.
+
+    Args:
+        url (str): The (cleaned) URL of the request.
+        params (dict): The query parameters of the request.
+        credentials (str): The credentials_key of the credentials the request is made
+            with, so that caches shared by several sets of credentials never return one
+            set's responses to another.
+
+    Returns:
+        str: The URL with its query parameters in a stable order, prefixed with the
+        credentials key if given.
+    """
+
+    key = url
+
+    if params:
+        key = f'{url}?{urlencode(sorted((name, str(value)) for name, value in params.items()))}'
+
+    if credentials is not None:
+        key = f'{credentials}:{key}'
+
+    return key
+
+
+class CachedResponse:  # pylint: disable=too-few-public-methods
+    """A cached response body and the validators needed to revalidate it.
+
+    Args:
+        url (str): The (cleaned) URL of the request.
+        body (bytes): The raw response body.
+        etag (str): The value of the response's ETag header, if any.
+        last_modified (str): The value of the response's Last-Modified header, if any.
+        stored_at (float): When the response was received (seconds since the epoch).
+            Defaults to now.
+
+    Attributes:
+        url (str): The (cleaned) URL of the request.
+        body (bytes): The raw response body.
+        etag (str): The value of the response's ETag header, if any.
+        last_modified (str): The value of the response's Last-Modified header, if any.
+        stored_at (float): When the response was received or last revalidated.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            url: str,
+            body: bytes,
+            etag: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            last_modified: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            stored_at: Optional[float] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """dict: Conditional request headers with which to revalidate this response."""
+
+        headers = {}
+
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+
+class ResponseCache(abc.ABC):
+    """The base class for GET response caches.
+
+    Cached responses younger than their time to live (TTL) are used without making a
+    request at all. Older responses are revalidated with a conditional request
+    (If-None-Match or If-Modified-Since); when PCO responds with 304 Not Modified, the
+    cached body is used instead of downloading it again.
+
+    Args:
+        ttl (float): The default number of seconds for which a cached response is used
+            without revalidating it. Default 0 (always revalidate).
+        ttls (dict): TTLs for specific endpoints, keyed by URL path prefix (e.g.
+            "/people/v2/field_definitions"). The longest matching prefix wins.
+        stale_while_revalidate (float): For this many seconds after its TTL has expired,
+            a cached response is still used immediately while it is revalidated in the
+            background. Default 0.
+
+    Attributes:
+        hits (int): The number of requests served from the cache.
+        misses (int): The number of requests for which a full response was downloaded.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 0,
+            ttls: Optional[Dict[str, float]] = None,  # pylint: disable=unsubscriptable-object
+            stale_while_revalidate: float = 0,
+    ):
+
+        self._stats_lock = threading.Lock()
+
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, url: str) -> float:
+        """Get the time to live for responses from the specified URL.
+
+        Args:
+            url (str): The (cleaned) URL of the request.
+
+        Returns:
+            float: The TTL in seconds.
+        """
+
+        path = urlparse(url).path
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+
+        if not matches:
+            return self.ttl
+
+        return self.ttls[max(matches, key=len)]
+
+    def record_hit(self) -> None:
+        """Count a request served from the cache."""
+
+        with self._stats_lock:
+            self.hits += 1
+
+    def record_miss(self) -> None:
+        """Count a request for which a full response was downloaded."""
+
+        with self._stats_lock:
+            self.misses += 1
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:  # pylint: disable=unsubscriptable-object
+        """Get a cached response.
+
+        Args:
+            key (str): The cache key for the request (see cache_key()).
+
+        Returns:
+            CachedResponse: The cached response, or None if there isn't one.
+        """
+
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def set(self, key: str, response: CachedResponse) -> None:
+        """Store a response in the cache.
+
+        Args:
+            key (str): The cache key for the request (see cache_key()).
+            response (CachedResponse): The response to store.
+        """
+
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def invalidate(self, url: str) -> None:
+        """Remove cached responses affected by a change to the object at url.
+
+        Responses for the URL itself (with any query parameters), for its parent
+        collections, and for objects nested beneath it are removed.
+
+        Args:
+            url (str): The (cleaned) URL of the object that was changed.
+        """
+
+        raise NotImplementedError()
+
+    @staticmethod
+    def _is_affected(cached_url: str, url: str) -> bool:
+        """Whether a cached response for cached_url is affected by a change to url."""
+
+        return cached_url == url or \
+            url.startswith(f'{cached_url}/') or \
+            cached_url.startswith(f'{url}/')
+
+
+class MemoryResponseCache(ResponseCache):
+    """An in-memory, least recently used response cache.
+
+    The cache is thread-safe, and is bounded both by number of entries and by the total
+    size of the cached bodies.
+
+    Args:
+        max_entries (int): The maximum number of responses to cache. Default 1000.
+        max_bytes (int): The maximum total size of cached bodies. Default 64 MiB.
+        kwargs: TTL options; see ResponseCache.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024, **kwargs):
+
+        super().__init__(**kwargs)
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """int: The total size of the cached bodies, in bytes."""
+
+        return self._size
+
+    def get(self, key: str) -> Optional[CachedResponse]:  # pylint: disable=unsubscriptable-object
+
+        with self._lock:
+            response = self._entries.get(key)
+
+            if response is not None:
+                self._entries.move_to_end(key)
+
+            return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+
+        with self._lock:
+            self._remove(key)
+
+            if len(response.body) > self.max_bytes:
+                return
+
+            self._entries[key] = response
+            self._size += len(response.body)
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, url: str) -> None:
+
+        with self._lock:
+            for key in [key for key, response in self._entries.items()
+                        if self._is_affected(response.url, url)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry. Must be called with the lock held."""
+
+        response = self._entries.pop(key, None)
+
+        if response is not None:
+            self._size -= len(response.body)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """A persistent response cache stored in an SQLite database.
+
+    Responses survive process restarts, and the database can be read and written by
+    several processes at once (it uses SQLite's write-ahead log). Each thread uses its
+    own database connection. Pages fetched by iterate() are cached individually, since
+    each is a GET request with its own offset.
+
+    Args:
+        path (str): The path of the database file. It will be created if it doesn't exist.
+        kwargs: TTL options; see ResponseCache.
+    """
+
+    def __init__(self, path: str, **kwargs):
+
+        super().__init__(**kwargs)
+
+        self.path = path
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, url TEXT NOT NULL, body BLOB NOT NULL, '
+                'etag TEXT, last_modified TEXT, stored_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_url ON responses (url)')
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the database connection for the current thread."""
+
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+
+        return conn
+
+    def __len__(self) -> int:
+
+        return self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def get(self, key: str) -> Optional[CachedResponse]:  # pylint: disable=unsubscriptable-object
+
+        row = self._connection().execute(
+            'SELECT url, body, etag, last_modified, stored_at FROM responses WHERE key = ?',
+            (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return CachedResponse(row[0], bytes(row[1]), row[2], row[3], row[4])
+
+    def set(self, key: str, response: CachedResponse) -> None:
+
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, url, body, etag, last_modified, stored_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.body, response.etag, response.last_modified,
+                 response.stored_at)
+            )
+
+    def invalidate(self, url: str) -> None:
+
+        with self._connection() as conn:
+            conn.execute(
+                'DELETE FROM responses WHERE url = :url '
+                "OR substr(:url, 1, length(url) + 1) = url || '/' "
+                "OR substr(url, 1, length(:url) + 1) = :url || '/'",
+                {'url': url}
+            )
+
+    def purge(self, max_age: float) -> None:
+        """Remove responses stored (or last revalidated) more than max_age seconds ago.
+
+        Args:
+            max_age (float): The maximum age in seconds of responses to keep.
+        """
+
+        with self._connection() as conn:
+            conn.execute('DELETE FROM responses WHERE stored_at < ?', (time.time() - max_age,))
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+
+        with self._connection() as conn:
+            conn.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """Close the current thread's database connection."""
+
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
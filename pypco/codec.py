@@ -0,0 +1,163 @@
+"""Pluggable JSON codecs for decoding responses and encoding request payloads."""
+
+import abc
+import json
+
+from typing import Any, List, Type, Union
+
+
+class JSONCodec(abc.ABC):
+    """The base class for JSON codecs.
+
+    A codec decodes JSON response bodies and encodes request payloads. Decoding
+    errors are raised as ValueError (like json.JSONDecodeError), whatever the backend.
+
+    Attributes:
+        name (str): The name of the codec's backend.
+    """
+
+    name = ''
+
+    @abc.abstractmethod
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Decode a JSON document.
+
+        Args:
+            data (bytes or str): The document, UTF-8 encoded or as a str.
+
+        Raises:
+            ValueError: The document isn't valid JSON.
+
+        Returns:
+            obj: The decoded document.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """Encode an object as a JSON document.
+
+        Args:
+            obj (obj): A json-serializable Python object.
+
+        Returns:
+            bytes: The UTF-8 encoded document.
+        """
+
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+
+        return f'{type(self).__name__}()'
+
+
+class StdlibJSONCodec(JSONCodec):
+    """A JSON codec using the standard library json module."""
+
+    name = 'json'
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+
+        return json.loads(data)
+
+    def encode(self, obj: Any) -> bytes:
+
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """A JSON codec using orjson (`pip install orjson`).
+
+    Raises:
+        ImportError: orjson isn't installed.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+
+        try:
+            import orjson  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise ImportError(
+                "OrjsonCodec requires the orjson package. Install it with `pip install orjson`."
+            ) from err
+
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+
+        # orjson.JSONDecodeError is a ValueError
+        return self._loads(data)
+
+    def encode(self, obj: Any) -> bytes:
+
+        return self._dumps(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    """A JSON codec using msgspec (`pip install msgspec`).
+
+    Raises:
+        ImportError: msgspec isn't installed.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self):
+
+        try:
+            import msgspec  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise ImportError(
+                "MsgspecCodec requires the msgspec package. Install it with `pip install msgspec`."
+            ) from err
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self._decode_error = msgspec.DecodeError
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as err:
+            raise ValueError(str(err)) from err
+
+    def encode(self, obj: Any) -> bytes:
+
+        return self._encoder.encode(obj)
+
+
+# Codecs in order of preference
+CODECS: List[Type[JSONCodec]] = [OrjsonCodec, MsgspecCodec, StdlibJSONCodec]
+
+
+def available_codecs() -> List[JSONCodec]:
+    """Get an instance of every codec whose backend is installed.
+
+    Returns:
+        list: The codecs, fastest first. The standard library codec is always last.
+    """
+
+    codecs = []
+
+    for codec_class in CODECS:
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+
+    return codecs
+
+
+def fastest_codec() -> JSONCodec:
+    """Get the fastest installed codec: orjson, then msgspec, then the json module.
+
+    Returns:
+        JSONCodec: The codec.
+    """
+
+    return available_codecs()[0]
@@ -0,0 +1,528 @@
+"""Streaming exports of PCO collections to columnar files (Parquet, Arrow IPC, CSV)."""
+
+import abc
+import csv
+import json
+
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence, Union, cast
+
+from .pco import PCO
+from .records import IndexedPage
+
+# The types of export columns (see Column)
+COLUMN_TYPES = ('string', 'int', 'float', 'bool', 'date', 'timestamp')
+
+
+def _to_string(value: Any) -> str:
+    """Convert a value to a string; lists and objects are encoded as JSON."""
+
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+
+    return str(value)
+
+
+def _to_bool(value: Any) -> bool:
+    """Convert a value to a bool, accepting the strings true/false, 1/0, and yes/no."""
+
+    if isinstance(value, str):
+        lowered = value.lower()
+
+        if lowered in ('true', '1', 'yes'):
+            return True
+
+        if lowered in ('false', '0', 'no'):
+            return False
+
+        raise ValueError(f'Not a boolean: {value!r}')
+
+    return bool(value)
+
+
+def _to_date(value: Any) -> date:
+    """Convert a YYYY-MM-DD string to a date."""
+
+    if isinstance(value, date):
+        return value
+
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _to_timestamp(value: Any) -> datetime:
+    """Convert an ISO 8601 timestamp, as used by PCO, to an aware datetime in UTC."""
+
+    if not isinstance(value, datetime):
+        text = value[:-1] + '+00:00' if value.endswith('Z') else value
+
+        # strptime's %z doesn't accept a colon in the offset before Python 3.7
+        if len(text) > 6 and text[-3] == ':' and text[-6] in '+-':
+            text = text[:-3] + text[-2:]
+
+        value = datetime.strptime(
+            text, '%Y-%m-%dT%H:%M:%S.%f%z' if '.' in text else '%Y-%m-%dT%H:%M:%S%z'
+        )
+
+    return value.astimezone(timezone.utc)
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'string': _to_string,
+    'int': int,
+    'float': float,
+    'bool': _to_bool,
+    'date': _to_date,
+    'timestamp': _to_timestamp,
+}
+
+
+class Column:
+    """A column of an export: where its values come from, and their type.
+
+    By default a column holds an attribute of each record (data.attributes), or its id
+    or type. With include, it holds an attribute of the record's included objects of
+    that type instead: the first one's, or all of them joined into a string with join.
+    Missing values are null (empty in CSV files).
+
+        >>> Column('first_name')
+        >>> Column('id', type='int')
+        >>> Column('updated_at', type='timestamp')
+        >>> Column('emails', 'address', include='Email', join=';')
+
+    Args:
+        name (str): The name of the column.
+        attribute (str): The attribute to read; "id" and "type" read the object's id and
+            type. Default: the column name.
+        type (str): The type of the column's values: "string", "int", "float", "bool",
+            "date" (YYYY-MM-DD), or "timestamp" (ISO 8601, converted to UTC). Default
+            "string".
+        include (str): The type of included objects to read the attribute from, e.g.
+            "Email". Default None (read it from the record).
+        join (str): If set, the attribute values of all the record's included objects of
+            the given type are joined with this separator, and the column is a string
+            column. Default None (use the first included object).
+
+    Raises:
+        ValueError: The type is unknown.
+    """
+
+    __slots__ = ('name', 'attribute', 'type', 'include', 'join', '_convert')
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            name: str,
+            attribute: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            type: str = 'string',  # pylint: disable=redefined-builtin
+            include: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            join: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        if type not in _CONVERTERS:
+            raise ValueError(f'Unknown column type {type!r}; expected one of {COLUMN_TYPES}.')
+
+        self.name = name
+        self.attribute = name if attribute is None else attribute
+        self.type = 'string' if join is not None else type
+        self.include = include
+        self.join = join
+        self._convert = _CONVERTERS[self.type]
+
+    def __repr__(self) -> str:
+
+        return f'Column({self.name!r}, {self.attribute!r}, type={self.type!r}, ' \
+            f'include={self.include!r}, join={self.join!r})'
+
+    def _read(self, obj: dict) -> Any:
+        """Read the column's attribute from an object."""
+
+        if self.attribute in ('id', 'type'):
+            return obj.get(self.attribute)
+
+        return (obj.get('attributes') or {}).get(self.attribute)
+
+    def value(self, data: dict, included: Sequence[dict]) -> Any:
+        """Get the column's value for a record.
+
+        Args:
+            data (dict): The record's object.
+            included (list): The record's included objects.
+
+        Raises:
+            ValueError: The value can't be converted to the column's type.
+
+        Returns:
+            obj: The converted value, or None if it's missing.
+        """
+
+        if self.include is None:
+            value = self._read(data)
+        else:
+            values = [
+                self._read(include) for include in included if include['type'] == self.include
+            ]
+
+            if self.join is not None:
+                values = [_to_string(value) for value in values if value is not None]
+                value = self.join.join(values) if values else None
+            else:
+                value = values[0] if values else None
+
+        if value is None:
+            return None
+
+        try:
+            return self._convert(value)
+        except (TypeError, ValueError) as err:
+            raise ValueError(
+                f'Column {self.name!r}: can\'t convert {value!r} of {data.get("type")} '
+                f'{data.get("id")} to {self.type}.'
+            ) from err
+
+
+class ExportWriter(abc.ABC):
+    """The base class for the writers ColumnarExporter writes batches of rows to.
+
+    Writers are opened once with the export's columns, receive batches of rows as
+    columns of values (converted to the columns' types, None for nulls), and are closed
+    when the export ends.
+    """
+
+    @abc.abstractmethod
+    def open(self, columns: List[Column]) -> None:
+        """Start writing a file with the given columns.
+
+        Args:
+            columns (list): The columns.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def write_batch(self, values: List[list]) -> None:
+        """Write a batch of rows.
+
+        Args:
+            values (list): A list of values for each column, in the order of the columns.
+        """
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish writing the file."""
+
+
+class CSVWriter(ExportWriter):
+    """Writes a CSV file with a header row.
+
+    Nulls are written as empty fields, bools as "true" and "false", and dates and
+    timestamps in ISO 8601 format.
+
+    Args:
+        file: The path of the file to write, or a text file object (opened with
+            newline='').
+        dialect: The csv dialect (or its name). Default "excel".
+    """
+
+    def __init__(self, file: Union[str, IO[str]], dialect: Any = 'excel'):  # pylint: disable=unsubscriptable-object
+
+        self.file = file
+        self.dialect = dialect
+
+        self._handle: Optional[IO[str]] = None  # pylint: disable=unsubscriptable-object
+        self._writer: Any = None
+
+    def open(self, columns: List[Column]) -> None:
+
+        if isinstance(self.file, str):
+            self._handle = open(self.file, 'w', newline='', encoding='utf-8')
+            target = self._handle
+        else:
+            target = self.file
+
+        self._writer = csv.writer(target, dialect=self.dialect)
+        self._writer.writerow([column.name for column in columns])
+
+    def write_batch(self, values: List[list]) -> None:
+
+        self._writer.writerows(
+            [_csv_field(value) for value in row] for row in zip(*values)
+        )
+
+    def close(self) -> None:
+
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def _csv_field(value: Any) -> Any:
+    """Format a value for a CSV file."""
+
+    if value is None:
+        return ''
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    return value
+
+
+def _import_pyarrow() -> Any:
+    """Import pyarrow, raising a helpful ImportError if it isn't installed."""
+
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "Parquet and Arrow exports require the pyarrow package. Install it with "
+            "`pip install pypco[arrow]`."
+        ) from err
+
+    return pyarrow
+
+
+def arrow_schema(columns: List[Column]) -> Any:
+    """Build the Arrow schema of an export's columns.
+
+    Args:
+        columns (list): The columns.
+
+    Raises:
+        ImportError: pyarrow isn't installed.
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+
+    pa = _import_pyarrow()
+
+    types = {
+        'string': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+
+    return pa.schema([pa.field(column.name, types[column.type]) for column in columns])
+
+
+class _ArrowWriter(ExportWriter):
+    """Converts batches of rows to Arrow record batches."""
+
+    def __init__(self):
+
+        self._pa = _import_pyarrow()
+        self._schema: Any = None
+
+    def open(self, columns: List[Column]) -> None:
+
+        self._schema = arrow_schema(columns)
+
+    def _batch(self, values: List[list]) -> Any:
+        """Build an Arrow record batch from columns of values."""
+
+        return self._pa.RecordBatch.from_arrays(
+            [
+                self._pa.array(column_values, type=field.type)
+                for column_values, field in zip(values, self._schema)
+            ],
+            schema=self._schema,
+        )
+
+
+class ParquetWriter(_ArrowWriter):
+    """Writes a Parquet file, one row group per batch (requires pyarrow).
+
+    Args:
+        path (str): The path of the file to write.
+        compression (str): The compression codec, e.g. "snappy", "zstd", or "none".
+            Default "snappy".
+
+    Raises:
+        ImportError: pyarrow isn't installed.
+    """
+
+    def __init__(self, path: str, compression: str = 'snappy'):
+
+        super().__init__()
+
+        self.path = path
+        self.compression = compression
+
+        self._writer: Any = None
+
+    def open(self, columns: List[Column]) -> None:
+
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+
+        super().open(columns)
+        self._writer = pyarrow.parquet.ParquetWriter(
+            self.path, self._schema, compression=self.compression
+        )
+
+    def write_batch(self, values: List[list]) -> None:
+
+        self._writer.write_table(self._pa.Table.from_batches([self._batch(values)]))
+
+    def close(self) -> None:
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ArrowIPCWriter(_ArrowWriter):
+    """Writes an Arrow IPC file (also known as Feather V2), one record batch per batch
+    (requires pyarrow).
+
+    Args:
+        path (str): The path of the file to write.
+
+    Raises:
+        ImportError: pyarrow isn't installed.
+    """
+
+    def __init__(self, path: str):
+
+        super().__init__()
+
+        self.path = path
+
+        self._sink: Any = None
+        self._writer: Any = None
+
+    def open(self, columns: List[Column]) -> None:
+
+        super().open(columns)
+        self._sink = self._pa.OSFile(self.path, 'wb')
+        self._writer = self._pa.ipc.new_file(self._sink, self._schema)
+
+    def write_batch(self, values: List[list]) -> None:
+
+        self._writer.write_batch(self._batch(values))
+
+    def close(self) -> None:
+
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+
+
+class ColumnarExporter:
+    """Streams a PCO collection into a columnar file with a fixed schema.
+
+    Records are read page by page with iterate_pages(), flattened into the export's
+    columns (see Column), and handed to the writer in batches as soon as batch_size rows
+    (rounded up to whole pages) are buffered, so memory use is bounded by the batch
+    size, not by the size of the collection.
+
+        >>> exporter = ColumnarExporter(pco, [
+        >>>     Column('id', type='int'),
+        >>>     Column('first_name'),
+        >>>     Column('last_name'),
+        >>>     Column('updated_at', type='timestamp'),
+        >>>     Column('emails', 'address', include='Email', join=';'),
+        >>> ])
+        >>> exporter.export('/people/v2/people', ParquetWriter('people.parquet'), include='emails')
+
+    Args:
+        pco (PCO): The PCO object used to make requests.
+        columns (list): The columns of the export.
+        batch_size (int): The number of rows buffered before they are written. Default
+            10000.
+
+    Raises:
+        ValueError: No columns were given.
+    """
+
+    def __init__(self, pco: PCO, columns: Sequence[Column], batch_size: int = 10000):
+
+        if not columns:
+            raise ValueError('An export needs at least one column.')
+
+        self.pco = pco
+        self.columns = list(columns)
+        self.batch_size = batch_size
+
+    def export(
+            self,
+            url: str,
+            writer: ExportWriter,
+            per_page: int = 100,
+            prefetch: bool = False,
+            **params: str
+        ) -> int:
+        """Export the records of a collection.
+
+        The writer is closed when the export ends, whether or not it succeeded.
+
+        Args:
+            url (str): The URL of the collection.
+            writer (ExportWriter): The writer, e.g. a ParquetWriter or CSVWriter.
+            per_page (int): The number of records to request per page. Default 100.
+            prefetch (bool): Fetch pages concurrently (see PCO.iterate()). Default False.
+            params: Any additional named arguments will be passed as query parameters
+                (e.g. include="emails"). Values must be of type str!
+
+        Raises:
+            ValueError: A value can't be converted to its column's type.
+            PCORequestTimeoutException: The request to the PCO API timed out.
+            PCORequestException: The PCO API returned an error.
+            PCOUnexpectedRequestException: An unexpected error occurred while making the
+                request.
+
+        Returns:
+            int: The number of rows written.
+        """
+
+        needs_included = any(column.include is not None for column in self.columns)
+        buffered: List[list] = [[] for _ in self.columns]
+        rows = 0
+
+        writer.open(self.columns)
+
+        try:
+            for page in self.pco.iterate_pages(
+                    url, per_page=per_page, prefetch=prefetch, index_includes=needs_included,
+                    **params
+            ):
+                self._add_page(page, buffered, needs_included)
+
+                if len(buffered[0]) >= self.batch_size:
+                    rows += self._flush(writer, buffered)
+
+            rows += self._flush(writer, buffered)
+        finally:
+            writer.close()
+
+        return rows
+
+    def _add_page(self, page: Any, buffered: List[list], needs_included: bool) -> None:
+        """Flatten the records of a page into the buffered columns."""
+
+        for data in page['data']:
+            included = cast(IndexedPage, page).included_for(data) if needs_included else ()
+
+            for column, values in zip(self.columns, buffered):
+                values.append(column.value(data, included))
+
+    @staticmethod
+    def _flush(writer: ExportWriter, buffered: List[list]) -> int:
+        """Write the buffered rows, if any, and empty the buffer."""
+
+        rows = len(buffered[0])
+
+        if rows:
+            writer.write_batch(buffered[:])
+            buffered[:] = [[] for _ in buffered]
+
+        return rows
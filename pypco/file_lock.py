@@ -0,0 +1,60 @@
+"""Cross-process file locking used to share state between pypco processes."""
+
+import os
+import threading
+
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+    import msvcrt
+
+
+class FileLock:
+    """An exclusive lock on a file, held across threads and processes.
+
+    The lock file is created if it doesn't exist. The locked file object is handed to
+    the caller so that small amounts of shared state can be stored in the lock file
+    itself.
+
+    Args:
+        path (str): The path of the lock file.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+
+        # Locks are held per process on some platforms, so serialize threads ourselves
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def locked(self) -> Iterator[IO[bytes]]:
+        """Acquire the lock, blocking until it is available.
+
+        Yields:
+            file: The lock file, opened for reading and writing in binary mode.
+        """
+
+        with self._thread_lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+            with os.fdopen(fd, 'r+b') as lock_fh:
+                if fcntl is not None:
+                    fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX)
+                else:  # pragma: no cover
+                    msvcrt.locking(lock_fh.fileno(), msvcrt.LK_LOCK, 1)
+
+                try:
+                    yield lock_fh
+                finally:
+                    lock_fh.flush()
+
+                    if fcntl is not None:
+                        fcntl.flock(lock_fh.fileno(), fcntl.LOCK_UN)
+                    else:  # pragma: no cover
+                        lock_fh.seek(0)
+                        msvcrt.locking(lock_fh.fileno(), msvcrt.LK_UNLCK, 1)
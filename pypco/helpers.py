@@ -0,0 +1,37 @@
+"""Helpers shared by the PCO and AsyncPCO request pipelines."""
+
+import re
+
+from typing import Any, Optional
+
+
+def clean_url(url: str, api_base: str) -> str:
+    """Prefix a URL with the API base (if needed) and collapse repeated slashes.
+
+    Args:
+        url (str): The URL to clean.
+        api_base (str): The base URL against which REST calls will be made.
+
+    Returns:
+        str: The cleaned URL.
+    """
+
+    url = url if url.startswith(api_base) else f'{api_base}{url}'
+
+    return re.subn(r'(?<!:)[/]{2,}', '/', url)[0]
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:  # pylint: disable=unsubscriptable-object
+    """Get the wait (seconds) requested by a Retry-After header, if any.
+
+    Args:
+        headers (mapping): The response headers.
+
+    Returns:
+        float: The requested wait, or None if there is no (numeric) Retry-After header.
+    """
+
+    try:
+        return float(headers['Retry-After'])
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,367 @@
+"""Instrumentation of PCO requests: per-request events and aggregated metrics."""
+
+import bisect
+import logging
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$')
+
+_local = threading.local()
+
+
+def normalize_endpoint(url: str, api_base: str = '') -> str:
+    """Reduce a request URL to its endpoint, for grouping requests.
+
+    The API base and query string are removed and object ids are replaced by "{id}",
+    e.g. https://api.planningcenteronline.com/people/v2/people/123/emails?per_page=25
+    becomes /people/v2/people/{id}/emails.
+
+    Args:
+        url (str): The request URL.
+        api_base (str): The base URL of the API.
+
+    Returns:
+        str: The endpoint.
+    """
+
+    if api_base and url.startswith(api_base):
+        url = url[len(api_base):]
+
+    path = urlsplit(url).path if '://' in url else url.split('?', 1)[0]
+
+    return '/'.join(
+        '{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')
+    )
+
+
+class RequestEvent:  # pylint: disable=too-many-instance-attributes
+    """A request made through a PCO object, as reported to request listeners.
+
+    The event is created when the request starts, and its attributes are filled in as
+    the request passes through pypco's request layers. Retries and rate limit pauses
+    are part of the same event.
+
+    Attributes:
+        method (str): The HTTP method.
+        url (str): The URL as passed to pypco.
+        endpoint (str): The normalized endpoint (see normalize_endpoint()).
+        started (float): When the request started (time.time()).
+        status (int): The HTTP status of the final response, or None if there was none.
+        bytes_sent (int): The size of the request bodies sent.
+        bytes_received (int): The size of the response bodies received.
+        attempts (int): The number of HTTP requests made (including retries after
+            timeouts, errors, 401s, and 429s).
+        retries (int): The number of attempts retried after timeouts or errors.
+        rate_limited (int): The number of rate limited (429) responses received.
+        rate_limit_wait (float): Seconds spent waiting for the client-side rate limiter or
+            after rate limited responses.
+        network_time (float): Seconds spent making HTTP requests.
+        decode_time (float): Seconds spent decoding JSON responses.
+        elapsed (float): Total seconds spent on the request (set when it ends).
+        cached (bool): Whether the response body came from the response cache.
+        error (Exception): The exception the request raised, if any.
+    """
+
+    __slots__ = (
+        'method', 'url', 'endpoint', 'started', 'status', 'bytes_sent', 'bytes_received',
+        'attempts', 'retries', 'rate_limited', 'rate_limit_wait', 'network_time',
+        'decode_time', 'elapsed', 'cached', 'error', '_start'
+    )
+
+    def __init__(self, method: str, url: str, endpoint: str):
+
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.started = time.time()
+        self.status: Optional[int] = None  # pylint: disable=unsubscriptable-object
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.attempts = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.rate_limit_wait = 0.0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.elapsed = 0.0
+        self.cached = False
+        self.error: Optional[BaseException] = None  # pylint: disable=unsubscriptable-object
+        self._start = time.perf_counter()
+
+    def __repr__(self) -> str:
+
+        return f'RequestEvent({self.method} {self.endpoint}, status={self.status}, ' \
+            f'elapsed={self.elapsed:.3f})'
+
+
+class RequestListener:
+    """The base class for request listeners, which are notified of every request.
+
+    Listeners are called on the thread making the request, so they should be quick and
+    thread-safe. Exceptions raised by listeners are logged and otherwise ignored.
+    """
+
+    def request_started(self, event: RequestEvent) -> None:
+        """Called when a request starts.
+
+        Args:
+            event (RequestEvent): The request.
+        """
+
+    def request_finished(self, event: RequestEvent) -> None:
+        """Called when a request has completed or failed.
+
+        Args:
+            event (RequestEvent): The request, with all its attributes filled in.
+        """
+
+
+def current_event() -> Optional[RequestEvent]:  # pylint: disable=unsubscriptable-object
+    """Get the event of the instrumented request in progress on this thread, if any."""
+
+    return getattr(_local, 'event', None)
+
+
+@contextmanager
+def instrumented(
+        listeners: Sequence[RequestListener],
+        method: str,
+        url: str,
+        api_base: str = ''
+) -> Iterator[Optional[RequestEvent]]:  # pylint: disable=unsubscriptable-object
+    """Report a request to listeners, making its event available to the request layers.
+
+    Nested calls on the same thread (e.g. request_response() called by request_json())
+    share the outer call's event.
+
+    Args:
+        listeners (list): The listeners to notify.
+        method (str): The HTTP method.
+        url (str): The URL of the request.
+        api_base (str): The base URL of the API.
+
+    Yields:
+        RequestEvent: The event, or None if there are no listeners.
+    """
+
+    event = current_event()
+
+    if event is not None or not listeners:
+        yield event
+        return
+
+    event = RequestEvent(method, url, normalize_endpoint(url, api_base))
+    _local.event = event
+    _notify(listeners, 'request_started', event)
+
+    try:
+        yield event
+    except BaseException as err:
+        event.error = err
+        raise
+    finally:
+        event.elapsed = time.perf_counter() - event._start  # pylint: disable=protected-access
+        _local.event = None
+        _notify(listeners, 'request_finished', event)
+
+
+def _notify(listeners: Sequence[RequestListener], name: str, event: RequestEvent) -> None:
+    """Call a listener method on every listener, logging exceptions."""
+
+    for listener in listeners:
+        try:
+            getattr(listener, name)(event)
+        except Exception:  # pylint: disable=broad-except
+            logging.getLogger(__name__).exception("Request listener %r failed.", listener)
+
+
+class EndpointMetrics:  # pylint: disable=too-many-instance-attributes
+    """Aggregated metrics of the requests to one endpoint.
+
+    Attributes:
+        count (int): The number of requests.
+        errors (int): The number of requests that raised an exception.
+        statuses (dict): The number of final responses per HTTP status.
+        total_time (float): Total seconds spent on the requests.
+        network_time (float): Seconds spent making HTTP requests.
+        rate_limit_wait (float): Seconds spent waiting for rate limits.
+        decode_time (float): Seconds spent decoding JSON responses.
+        retries (int): The number of retries after timeouts or errors.
+        rate_limited (int): The number of rate limited (429) responses.
+        bytes_sent (int): Total request body bytes.
+        bytes_received (int): Total response body bytes.
+        buckets (list): Request counts per latency bucket (see BUCKETS).
+    """
+
+    # Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+    BUCKETS = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+    )
+
+    def __init__(self):
+
+        self.count = 0
+        self.errors = 0
+        self.statuses: Dict[int, int] = {}
+        self.total_time = 0.0
+        self.network_time = 0.0
+        self.rate_limit_wait = 0.0
+        self.decode_time = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def add(self, event: RequestEvent) -> None:
+        """Add a finished request to the metrics."""
+
+        self.count += 1
+        self.errors += event.error is not None
+
+        if event.status is not None:
+            self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+
+        self.total_time += event.elapsed
+        self.network_time += event.network_time
+        self.rate_limit_wait += event.rate_limit_wait
+        self.decode_time += event.decode_time
+        self.retries += event.retries
+        self.rate_limited += event.rate_limited
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.buckets[bisect.bisect_left(self.BUCKETS, event.elapsed)] += 1
+
+    @property
+    def mean(self) -> float:
+        """float: The mean latency in seconds."""
+
+        return self.total_time / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Estimate a latency percentile from the histogram.
+
+        Args:
+            percent (float): The percentile (0 - 100).
+
+        Returns:
+            float: The upper bound (seconds) of the bucket containing the percentile, or
+            infinity if it is in the unbounded bucket.
+        """
+
+        if not self.count:
+            return 0.0
+
+        rank = percent / 100 * self.count
+        seen = 0
+
+        for index, count in enumerate(self.buckets):
+            seen += count
+
+            if count and seen >= rank:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else float('inf')
+
+        return float('inf')  # pragma: no cover
+
+
+class RequestMetrics(RequestListener):
+    """A request listener aggregating metrics and latency histograms per endpoint.
+
+    Requests are grouped by method and normalized endpoint (e.g. "GET
+    /people/v2/people/{id}"), so you can see where the time goes: on the network, waiting
+    for rate limits, or decoding responses.
+
+        >>> metrics = RequestMetrics()
+        >>> pco = PCO('app_id', 'secret', listeners=[metrics])
+        >>> ...
+        >>> print(metrics.report())
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+
+    def request_finished(self, event: RequestEvent) -> None:
+
+        key = (event.method, event.endpoint)
+
+        with self._lock:
+            metrics = self._endpoints.get(key)
+
+            if metrics is None:
+                metrics = self._endpoints[key] = EndpointMetrics()
+
+            metrics.add(event)
+
+    def snapshot(self) -> Dict[Tuple[str, str], EndpointMetrics]:
+        """Get the metrics collected so far.
+
+        Returns:
+            dict: The metrics of each endpoint, keyed by (method, endpoint).
+        """
+
+        with self._lock:
+            snapshot = {}
+
+            for key, metrics in self._endpoints.items():
+                copy = EndpointMetrics()
+                copy.__dict__.update(metrics.__dict__)
+                copy.statuses = dict(metrics.statuses)
+                copy.buckets = list(metrics.buckets)
+                snapshot[key] = copy
+
+            return snapshot
+
+    def reset(self) -> None:
+        """Discard the metrics collected so far."""
+
+        with self._lock:
+            self._endpoints.clear()
+
+    def report(self) -> str:
+        """Format the metrics as a table, slowest endpoints (by total time) first.
+
+        Returns:
+            str: The table.
+        """
+
+        rows: List[Tuple[str, ...]] = [(
+            'endpoint', 'count', 'errors', 'total s', 'mean ms', 'p50 ms', 'p95 ms', 'p99 ms',
+            'network s', 'rate limit s', 'decode s', 'retries', 'MB in'
+        )]
+
+        snapshot = sorted(self.snapshot().items(), key=lambda item: -item[1].total_time)
+
+        for (method, endpoint), metrics in snapshot:
+            rows.append((
+                f'{method} {endpoint}',
+                str(metrics.count),
+                str(metrics.errors),
+                f'{metrics.total_time:.2f}',
+                f'{metrics.mean * 1000:.1f}',
+                f'{metrics.percentile(50) * 1000:.0f}',
+                f'{metrics.percentile(95) * 1000:.0f}',
+                f'{metrics.percentile(99) * 1000:.0f}',
+                f'{metrics.network_time:.2f}',
+                f'{metrics.rate_limit_wait:.2f}',
+                f'{metrics.decode_time:.2f}',
+                str(metrics.retries),
+                f'{metrics.bytes_received / 1e6:.2f}',
+            ))
+
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+
+        return '\n'.join(
+            '  '.join(
+                value.ljust(width) if column == 0 else value.rjust(width)
+                for column, (value, width) in enumerate(zip(row, widths))
+            ).rstrip()
+            for row in rows
+        )
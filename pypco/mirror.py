@@ -0,0 +1,257 @@
+"""A local SQLite mirror of PCO collections, refreshed incrementally."""
+
+import json
+import re
+import sqlite3
+import threading
+
+from typing import Any, List, Optional, Tuple
+
+from .pco import PCO
+from .sync import CheckpointStore, IncrementalSync, SyncCheckpoint
+
+_TABLE_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# The mirror's own tables; SQLite table names are case-insensitive
+_RESERVED_TABLES = {'included', 'mirror_checkpoints'}
+
+
+class SQLiteMirror:
+    """Copies PCO collections into local SQLite tables for querying without the API.
+
+    Each mirrored collection gets a table with "id", "type", "updated_at", and
+    "attributes" columns; attributes are stored as JSON, so they can be queried with
+    SQLite's JSON functions (e.g. json_extract(attributes, '$.last_name')). Its
+    relationships are stored in a "<table>_relationships" join table with "id",
+    "relationship", "related_type", and "related_id" columns. Objects included in the
+    responses (see the include parameter) are stored in the shared "included" table,
+    keyed by type and id.
+
+    Refreshes are incremental (see IncrementalSync): only records updated since the last
+    refresh are requested. Each page of records is written with batched executemany()
+    statements in a single transaction together with the refresh checkpoint, so the
+    mirror is always consistent with its checkpoint, even if a refresh is interrupted.
+
+    Note:
+        Incremental refreshes can't detect deleted records. Use refresh(full=True)
+        periodically to rebuild a table from scratch.
+
+    Args:
+        pco (PCO): The PCO object used to make requests.
+        path (str): The path of the SQLite database. It will be created if it doesn't
+            exist.
+    """
+
+    def __init__(self, pco: PCO, path: str):
+
+        self.pco = pco
+        self.path = path
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS mirror_checkpoints ('
+                'key TEXT PRIMARY KEY, updated_at TEXT NOT NULL, ids TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS included ('
+                'type TEXT NOT NULL, id TEXT NOT NULL, attributes TEXT NOT NULL, '
+                'PRIMARY KEY (type, id))'
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+
+        with self._lock:
+            self._conn.close()
+
+    def refresh(
+            self,
+            table: str,
+            url: str,
+            full: bool = False,
+            per_page: int = 100,
+            **params: str
+        ) -> int:
+        """Copy the records of a collection that changed since the last refresh.
+
+        Args:
+            table (str): The name of the table in which to store the collection's
+                records. Letters, digits, and underscores only. The mirror's own tables
+                ("included" and "mirror_checkpoints"), names ending in "_relationships",
+                and names starting with "sqlite_" are reserved.
+            url (str): The URL of the collection. The collection must support ordering
+                and filtering by updated_at.
+            full (bool): Discard the table's records and checkpoint, and copy the whole
+                collection again. Default False.
+            per_page (int): The number of records to request per page. Default 100.
+            params: Any additional named arguments will be passed as query parameters
+                (e.g. include="emails"). Values must be of type str!
+
+        Raises:
+            ValueError: The table name is invalid or reserved.
+            PCORequestTimeoutException: The request to the PCO API timed out.
+            PCORequestException: The PCO API returned an error.
+            PCOUnexpectedRequestException: An unexpected error occurred while making the
+                request.
+
+        Returns:
+            int: The number of records written.
+        """
+
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f'Invalid table name: {table!r}')
+
+        name = table.lower()
+
+        if name in _RESERVED_TABLES or name.startswith('sqlite_') or \
+                name.endswith('_relationships'):
+            raise ValueError(f'Reserved table name: {table!r}')
+
+        store = _MirrorCheckpointStore(self, table)
+
+        with self._lock, self._conn:
+            self._create_table(table)
+
+            if full:
+                self._conn.execute(f'DELETE FROM "{table}"')
+                self._conn.execute(f'DELETE FROM "{table}_relationships"')
+                self._conn.execute(
+                    'DELETE FROM mirror_checkpoints WHERE substr(key, 1, ?) = ?',
+                    (len(table) + 1, f'{table} ')
+                )
+
+        sync = IncrementalSync(self.pco, store)
+
+        return sync.run(url, store.add, per_page=per_page, **params)
+
+    def query(self, sql: str, parameters: Any = ()) -> List[sqlite3.Row]:
+        """Run a query against the mirror.
+
+        Args:
+            sql (str): The SQL statement.
+            parameters (tuple or dict): Parameters for the statement's placeholders.
+
+        Returns:
+            list: The resulting rows (sqlite3.Row objects, accessible by column name).
+        """
+
+        with self._lock:
+            return self._conn.execute(sql, parameters).fetchall()
+
+    def _create_table(self, table: str) -> None:
+        """Create a collection's tables if they don't exist."""
+
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            'id TEXT PRIMARY KEY, type TEXT NOT NULL, updated_at TEXT, '
+            'attributes TEXT NOT NULL)'
+        )
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}_relationships" ('
+            'id TEXT NOT NULL, relationship TEXT NOT NULL, related_type TEXT NOT NULL, '
+            'related_id TEXT NOT NULL, '
+            'PRIMARY KEY (id, relationship, related_type, related_id))'
+        )
+        self._conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "{table}_relationships_related" '
+            f'ON "{table}_relationships" (related_type, related_id)'
+        )
+
+    def _write(self, table: str, records: List[dict], key: str,
+               checkpoint: SyncCheckpoint) -> None:
+        """Write a batch of records and the checkpoint covering them in one transaction."""
+
+        rows = []
+        relationships: List[Tuple[str, str, str, str]] = []
+        included = {}
+
+        for record in records:
+            data = record['data']
+            attributes = data.get('attributes', {})
+
+            rows.append((
+                data['id'], data['type'], attributes.get('updated_at'), json.dumps(attributes)
+            ))
+
+            for name, relationship in data.get('relationships', {}).items():
+                related = relationship.get('data')
+
+                if related is None:
+                    continue
+
+                if isinstance(related, dict):
+                    related = [related]
+
+                relationships.extend(
+                    (data['id'], name, item['type'], item['id']) for item in related
+                )
+
+            for include in record['included']:
+                included[(include['type'], include['id'])] = \
+                    json.dumps(include.get('attributes', {}))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f'DELETE FROM "{table}_relationships" WHERE id = ?',
+                [(row[0],) for row in rows]
+            )
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{table}" (id, type, updated_at, attributes) '
+                'VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self._conn.executemany(
+                f'INSERT OR IGNORE INTO "{table}_relationships" '
+                '(id, relationship, related_type, related_id) VALUES (?, ?, ?, ?)',
+                relationships
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO included (type, id, attributes) VALUES (?, ?, ?)',
+                [(type_, id_, attributes) for (type_, id_), attributes in included.items()]
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO mirror_checkpoints (key, updated_at, ids) '
+                'VALUES (?, ?, ?)',
+                (key, checkpoint.updated_at, json.dumps(sorted(checkpoint.ids)))
+            )
+
+
+class _MirrorCheckpointStore(CheckpointStore):
+    """Buffers a page of records and writes them together with the page's checkpoint."""
+
+    def __init__(self, mirror: SQLiteMirror, table: str):
+
+        self._mirror = mirror
+        self._table = table
+        self._records: List[dict] = []
+
+    def _key(self, key: str) -> str:
+
+        return f'{self._table} {key}'
+
+    def add(self, record: dict) -> None:
+        """Buffer a record until the next checkpoint is saved."""
+
+        self._records.append(record)
+
+    def load(self, key: str) -> Optional[SyncCheckpoint]:  # pylint: disable=unsubscriptable-object
+
+        rows = self._mirror.query(
+            'SELECT updated_at, ids FROM mirror_checkpoints WHERE key = ?', (self._key(key),)
+        )
+
+        if not rows:
+            return None
+
+        return SyncCheckpoint(rows[0]['updated_at'], json.loads(rows[0]['ids']))
+
+    def save(self, key: str, checkpoint: SyncCheckpoint) -> None:
+
+        self._mirror._write(  # pylint: disable=protected-access
+            self._table, self._records, self._key(key), checkpoint
+        )
+        self._records = []
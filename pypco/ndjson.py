@@ -0,0 +1,428 @@
+"""Resumable exports of PCO collections to compressed NDJSON files."""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .codec import StdlibJSONCodec
+from .file_lock import FileLock
+from .pco import PCO
+from .records import iterate_page_records
+
+# Compression formats (None for uncompressed files)
+COMPRESSIONS = ('gzip', 'zstd', None)
+
+
+def _gzip_compressor(level: int) -> Callable[[bytes], bytes]:
+    """Compress chunks as independent gzip members."""
+
+    return lambda data: gzip.compress(data, compresslevel=level)
+
+
+def _zstd_compressor(level: int) -> Callable[[bytes], bytes]:
+    """Compress chunks as independent zstd frames (requires zstandard)."""
+
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "zstd compression requires the zstandard package. Install it with "
+            "`pip install pypco[zstd]`."
+        ) from err
+
+    return zstandard.ZstdCompressor(level=level).compress
+
+
+class ExportCheckpoint:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """How far an NDJSON export has progressed.
+
+    Attributes:
+        url (str): The URL of the exported collection.
+        params (dict): The query parameters of the export.
+        offset (int): The offset of the next record to export.
+        last_id (str): The id of the last record exported, or None.
+        file_index (int): The number of the file being written.
+        file_size (int): The size (bytes) of the file being written, up to the end of
+            the last page exported.
+        records (int): The number of records exported.
+        complete (bool): Whether the export has finished.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            url: str,
+            params: Dict[str, str],
+            offset: int = 0,
+            last_id: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            file_index: int = 0,
+            file_size: int = 0,
+            records: int = 0,
+            complete: bool = False,
+    ):
+
+        self.url = url
+        self.params = params
+        self.offset = offset
+        self.last_id = last_id
+        self.file_index = file_index
+        self.file_size = file_size
+        self.records = records
+        self.complete = complete
+
+    def __repr__(self) -> str:
+
+        return f'ExportCheckpoint({self.url!r}, offset={self.offset}, ' \
+            f'last_id={self.last_id!r}, records={self.records}, complete={self.complete})'
+
+    def to_dict(self) -> dict:
+        """Convert the checkpoint to a JSON serializable dict."""
+
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, value: dict) -> 'ExportCheckpoint':
+        """Create a checkpoint from a dict created by to_dict()."""
+
+        return cls(**value)
+
+
+class NDJSONExporter:  # pylint: disable=too-many-instance-attributes
+    """Exports a PCO collection to compressed NDJSON files, resuming after interruptions.
+
+    Each line of the files is a record in the form yielded by PCO.iterate() (with
+    "data", "included", and "meta" nodes). Files are named <prefix>-00000.ndjson.gz,
+    <prefix>-00001.ndjson.gz, and so on; a new file is started when the current one
+    would grow past max_file_size.
+
+    Each page is compressed on its own (as a gzip member or zstd frame; concatenated,
+    they form a valid stream that standard tools decompress), appended and flushed to
+    disk, and then a checkpoint is saved to <prefix>.checkpoint.json. When an export is
+    run again after an interruption, anything written after the last checkpoint is
+    truncated and the export continues with the next page. The id of the last record
+    exported is checked against the collection, so records inserted before the
+    checkpoint's offset since the interruption aren't exported twice.
+
+    Note:
+        Exports page through collections by offset. Records deleted during an export
+        (or while it's interrupted) can shift other records to already exported
+        offsets; a warning is logged on resume when that's detected.
+
+        An export holds a lock on its checkpoint, so a second export with the same
+        directory and prefix waits for the first one to finish.
+
+    Args:
+        pco (PCO): The PCO object used to make requests. Its json_codec, if any, is used
+            to encode records.
+        directory (str): The directory of the files. It will be created if it doesn't
+            exist.
+        prefix (str): The prefix of the file names. Default "export".
+        compression (str): "gzip", "zstd" (requires `pip install pypco[zstd]`), or None
+            for uncompressed files. Default "gzip".
+        max_file_size (int): The size (bytes) after which a new file is started. Files
+            hold at least one page. Default 256 MiB.
+        level (int): The compression level. Default: 6 for gzip, 3 for zstd.
+
+    Raises:
+        ValueError: The compression is unknown.
+        ImportError: zstd compression was requested and zstandard isn't installed.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            pco: PCO,
+            directory: str,
+            prefix: str = 'export',
+            compression: Optional[str] = 'gzip',  # pylint: disable=unsubscriptable-object
+            max_file_size: int = 256 * 1024 * 1024,
+            level: Optional[int] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f'Unknown compression {compression!r}; expected one of {COMPRESSIONS}.'
+            )
+
+        self._log = logging.getLogger(__name__)
+
+        self.pco = pco
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_file_size = max_file_size
+
+        if compression == 'gzip':
+            self._compress: Callable[[bytes], bytes] = _gzip_compressor(6 if level is None else level)
+            self._extension = '.ndjson.gz'
+        elif compression == 'zstd':
+            self._compress = _zstd_compressor(3 if level is None else level)
+            self._extension = '.ndjson.zst'
+        else:
+            self._compress = bytes
+            self._extension = '.ndjson'
+
+        self.checkpoint_path = os.path.join(directory, f'{prefix}.checkpoint.json')
+        self._file_lock = FileLock(f'{self.checkpoint_path}.lock')
+
+    def file_path(self, index: int) -> str:
+        """Get the path of an export file.
+
+        Args:
+            index (int): The number of the file.
+
+        Returns:
+            str: The path.
+        """
+
+        return os.path.join(self.directory, f'{self.prefix}-{index:05d}{self._extension}')
+
+    def files(self) -> List[str]:
+        """Get the paths of the export's files, in order.
+
+        Returns:
+            list: The paths.
+        """
+
+        pattern = re.compile(rf'^{re.escape(self.prefix)}-(\d{{5}}){re.escape(self._extension)}$')
+
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if pattern.match(name))
+        except FileNotFoundError:
+            return []
+
+        return [os.path.join(self.directory, name) for name in names]
+
+    def load_checkpoint(self) -> Optional[ExportCheckpoint]:  # pylint: disable=unsubscriptable-object
+        """Load the export's checkpoint.
+
+        Returns:
+            ExportCheckpoint: The checkpoint, or None if the export hasn't started.
+        """
+
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as checkpoint_fh:
+                return ExportCheckpoint.from_dict(json.load(checkpoint_fh))
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, checkpoint: ExportCheckpoint) -> None:
+        """Atomically replace the checkpoint file."""
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.pypco-export-')
+
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as temp_fh:
+                json.dump(checkpoint.to_dict(), temp_fh)
+                temp_fh.flush()
+                os.fsync(temp_fh.fileno())
+
+            os.replace(temp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def export(
+            self,
+            url: str,
+            per_page: int = 100,
+            restart: bool = False,
+            **params: str
+        ) -> int:
+        """Export a collection, continuing an interrupted export if there is one.
+
+        Args:
+            url (str): The URL of the collection.
+            per_page (int): The number of records to request per page. Default 100.
+            restart (bool): Discard the files and checkpoint of an earlier export and
+                start again. Default False.
+            params: Any additional named arguments will be passed as query parameters
+                (e.g. include="emails"). Values must be of type str!
+
+        Raises:
+            ValueError: The files belong to an export of a different URL or parameters;
+                pass restart=True to replace them.
+            PCORequestTimeoutException: The request to the PCO API timed out.
+            PCORequestException: The PCO API returned an error.
+            PCOUnexpectedRequestException: An unexpected error occurred while making the
+                request.
+
+        Returns:
+            int: The number of records exported by this call (0 if the export had
+            already finished).
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        with self._file_lock.locked():
+            checkpoint = None if restart else self.load_checkpoint()
+
+            if checkpoint is None:
+                for path in self.files():
+                    os.unlink(path)
+
+                checkpoint = ExportCheckpoint(url, params)
+                self._save_checkpoint(checkpoint)
+            elif (checkpoint.url, checkpoint.params) != (url, params):
+                raise ValueError(
+                    f'{self.checkpoint_path} belongs to an export of {checkpoint.url} with '
+                    f'{checkpoint.params}; pass restart=True to replace it.'
+                )
+
+            if checkpoint.complete:
+                return 0
+
+            self._discard_uncheckpointed(checkpoint)
+
+            return self._export_pages(checkpoint, per_page)
+
+    def _discard_uncheckpointed(self, checkpoint: ExportCheckpoint) -> None:
+        """Remove anything written after the checkpoint was saved."""
+
+        for path in self.files():
+            index = int(os.path.basename(path)[len(self.prefix) + 1:][:5])
+
+            if index > checkpoint.file_index:
+                os.unlink(path)
+
+        path = self.file_path(checkpoint.file_index)
+
+        if os.path.exists(path) and os.path.getsize(path) > checkpoint.file_size:
+            self._log.debug("Truncating \"%s\" to the checkpoint (%d bytes).",
+                            path, checkpoint.file_size)
+
+            with open(path, 'r+b') as export_fh:
+                export_fh.truncate(checkpoint.file_size)
+
+    def _export_pages(self, checkpoint: ExportCheckpoint, per_page: int) -> int:
+        """Export pages from the checkpoint onwards, saving a checkpoint after each."""
+
+        codec = self.pco.json_codec or StdlibJSONCodec()
+        exported = 0
+
+        # Start one record early to check that the last exported record hasn't moved
+        resume_id = checkpoint.last_id
+        offset = checkpoint.offset - 1 if resume_id is not None else checkpoint.offset
+
+        while True:
+            page = self.pco.get(checkpoint.url, offset=offset, per_page=per_page,
+                                **checkpoint.params)
+
+            if page is None:
+                break
+
+            data = page['data']
+            records: List[Any] = list(iterate_page_records(page))
+
+            if resume_id is not None:
+                records = self._skip_exported(records, resume_id)
+                resume_id = None
+
+            offset += len(data)
+
+            if records:
+                chunk = self._compress(
+                    b''.join(codec.encode(record) + b'\n' for record in records)
+                )
+                self._append(checkpoint, chunk)
+
+            checkpoint.offset = offset
+            checkpoint.last_id = data[-1]['id'] if data else checkpoint.last_id
+            checkpoint.records += len(records)
+            exported += len(records)
+
+            if not data or 'next' not in page['links']:
+                checkpoint.complete = True
+
+            self._save_checkpoint(checkpoint)
+
+            if checkpoint.complete:
+                break
+
+        return exported
+
+    def _skip_exported(self, records: List[dict], resume_id: str) -> List[dict]:
+        """Drop the records of the first resumed page up to the last exported record."""
+
+        ids = [record['data']['id'] for record in records]
+
+        if resume_id in ids:
+            return records[ids.index(resume_id) + 1:]
+
+        self._log.warning(
+            "The last exported record (%s) has moved since the export was interrupted; "
+            "records deleted in the meantime may have caused others to be skipped.",
+            resume_id
+        )
+
+        return records
+
+    def _append(self, checkpoint: ExportCheckpoint, chunk: bytes) -> None:
+        """Append a compressed page to the current file, rotating it if it's full."""
+
+        if checkpoint.file_size and checkpoint.file_size + len(chunk) > self.max_file_size:
+            checkpoint.file_index += 1
+            checkpoint.file_size = 0
+
+        with open(self.file_path(checkpoint.file_index), 'ab') as export_fh:
+            export_fh.write(chunk)
+            export_fh.flush()
+            os.fsync(export_fh.fileno())
+
+        checkpoint.file_size += len(chunk)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pylint: disable=unsubscriptable-object
+    """Export a collection to NDJSON files from the command line.
+
+    Credentials are read from the PCO_APP_ID and PCO_SECRET environment variables,
+    or PCO_TOKEN for an OAuth token. PCO_APPLICATION_ID is still accepted in place
+    of PCO_APP_ID.
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Export a PCO collection to compressed NDJSON files, resuming an '
+                    'interrupted export.',
+        epilog='Credentials are read from the PCO_APP_ID and PCO_SECRET environment '
+               'variables, or PCO_TOKEN for an OAuth token.'
+    )
+    parser.add_argument('url', help='The URL of the collection, e.g. /people/v2/people.')
+    parser.add_argument('directory', help='The directory of the export files.')
+    parser.add_argument('--prefix', default='export')
+    parser.add_argument('--compression', choices=['gzip', 'zstd', 'none'], default='gzip')
+    parser.add_argument('--max-file-size', type=int, default=256, help='In MiB.')
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--include', help='Includes to request, e.g. emails,addresses.')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard an earlier export and start again.')
+    parser.add_argument('--api-base', default='https://api.planningcenteronline.com')
+    args = parser.parse_args(argv)
+
+    pco = PCO(
+        os.environ.get('PCO_APP_ID') or os.environ.get('PCO_APPLICATION_ID'),
+        os.environ.get('PCO_SECRET'),
+        os.environ.get('PCO_TOKEN'),
+        api_base=args.api_base,
+    )
+    exporter = NDJSONExporter(
+        pco,
+        args.directory,
+        prefix=args.prefix,
+        compression=None if args.compression == 'none' else args.compression,
+        max_file_size=args.max_file_size * 1024 * 1024,
+    )
+
+    params = {'include': args.include} if args.include else {}
+    exported = exporter.export(args.url, per_page=args.per_page, restart=args.restart, **params)
+    checkpoint = exporter.load_checkpoint()
+
+    print(f'Exported {exported} records ({checkpoint.records if checkpoint else 0} in total) '
+          f'to {len(exporter.files())} files in {args.directory}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,676 @@
+"""Managed OAuth tokens, refreshed ahead of expiry and shared between processes."""
+
+import abc
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .exceptions import PCOCredentialsException
+from .file_lock import FileLock
+from .pco import PCO
+from .user_auth_helpers import get_oauth_refresh_token
+
+
+class OAuthToken:
+    """A user's OAuth access token and the refresh token with which to renew it.
+
+    Args:
+        access_token (str): The access token.
+        refresh_token (str): The refresh token.
+        expires_at (float): When the access token expires, in seconds since the epoch.
+        scope (str): The scopes granted to the token, separated by spaces.
+    """
+
+    __slots__ = ('access_token', 'refresh_token', 'expires_at', 'scope')
+
+    def __init__(self, access_token: str, refresh_token: str, expires_at: float, scope: str = ''):
+
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+        self.scope = scope
+
+    def __eq__(self, other: object) -> bool:
+
+        return isinstance(other, OAuthToken) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+
+        return f'OAuthToken(expires_at={self.expires_at!r}, scope={self.scope!r})'
+
+    @classmethod
+    def from_response(cls, response: dict) -> 'OAuthToken':
+        """Create a token from the response of the PCO OAuth token endpoint.
+
+        Args:
+            response (dict): The response returned by get_oauth_access_token() or
+                get_oauth_refresh_token().
+
+        Returns:
+            OAuthToken: The token.
+        """
+
+        created_at = response.get('created_at') or time.time()
+
+        return cls(
+            response['access_token'],
+            response['refresh_token'],
+            float(created_at) + float(response.get('expires_in', 7200)),
+            response.get('scope', ''),
+        )
+
+    def to_dict(self) -> dict:
+        """Convert the token to a JSON serializable dict."""
+
+        return {
+            'access_token': self.access_token,
+            'refresh_token': self.refresh_token,
+            'expires_at': self.expires_at,
+            'scope': self.scope,
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict) -> 'OAuthToken':
+        """Create a token from a dict created by to_dict()."""
+
+        return cls(value['access_token'], value['refresh_token'], value['expires_at'],
+                   value.get('scope', ''))
+
+    def expires_within(self, seconds: float) -> bool:
+        """Check whether the access token expires within the given number of seconds."""
+
+        return self.expires_at - time.time() <= seconds
+
+
+class TokenStore(abc.ABC):
+    """The base class for OAuth token storage.
+
+    Besides storing tokens, a store hands out leases so that only one refresh of a token
+    is in flight at a time, even between processes sharing the store: a refresh is only
+    made by the holder of the token's lease. Leases expire, so a process that dies while
+    refreshing doesn't block the token forever.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[OAuthToken]:  # pylint: disable=unsubscriptable-object
+        """Get a token.
+
+        Args:
+            key (str): The key identifying the token (e.g. the user's id).
+
+        Returns:
+            OAuthToken: The token, or None if there is no token with this key.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: str, token: OAuthToken) -> None:
+        """Store a token, releasing its lease.
+
+        Args:
+            key (str): The key identifying the token.
+            token (OAuthToken): The token.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Discard a token.
+
+        Args:
+            key (str): The key identifying the token.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def keys(self) -> List[str]:
+        """Get the keys of all stored tokens."""
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def claim(self, key: str, owner: str, duration: float) -> bool:
+        """Take a token's lease, unless someone else holds it.
+
+        Args:
+            key (str): The key identifying the token.
+            owner (str): Identifies the lease holder.
+            duration (float): How long (seconds) the lease is held unless released.
+
+        Returns:
+            bool: True if the lease was taken.
+        """
+
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def release(self, key: str, owner: str) -> None:
+        """Give up a token's lease, if held by owner.
+
+        Args:
+            key (str): The key identifying the token.
+            owner (str): Identifies the lease holder.
+        """
+
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """Tokens stored in memory, shared by the threads of a single process."""
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, OAuthToken] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, key: str) -> Optional[OAuthToken]:  # pylint: disable=unsubscriptable-object
+
+        with self._lock:
+            return self._tokens.get(key)
+
+    def set(self, key: str, token: OAuthToken) -> None:
+
+        with self._lock:
+            self._tokens[key] = token
+            self._leases.pop(key, None)
+
+    def delete(self, key: str) -> None:
+
+        with self._lock:
+            self._tokens.pop(key, None)
+            self._leases.pop(key, None)
+
+    def keys(self) -> List[str]:
+
+        with self._lock:
+            return list(self._tokens)
+
+    def claim(self, key: str, owner: str, duration: float) -> bool:
+
+        with self._lock:
+            lease = self._leases.get(key)
+
+            if lease is not None and lease[0] != owner and lease[1] > time.time():
+                return False
+
+            self._leases[key] = (owner, time.time() + duration)
+
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+
+class FileTokenStore(TokenStore):
+    """Tokens stored durably in a JSON file shared between processes.
+
+    The file is replaced atomically on every change, and changes are serialized between
+    threads and processes with a lock file next to the token file. The parsed file is
+    kept in memory and only read again when it has changed.
+
+    Note:
+        The file contains refresh tokens, which grant access to users' data. It is
+        created readable by its owner only.
+
+    Args:
+        path (str): The path of the token file. It will be created if it doesn't exist.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self._file_lock = FileLock(f'{path}.lock')
+
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int, int]] = None  # pylint: disable=unsubscriptable-object
+        self._entries: Dict[str, Any] = {}
+
+    def _read(self) -> Dict[str, Any]:
+        """Read all entries, reusing the last read if the file hasn't changed."""
+
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return {}
+
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+            if signature != self._signature:
+                with open(self.path, 'r', encoding='utf-8') as token_fh:
+                    self._entries = json.load(token_fh)
+
+                self._signature = signature
+
+            return self._entries
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        """Atomically replace the file. Must be called with the file lock held."""
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.pypco-tokens-')
+
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as temp_fh:
+                json.dump(entries, temp_fh)
+                temp_fh.flush()
+                os.fsync(temp_fh.fileno())
+
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, key: str) -> Optional[OAuthToken]:  # pylint: disable=unsubscriptable-object
+
+        entry = self._read().get(key)
+
+        return None if entry is None else OAuthToken.from_dict(entry['token'])
+
+    def set(self, key: str, token: OAuthToken) -> None:
+
+        with self._file_lock.locked():
+            entries = dict(self._read())
+            entries[key] = {'token': token.to_dict(), 'lease': None}
+            self._write(entries)
+
+    def delete(self, key: str) -> None:
+
+        with self._file_lock.locked():
+            entries = dict(self._read())
+
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def keys(self) -> List[str]:
+
+        return list(self._read())
+
+    def claim(self, key: str, owner: str, duration: float) -> bool:
+
+        with self._file_lock.locked():
+            entries = dict(self._read())
+            entry = entries.get(key)
+
+            if entry is None:
+                return False
+
+            lease = entry.get('lease')
+
+            if lease is not None and lease[0] != owner and lease[1] > time.time():
+                return False
+
+            entries[key] = {**entry, 'lease': [owner, time.time() + duration]}
+            self._write(entries)
+
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+
+        with self._file_lock.locked():
+            entries = dict(self._read())
+            entry = entries.get(key)
+
+            if entry is not None and (entry.get('lease') or [None])[0] == owner:
+                entries[key] = {**entry, 'lease': None}
+                self._write(entries)
+
+
+class OAuthTokenManager:
+    """Keeps users' OAuth tokens fresh and the PCO objects using them up to date.
+
+    Tokens are refreshed over a pooled requests session, so refreshes reuse connections
+    instead of opening a new one each. Only one refresh of a token is in flight at a
+    time: threads of this process wait for the same refresh, and other processes sharing
+    the token store (see FileTokenStore) wait for the lease holder's refresh and pick up
+    its result from the store.
+
+    PCO objects created with pco() use the manager's token. When the token is refreshed,
+    their credentials are updated, and when PCO rejects their token (401), they wait for a
+    refreshed token and retry the request once.
+
+    Once start() has been called, tokens are refreshed in the background before they
+    expire, so requests don't wait for refreshes.
+
+    Args:
+        client_id (str): The client id for your app.
+        client_secret (str): The client secret for your app.
+        store (TokenStore): Where tokens are stored. Default: a new MemoryTokenStore.
+        refresh_ahead (float): Refresh tokens this many seconds before they expire.
+            Default 300.
+        max_workers (int): The maximum number of background refreshes made at once, and
+            the size of the connection pool. Default 4.
+        lease (float): How long (seconds) a refresh may take before another process may
+            refresh the same token. Default 60.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            client_id: str,
+            client_secret: str,
+            store: Optional[TokenStore] = None,  # pylint: disable=unsubscriptable-object
+            refresh_ahead: float = 300,
+            max_workers: int = 4,
+            lease: float = 60,
+    ):
+
+        self._log = logging.getLogger(__name__)
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.store = store if store is not None else MemoryTokenStore()
+        self.refresh_ahead = refresh_ahead
+        self.max_workers = max_workers
+        self.lease = lease
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._live: Dict[str, 'weakref.WeakSet[PCO]'] = {}
+
+        self._executor: Optional[ThreadPoolExecutor] = None  # pylint: disable=unsubscriptable-object
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None  # pylint: disable=unsubscriptable-object
+
+    def __enter__(self) -> 'OAuthTokenManager':
+
+        return self
+
+    def __exit__(self, *_) -> None:
+
+        self.close()
+
+    def add(self, key: str, token: Any) -> OAuthToken:
+        """Store a user's token, e.g. after completing the OAuth authorization flow.
+
+        Args:
+            key (str): The key identifying the token (e.g. the user's id).
+            token (OAuthToken or dict): The token, or the response of the PCO OAuth token
+                endpoint (see get_oauth_access_token()).
+
+        Returns:
+            OAuthToken: The stored token.
+        """
+
+        if not isinstance(token, OAuthToken):
+            token = OAuthToken.from_response(token)
+
+        self.store.set(key, token)
+        self._update_live(key, token)
+
+        return token
+
+    def get_token(self, key: str) -> OAuthToken:
+        """Get a user's token, refreshing it first if it is about to expire.
+
+        Args:
+            key (str): The key identifying the token.
+
+        Raises:
+            PCOCredentialsException: There is no token with this key.
+            PCORequestTimeoutException: The refresh request timed out.
+            PCORequestException: PCO rejected the refresh.
+            PCOUnexpectedRequestException: Something unexpected went wrong with the refresh.
+
+        Returns:
+            OAuthToken: The token.
+        """
+
+        token = self._stored(key)
+
+        if token.expires_within(self.refresh_ahead):
+            return self.refresh(key)
+
+        return token
+
+    def refresh(
+            self,
+            key: str,
+            rejected: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+    ) -> OAuthToken:
+        """Refresh a user's token, or wait for a refresh already in flight.
+
+        The token is only refreshed if it still needs to be once this thread or process
+        gets its turn: if another refresh completed in the meantime, its token is returned.
+
+        Args:
+            key (str): The key identifying the token.
+            rejected (str): An access token PCO rejected. If given, the token is refreshed
+                if it is still this access token, regardless of its expiry time.
+                Otherwise it is refreshed if it is about to expire.
+
+        Raises:
+            PCOCredentialsException: There is no token with this key.
+            PCORequestTimeoutException: The refresh request timed out.
+            PCORequestException: PCO rejected the refresh.
+            PCOUnexpectedRequestException: Something unexpected went wrong with the refresh.
+
+        Returns:
+            OAuthToken: The refreshed token.
+        """
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+
+            if in_flight is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+
+        if in_flight is not None:
+            token = in_flight.result()
+
+            if rejected is None or token.access_token != rejected:
+                return token
+
+            return self.refresh(key, rejected)
+
+        try:
+            token = self._refresh(key, rejected)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(token)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        self._update_live(key, token)
+
+        return token
+
+    def pco(self, key: str, **kwargs) -> PCO:
+        """Create a PCO object authenticated with a user's token.
+
+        The PCO object's credentials follow the token as it is refreshed.
+
+        Args:
+            key (str): The key identifying the token.
+            **kwargs: Passed on to PCO() (e.g. rate_limiter, cache).
+
+        Raises:
+            PCOCredentialsException: There is no token with this key.
+
+        Returns:
+            PCO: The PCO object.
+        """
+
+        pco = PCO(token=self.get_token(key).access_token, **kwargs)
+        pco._auth_config.token_refresher = \
+            lambda rejected: self.refresh(key, rejected).access_token  # pylint: disable=protected-access
+        pco._auth_config.identity = f'{self.client_id}:{key}'  # pylint: disable=protected-access
+
+        with self._lock:
+            self._live.setdefault(key, weakref.WeakSet()).add(pco)
+
+        return pco
+
+    def start(self, interval: float = 30) -> None:
+        """Start refreshing tokens in the background before they expire.
+
+        Args:
+            interval (float): How often (seconds) to look for tokens about to expire.
+                Default 30.
+        """
+
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name='pypco-oauth-refresh', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop refreshing tokens in the background, waiting for refreshes in flight."""
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+        self._executor.shutdown()  # type: ignore[union-attr]
+        self._executor = None
+
+    def close(self) -> None:
+        """Stop background refreshes and close the connection pool."""
+
+        self.stop()
+        self.session.close()
+
+    def refresh_expiring(self) -> List[Future]:
+        """Start refreshing every stored token about to expire.
+
+        Tokens already being refreshed are skipped. Requires start().
+
+        Returns:
+            list: Futures of the started refreshes.
+        """
+
+        futures = []
+
+        for key in self.store.keys():
+            token = self.store.get(key)
+
+            if token is None or key in self._in_flight:
+                continue
+
+            if token.expires_within(self.refresh_ahead):
+                futures.append(self._executor.submit(self._refresh_quietly, key))  # type: ignore[union-attr]
+            else:
+                # Another process may have refreshed it
+                self._update_live(key, token)
+
+        return futures
+
+    def _run(self, interval: float) -> None:
+        """Refresh expiring tokens until stopped."""
+
+        while not self._stopped.is_set():
+            try:
+                self.refresh_expiring()
+            except Exception:  # pylint: disable=broad-except
+                self._log.exception("Looking for expiring OAuth tokens failed.")
+
+            self._stopped.wait(interval)
+
+    def _refresh_quietly(self, key: str) -> None:
+        """Refresh a token in the background, logging failures."""
+
+        try:
+            self.refresh(key)
+        except Exception:  # pylint: disable=broad-except
+            self._log.exception("Refreshing the OAuth token %s failed.", key)
+
+    def _stored(self, key: str) -> OAuthToken:
+        """Get a stored token, raising if it doesn't exist."""
+
+        token = self.store.get(key)
+
+        if token is None:
+            raise PCOCredentialsException(f'There is no OAuth token for {key!r}.')
+
+        return token
+
+    def _needs_refresh(self, token: OAuthToken, rejected: Optional[str]) -> bool:  # pylint: disable=unsubscriptable-object
+        """Check whether a token still needs to be refreshed."""
+
+        if rejected is not None:
+            return token.access_token == rejected
+
+        return token.expires_within(self.refresh_ahead)
+
+    def _refresh(self, key: str, rejected: Optional[str]) -> OAuthToken:  # pylint: disable=unsubscriptable-object
+        """Refresh a token once this process holds its lease."""
+
+        delay = 0.05
+
+        while True:
+            token = self._stored(key)
+
+            if not self._needs_refresh(token, rejected):
+                return token
+
+            if self.store.claim(key, self._owner, self.lease):
+                break
+
+            # Another process is refreshing the token; wait for it to store the result
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        try:
+            # The token may have been refreshed between reading and claiming it
+            token = self._stored(key)
+
+            if not self._needs_refresh(token, rejected):
+                self.store.release(key, self._owner)
+                return token
+
+            self._log.debug("Refreshing the OAuth token %s.", key)
+
+            token = OAuthToken.from_response(get_oauth_refresh_token(
+                self.client_id, self.client_secret, token.refresh_token, session=self.session
+            ))
+        except BaseException:
+            self.store.release(key, self._owner)
+            raise
+
+        self.store.set(key, token)
+
+        return token
+
+    def _update_live(self, key: str, token: OAuthToken) -> None:
+        """Update the credentials of the PCO objects using a token."""
+
+        with self._lock:
+            live = list(self._live.get(key, ()))
+
+        for pco in live:
+            pco._auth_config.token = token.access_token  # pylint: disable=protected-access
@@ -1,17 +1,44 @@
 """The primary module for pypco containing main wrapper logic."""
 
 import time
+import json
 import logging
-import re
+import threading
 
-from typing import Any, Iterator, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union, \
+    cast
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 
 from .auth_config import PCOAuthConfig
-from .exceptions import PCORequestTimeoutException, \
+from .bulk import BulkResult, WritePipeline, execute_bulk
+from .cache import CachedResponse, ResponseCache, cache_key
+from .codec import JSONCodec
+from .instrumentation import RequestEvent, RequestListener, current_event, instrumented
+from .ratelimit import RateLimiter
+from .helpers import clean_url, parse_retry_after
+from .records import IndexedPage, RecordView, iterate_page_records, iterate_page_views
+from .retry import RetryPolicy, RetryReason
+from .upload import FileUpload, UploadCache, UploadProgress, UploadSource
+from .exceptions import PCOException, PCORequestTimeoutException, \
     PCORequestException, PCOUnexpectedRequestException
 
 
+def _request_sent(err: Exception) -> bool:
+    """Check whether a request that failed with a connection error may have been sent."""
+
+    if isinstance(err, requests.exceptions.ConnectTimeout):
+        return False
+
+    reason = getattr(err.args[0], 'reason', None) if err.args else None
+
+    return not isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
 class PCO:  # pylint: disable=too-many-instance-attributes
     """The entry point to the PCO API.
 
@@ -20,6 +47,12 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         If you specify an invalid combination of these arguments, an exception will be
         raised when you attempt to make API calls.
 
+    Note:
+        A PCO object is thread-safe: any number of threads can make requests through the
+        same object at once. They share its connection pool (see pool_maxsize), rate
+        limiter, cache, and credentials. Size the pool to at least the number of threads
+        making requests, or connections will be opened and discarded under load.
+
     Args:
         application_id (str): The application_id; secret must also be specified.
         secret (str): The secret for your app; application_id must also be specified.
@@ -30,7 +63,33 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         upload_url (str): The URL to which files will be uploaded.
             Default: https://upload.planningcenteronline.com/v2/files
         upload_timeout (int): How long to wait (seconds) for uploads to timeout. Default 300.
-        timeout_retries (int): How many times to retry requests that have timed out. Default 3.
+        timeout_retries (int): How many times to try requests that time out. Default 3.
+            Ignored if a retry_policy is given.
+        retry_policy (RetryPolicy): Which failed requests to retry (e.g. server errors and
+            connection errors) and how long to back off before retrying. Default: retry
+            timed out requests immediately, up to timeout_retries attempts.
+        rate_limiter (RateLimiter): A client-side rate limiter used to space requests out
+            before the PCO rate limit is hit. The same RateLimiter can be shared by PCO
+            objects using the same credentials. Default None (only 429 responses are handled).
+        cache (ResponseCache): A cache for GET responses. Cached responses are used until
+            their TTL expires, then revalidated with conditional requests and reused when
+            PCO responds 304 Not Modified. Default None (no caching).
+        upload_cache (UploadCache): Remembers uploaded files by content hash, so that
+            identical files uploaded again are reused instead of being transferred again.
+            Default None (every file is uploaded).
+        listeners (list): Request listeners (see RequestListener) notified when each
+            request starts and ends, e.g. a RequestMetrics. Default: none.
+        pool_connections (int): The number of hosts (e.g. the API and the upload server)
+            for which connection pools are kept. Default 10.
+        pool_maxsize (int): The maximum number of connections kept open to each host for
+            reuse. Default 10.
+        pool_block (bool): Whether threads wait for a pooled connection to become free
+            when pool_maxsize connections to a host are in use, capping the number of
+            connections per host. Otherwise extra connections are opened and closed after
+            use. Default False.
+        json_codec (JSONCodec): The codec used to decode JSON responses and encode request
+            payloads, e.g. fastest_codec() to use orjson or msgspec if installed. Default
+            None (the json module, through requests).
     """
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -44,12 +103,20 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             upload_url: str = 'https://upload.planningcenteronline.com/v2/files',
             upload_timeout: int = 300,
             timeout_retries: int = 3,
+            retry_policy: Optional[RetryPolicy] = None,  # pylint: disable=unsubscriptable-object
+            rate_limiter: Optional[RateLimiter] = None,  # pylint: disable=unsubscriptable-object
+            cache: Optional[ResponseCache] = None,  # pylint: disable=unsubscriptable-object
+            upload_cache: Optional[UploadCache] = None,  # pylint: disable=unsubscriptable-object
+            listeners: Optional[Iterable[RequestListener]] = None,  # pylint: disable=unsubscriptable-object
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            json_codec: Optional[JSONCodec] = None,  # pylint: disable=unsubscriptable-object
     ):
 
         self._log = logging.getLogger(__name__)
 
         self._auth_config = PCOAuthConfig(application_id, secret, token, cc_name)
-        self._auth_header = self._auth_config.auth_header
 
         self.api_base = api_base
         self.timeout = timeout
@@ -58,17 +125,93 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         self.upload_timeout = upload_timeout
 
         self.timeout_retries = timeout_retries
+        self.retry_policy = retry_policy
+
+        self.rate_limiter = rate_limiter
+
+        self.cache = cache
+        self._revalidating: Set[str] = set()
+        self._revalidating_lock = threading.Lock()
+
+        self.upload_cache = upload_cache
+
+        self.listeners: List[RequestListener] = list(listeners or [])
+
+        self.json_codec = json_codec
 
         self.session = requests.Session()
 
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
         self._log.debug("Pypco has been initialized!")
 
+    def add_listener(self, listener: RequestListener) -> None:
+        """Notify a request listener of every request made from now on.
+
+        Args:
+            listener (RequestListener): The listener.
+        """
+
+        # Replace rather than mutate the list, so requests in progress are unaffected
+        self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener: RequestListener) -> None:
+        """Stop notifying a request listener.
+
+        Args:
+            listener (RequestListener): The listener.
+        """
+
+        self.listeners = [existing for existing in self.listeners if existing is not listener]
+
+    def _decode_json(self, decode: Callable[[], Any]) -> Any:
+        """Decode a JSON body, timing the decoding for the current request's event."""
+
+        event = current_event()
+
+        if event is None:
+            return decode()
+
+        start = time.perf_counter()
+
+        try:
+            return decode()
+        finally:
+            event.decode_time += time.perf_counter() - start
+
+    def _decode_response(self, response: requests.Response) -> Any:
+        """Decode a JSON response with the JSON codec, if any."""
+
+        codec = self.json_codec
+
+        if codec is None:
+            return self._decode_json(response.json)
+
+        return self._decode_json(lambda: codec.decode(response.content))
+
+    @property
+    def _auth_header(self) -> str:
+        """str: The authorization header for requests.
+
+        Church Center OrganizationTokens are fetched the first time they are needed and
+        shared by every PCO object for the same organization.
+        """
+
+        return self._auth_config.auth_header
+
     def _do_request(
             self,
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
             **params
     ) -> requests.Response:
         """Builds, executes, and performs a single request against the PCO API.
@@ -79,7 +222,8 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Returns:
@@ -87,23 +231,36 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         """
 
         # Standard header
-        headers = {
+        request_headers = {
             'User-Agent': 'pypco',
             'Authorization': self._auth_header,
         }
 
+        if headers:
+            request_headers.update(headers)
+
         # Standard params
         request_params = {
-            'headers': headers,
+            'headers': request_headers,
             'params': params,
             'json': payload,
             'timeout': self.upload_timeout if upload else self.timeout
         }
 
-        # Add files param if upload specified
+        if payload is not None and self.json_codec is not None:
+            request_headers['Content-Type'] = 'application/json'
+            request_params['json'] = None
+            request_params['data'] = self.json_codec.encode(payload)
+
+        # Stream the multipart body if upload specified
+        original_upload = upload
+
         if upload:
-            upload_fh = open(upload, 'rb')
-            request_params['files'] = {'file': upload_fh}
+            if not isinstance(upload, FileUpload):
+                upload = FileUpload(upload)
+
+            request_headers.update(upload.headers)
+            request_params['data'] = upload.body()
 
         self._log.debug(
             "Executing %s request to '%s' with args %s",
@@ -112,6 +269,9 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             {param: value for (param, value) in request_params.items() if param != 'headers'}
         )
 
+        event = current_event()
+        start = time.perf_counter()
+
         # The moment we've been waiting for...execute the request
         try:
             response = self.session.request(
@@ -120,75 +280,200 @@ class PCO:  # pylint: disable=too-many-instance-attributes
                 **request_params # type: ignore[arg-type]
             )
         finally:
-            if upload:
-                upload_fh.close()
+            if event is not None:
+                event.attempts += 1
+                event.network_time += time.perf_counter() - start
+
+            if isinstance(upload, FileUpload) and upload is not original_upload:
+                upload.close()
+
+        if event is not None:
+            self._count_bytes(event, response, upload)
 
         return response
 
+    @staticmethod
+    def _count_bytes(event: RequestEvent, response: requests.Response, upload: Any) -> None:
+        """Add the sizes of a request's and response's bodies to a request event."""
+
+        if isinstance(upload, FileUpload):
+            event.bytes_sent += upload.size or 0
+        else:
+            body = getattr(response.request, 'body', None)
+
+            if isinstance(body, (bytes, str)):
+                event.bytes_sent += len(body)
+
+        try:
+            event.bytes_received += len(response.content)
+        except TypeError:
+            pass
+
     def _do_timeout_managed_request(
             self,
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
             **params
         ) -> requests.Response:
-        """Performs a single request against the PCO API with automatic retried in case of timeout.
+        """Performs a single request against the PCO API, retrying failures per the retry policy.
 
-        Executed request could be one of the standard HTTP verbs or a file upload.
+        By default only timed out requests are retried (see RetryPolicy). Executed request
+        could be one of the standard HTTP verbs or a file upload.
 
         Args:
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Raises:
             PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            requests.ConnectionError: The connection failed and the request wasn't retried
+                (again).
 
         Returns:
-            requests.Response: The response to this request.
+            requests.Response: The response to this request. If it has an error status,
+            it wasn't retried (again).
         """
 
-        timeout_count = 0
+        policy = self.retry_policy if self.retry_policy is not None else \
+            RetryPolicy(max_attempts=self.timeout_retries)
+
+        started = time.monotonic()
+        attempt = 0
 
         while True:
+            attempt += 1
+
             try:
-                return self._do_request(method, url, payload, upload, **params)
+                response = self._do_request(method, url, payload, upload, headers, **params)
 
             except requests.exceptions.Timeout as exc:
-                timeout_count += 1
-
                 self._log.debug("The request to \"%s\" timed out after %d tries.",
-                                url, timeout_count)
+                                url, attempt)
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.TIMEOUT,
+                    sent=_request_sent(exc)
+                )
 
-                if timeout_count == self.timeout_retries:
+                if delay is None:
                     self._log.debug("Maximum retries (%d) hit. Will raise exception.",
-                                    self.timeout_retries)
+                                    policy.max_attempts)
 
                     raise PCORequestTimeoutException(
-                        f"The request to \"{url}\" timed out after {timeout_count} tries.") from exc
+                        f"The request to \"{url}\" timed out after {attempt} tries.") from exc
 
-                continue
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError) as exc:
+                # Certificate problems won't go away by trying again
+                if isinstance(exc, requests.exceptions.SSLError):
+                    raise
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.CONNECTION_ERROR,
+                    sent=_request_sent(exc)
+                )
+
+                if delay is None:
+                    raise
+
+                self._log.debug("The connection for the request to \"%s\" failed (%s). "
+                                "Will try again after %.2f sec(s).", url, exc, delay)
+
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    return response
+
+                delay = policy.retry_delay(
+                    method, attempt, time.monotonic() - started, RetryReason.STATUS,
+                    status=response.status_code, retry_after=parse_retry_after(response.headers)
+                )
+
+                if delay is None:
+                    return response
+
+                self._log.debug("The request to \"%s\" failed with status %d. "
+                                "Will try again after %.2f sec(s).",
+                                url, response.status_code, delay)
+
+            event = current_event()
+
+            if event is not None:
+                event.retries += 1
+
+            if delay > 0:
+                time.sleep(delay)
+
+    def _do_auth_managed_request(
+            self,
+            method: str,
+            url: str,
+            payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> requests.Response:
+        """Performs a single request against the PCO API, refreshing expired credentials.
+
+        If the request is rejected as unauthorized (401) and the credentials can be
+        refreshed (Church Center OrganizationTokens, or OAuth tokens managed by an
+        OAuthTokenManager), it is retried once with new
+        credentials.
+
+        Args:
+            method (str): The HTTP method to use for this request.
+            url (str): The URL against which this request will be executed.
+            payload (obj): A json-serializable Python object to be sent as the post/put payload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+
+        Returns:
+            requests.Response: The response to this request.
+        """
+
+        auth_header = self._auth_header
+
+        response = self._do_timeout_managed_request(method, url, payload, upload, headers, **params)
+
+        if response.status_code == 401 and self._auth_config.refresh_auth_header(auth_header):
+            self._log.debug("Credentials were rejected. Retrying with refreshed credentials.")
+
+            response = self._do_timeout_managed_request(
+                method, url, payload, upload, headers, **params
+            )
+
+        return response
 
     def _do_ratelimit_managed_request(
             self,
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
             **params
         ) -> requests.Response:
         """Performs a single request against the PCO API with automatic rate limit handling.
 
-        Executed request could be one of the standard HTTP verbs or a file upload.
+        Executed request could be one of the standard HTTP verbs or a file upload. If a
+        rate limiter is configured, requests are delayed until it has budget available.
 
         Args:
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Raises:
@@ -198,15 +483,39 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             requests.Response: The response to this request.
         """
 
+        event = current_event()
+
         while True:
 
-            response = self._do_timeout_managed_request(method, url, payload, upload, **params)
+            if self.rate_limiter is not None:
+                start = time.perf_counter()
+                self.rate_limiter.acquire()
+
+                if event is not None:
+                    event.rate_limit_wait += time.perf_counter() - start
+
+            response = self._do_auth_managed_request(method, url, payload, upload, headers, **params)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response.headers)
 
             if response.status_code == 429:
                 self._log.debug("Received rate limit response. Will try again after %d sec(s).",
                                 int(response.headers['Retry-After']))
 
-                time.sleep(int(response.headers['Retry-After']))
+                if event is not None:
+                    event.rate_limited += 1
+
+                # The rate limiter will hold this (and every other) request back, so
+                # we only need to sleep here when there's no limiter to do it for us.
+                if self.rate_limiter is None or \
+                        not self.rate_limiter.penalize(int(response.headers['Retry-After'])):
+                    start = time.perf_counter()
+                    time.sleep(int(response.headers['Retry-After']))
+
+                    if event is not None:
+                        event.rate_limit_wait += time.perf_counter() - start
+
                 continue
 
             return response
@@ -216,7 +525,8 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
             **params
         ) -> requests.Response:
         """Performs a single request against the PCO API, automatically cleaning up the URL.
@@ -227,7 +537,8 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Raises:
@@ -240,19 +551,19 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         self._log.debug("URL cleaning input: \"%s\"", url)
 
         if not upload:
-            url = url if url.startswith(self.api_base) else f'{self.api_base}{url}'
-            url = re.subn(r'(?<!:)[/]{2,}', '/', url)[0]
+            url = clean_url(url, self.api_base)
 
         self._log.debug("URL cleaning output: \"%s\"", url)
 
-        return self._do_ratelimit_managed_request(method, url, payload, upload, **params)
+        return self._do_ratelimit_managed_request(method, url, payload, upload, headers, **params)
 
     def request_response(
             self,
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
+            headers: Optional[dict] = None,  # pylint: disable=unsubscriptable-object
             **params
         ) -> requests.Response:
         """A generic entry point for making a managed request against PCO.
@@ -260,13 +571,16 @@ class PCO:  # pylint: disable=too-many-instance-attributes
         This function will return a Requests response object, allowing access to
         all request data and metadata. Executed request could be one of the standard
         HTTP verbs or a file upload. If you're just looking for your data (json), use
-        the request_json() function or get(), post(), etc.
+        the request_json() function or get(), post(), etc. If a response cache is
+        configured, successful requests other than GETs invalidate cached responses for
+        the URL they change.
 
         Args:
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
+            headers (dict): Additional headers to send with this request.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Raises:
@@ -278,21 +592,30 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             requests.Response: The response to this request.
         """
 
-        try:
-            response = self._do_url_managed_request(method, url, payload, upload, **params)
-        except Exception as err:
-            self._log.debug("Request resulted in unexpected error: \"%s\"", str(err))
-            raise PCOUnexpectedRequestException(str(err)) from err
+        with instrumented(self.listeners, method, url, self.api_base) as event:
+            try:
+                response = self._do_url_managed_request(method, url, payload, upload, headers, **params)
+            except Exception as err:
+                self._log.debug("Request resulted in unexpected error: \"%s\"", str(err))
+                raise PCOUnexpectedRequestException(str(err)) from err
 
-        try:
-            response.raise_for_status()
-        except requests.HTTPError as err:
-            self._log.debug("Request resulted in API error: \"%s\"", str(err))
-            raise PCORequestException(
-                response.status_code,
-                str(err),
-                response_body=response.text
-            ) from err
+            if event is not None:
+                event.status = response.status_code
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as err:
+                self._log.debug("Request resulted in API error: \"%s\"", str(err))
+                raise PCORequestException(
+                    response.status_code,
+                    str(err),
+                    response_body=response.text
+                ) from err
+
+            # Only once the write has been applied, so that a concurrent GET can't cache
+            # the old state again after it was invalidated
+            if self.cache is not None and method != 'GET' and not upload:
+                self.cache.invalidate(clean_url(url, self.api_base))
 
         return response
 
@@ -301,18 +624,21 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             method: str,
             url: str,
             payload: Optional[Any] = None,  # pylint: disable=unsubscriptable-object
-            upload: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            upload: Optional[Union[str, FileUpload]] = None,  # pylint: disable=unsubscriptable-object
             **params: str
     ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
         """A generic entry point for making a managed request against PCO.
 
-        This function will return the payload from the PCO response (a dict).
+        This function will return the payload from the PCO response (a dict). If a
+        response cache is configured, GET responses are cached and revalidated, and
+        other requests invalidate cached responses for the URL they change (see
+        request_response()).
 
         Args:
             method (str): The HTTP method to use for this request.
             url (str): The URL against which this request will be executed.
             payload (obj): A json-serializable Python object to be sent as the post/put payload.
-            upload(str): The path to a file to upload.
+            upload(str): The path to a file to upload, or a FileUpload.
             params (obj): A dictionary or list of tuples or bytes to send in the query string.
 
         Raises:
@@ -324,14 +650,171 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             dict: The payload from the response to this request.
         """
 
-        response = self.request_response(method, url, payload, upload, **params)
-        if response.status_code == 204:
-            return_value = None
-        else:
-            return_value = response.json()
+        with instrumented(self.listeners, method, url, self.api_base):
+            if self.cache is not None and method == 'GET' and not upload:
+                return self._cached_request_json(url, **params)
+
+            response = self.request_response(method, url, payload, upload, **params)
+            if response.status_code == 204:
+                return_value = None
+            else:
+                return_value = self._decode_response(response)
 
         return return_value
 
+    def _cached_request_json(self, url: str, **params: str) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Perform a GET request, using a cached response if available.
+
+        Fresh cached responses are used without making a request. Stale responses are
+        revalidated, either before returning or (within the stale-while-revalidate
+        window) in the background after returning the stale response.
+
+        Args:
+            url (str): The URL against which this request will be executed.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload from the response to this request.
+        """
+
+        cache = cast(ResponseCache, self.cache)
+
+        key = cache_key(clean_url(url, self.api_base), params, self._auth_config.credentials_key)
+        cached = cache.get(key)
+
+        if cached is not None:
+            age = time.time() - cached.stored_at
+            ttl = cache.ttl_for(cached.url)
+
+            if age < ttl:
+                self._log.debug("Using fresh cached response for \"%s\".", key)
+                cache.record_hit()
+
+                return self._use_cached(cached)
+
+            if age < ttl + cache.stale_while_revalidate:
+                self._log.debug("Using stale cached response for \"%s\".", key)
+                cache.record_hit()
+                self._revalidate_in_background(url, key, cached, **params)
+
+                return self._use_cached(cached)
+
+        return self._revalidate(url, key, cached, **params)
+
+    def _revalidate(
+            self,
+            url: str,
+            key: str,
+            cached: Optional[CachedResponse],  # pylint: disable=unsubscriptable-object
+            record_stats: bool = True,
+            **params: str
+        ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Perform a (conditional) GET request and update the cache with the result.
+
+        Args:
+            url (str): The URL against which this request will be executed.
+            key (str): The cache key for this request.
+            cached (CachedResponse): The cached response to revalidate, if any.
+            record_stats (bool): Whether to count this request as a cache hit or miss.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
+
+        Returns:
+            dict: The payload from the response to this request.
+        """
+
+        cache = cast(ResponseCache, self.cache)
+
+        response = self.request_response(
+            'GET',
+            url,
+            headers=cached.validators if cached is not None else None,
+            **params
+        )
+
+        if response.status_code == 304 and cached is not None:
+            self._log.debug("Response for \"%s\" not modified; using cached body.", key)
+
+            if record_stats:
+                cache.record_hit()
+
+            cached.stored_at = time.time()
+            cache.set(key, cached)
+
+            return self._use_cached(cached)
+
+        if record_stats:
+            cache.record_miss()
+
+        if response.status_code == 204:
+            return None
+
+        cleaned_url = clean_url(url, self.api_base)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if etag or last_modified or cache.ttl_for(cleaned_url) > 0:
+            cache.set(key, CachedResponse(cleaned_url, response.content, etag, last_modified))
+
+        return self._decode_response(response)
+
+    def _use_cached(self, cached: CachedResponse) -> Any:
+        """Decode a cached response body, marking the current request's event as cached."""
+
+        event = current_event()
+
+        if event is not None:
+            event.cached = True
+
+        decode = json.loads if self.json_codec is None else self.json_codec.decode
+
+        return self._decode_json(lambda: decode(cached.body))
+
+    def _revalidate_in_background(
+            self,
+            url: str,
+            key: str,
+            cached: CachedResponse,
+            **params: str
+        ) -> None:
+        """Revalidate a cached response on a background thread.
+
+        Only one revalidation per cache key runs at a time. Errors are logged and
+        otherwise ignored; the stale response stays in the cache.
+
+        Args:
+            url (str): The URL against which this request will be executed.
+            key (str): The cache key for this request.
+            cached (CachedResponse): The cached response to revalidate.
+            params (obj): A dictionary or list of tuples or bytes to send in the query string.
+        """
+
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                self._revalidate(url, key, cached, record_stats=False, **params)
+            except PCOException as err:
+                self._log.debug("Background revalidation of \"%s\" failed: \"%s\"", key, err)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
     def get(self, url: str, **params) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
         """Perform a GET request against the PCO API.
 
@@ -437,7 +920,134 @@ class PCO:  # pylint: disable=too-many-instance-attributes
 
         return self.request_response('DELETE', url, **params)
 
-    def iterate(self, url: str, offset: int = 0, per_page: int = 25, **params: str) -> Iterator[dict]:  # pylint: disable=too-many-branches
+    def post_many(
+            self,
+            items: Iterable[Tuple[str, dict]],
+            max_workers: int = 4,
+            **params: str
+        ) -> Iterator[BulkResult]:
+        """Perform many POST requests against the PCO API concurrently.
+
+        Requests are executed on a pool of max_workers threads, and are read from the
+        input as workers become available, so generators of any size can be passed
+        without holding every request in memory. All requests go through this PCO object,
+        so they share its rate limit handling (and rate limiter, if any). A failed request
+        doesn't stop the others.
+
+        Args:
+            items (iterable): (url, payload) tuples; see post(). The payload may be None
+                for requests without a body.
+            max_workers (int): The maximum number of requests to execute concurrently.
+                Default 4.
+            params: Any named arguments will be passed as query parameters with every
+                request. Values must be of type str!
+
+        Yields:
+            BulkResult: The outcome of each request, in order of completion. The result
+            attribute holds the payload returned by the API for successful requests, and
+            the error attribute holds the pypco exception raised for failed requests.
+        """
+
+        return execute_bulk(
+            lambda url, payload=None: self.post(url, payload, **params),
+            items,
+            max_workers
+        )
+
+    def patch_many(
+            self,
+            items: Iterable[Tuple[str, dict]],
+            max_workers: int = 4,
+            **params: str
+        ) -> Iterator[BulkResult]:
+        """Perform many PATCH requests against the PCO API concurrently.
+
+        See post_many() for details.
+
+        Args:
+            items (iterable): (url, payload) tuples; see patch().
+            max_workers (int): The maximum number of requests to execute concurrently.
+                Default 4.
+            params: Any named arguments will be passed as query parameters with every
+                request. Values must be of type str!
+
+        Yields:
+            BulkResult: The outcome of each request, in order of completion.
+        """
+
+        return execute_bulk(
+            lambda url, payload=None: self.patch(url, payload, **params),
+            items,
+            max_workers
+        )
+
+    def delete_many(
+            self,
+            urls: Iterable[str],
+            max_workers: int = 4,
+            **params: str
+        ) -> Iterator[BulkResult]:
+        """Perform many DELETE requests against the PCO API concurrently.
+
+        See post_many() for details.
+
+        Args:
+            urls (iterable): The URLs of the objects to delete.
+            max_workers (int): The maximum number of requests to execute concurrently.
+                Default 4.
+            params: Any named arguments will be passed as query parameters with every
+                request. Values must be of type str!
+
+        Yields:
+            BulkResult: The outcome of each request, in order of completion. The result
+            attribute holds the response object for successful requests.
+        """
+
+        return execute_bulk(
+            lambda url: self.delete(url, **params),
+            ((url, None) for url in urls),
+            max_workers
+        )
+
+    def pipeline(
+            self,
+            max_workers: int = 4,
+            max_pending: Optional[int] = None,  # pylint: disable=unsubscriptable-object
+        ) -> WritePipeline:
+        """Create a pipeline for dependent write requests.
+
+        Each request made through the pipeline returns a Future, and can be chained
+        after an earlier request's Future; e.g. a person's emails are posted as soon as
+        the person has been created, while the next person is being created.
+
+        Usage:
+            with pco.pipeline() as pipeline:
+                person = pipeline.post('/people/v2/people', person_payload)
+                pipeline.post('/people/v2/people/{id}/emails', email_payload, after=person)
+
+        Args:
+            max_workers (int): The maximum number of requests to execute concurrently.
+                Default 4.
+            max_pending (int): The maximum number of incomplete requests; submitting a
+                request blocks while this many are outstanding. Default 4 * max_workers.
+
+        Returns:
+            WritePipeline: The pipeline. Use it as a context manager; leaving the context
+            waits for all of its requests to complete.
+        """
+
+        return WritePipeline(self, max_workers, max_pending)
+
+    def iterate(  # pylint: disable=too-many-arguments
+            self,
+            url: str,
+            offset: int = 0,
+            per_page: int = 25,
+            prefetch: bool = False,
+            max_workers: int = 4,
+            record_views: bool = False,
+            **params: str
+        ) -> Iterator[Union[dict, RecordView]]:
         """Iterate a list of objects in a response, handling pagination.
 
         Basically, this function wraps get in a generator function designed for
@@ -454,6 +1064,16 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             offset (int): The offset at which to start. Usually going to be 0 (the default).
             per_page (int): The number of results that should be requested in a single page.
                 Valid values are 1 - 100, defaults to the PCO default of 25.
+            prefetch (bool): If True, use meta.total_count from the first page to fetch
+                subsequent pages concurrently. Objects are still yielded in order. Defaults
+                to False.
+            max_workers (int): The maximum number of pages to fetch concurrently when
+                prefetch is enabled. Each page request is still rate limit managed.
+                Defaults to 4.
+            record_views (bool): If True, yield read-only RecordViews instead of dicts.
+                They are used like the dicts, but share the page's meta and included
+                objects rather than copying them, and resolve includes on first access,
+                which saves memory and time when streaming many records. Defaults to False.
             params: Any additional named arguments will be passed as query parameters. Values must
                 be of type str!
 
@@ -468,58 +1088,206 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             before being returned from the API. Namely, includes are injected into the object(s)
             with which they are associated. This makes it easier to process includes associated with
             specific objects since they are accessible directly from each returned object.
+            With record_views, each object is a RecordView.
         """
 
-        while True:  # pylint: disable=too-many-nested-blocks
+        pages = self.iterate_pages(url, offset, per_page, prefetch, max_workers, **params)
+        split_page = iterate_page_views if record_views else iterate_page_records
 
-            response = self.get(url, offset=offset, per_page=per_page, **params)
+        for response in pages:
+            yield from split_page(response)
 
-            if response is None:
-                return
+    def iterate_pages(  # pylint: disable=too-many-arguments
+            self,
+            url: str,
+            offset: int = 0,
+            per_page: int = 25,
+            prefetch: bool = False,
+            max_workers: int = 4,
+            index_includes: bool = False,
+            **params: str
+        ) -> Iterator[Union[dict, IndexedPage]]:
+        """Iterate the pages of a list response, handling pagination.
 
-            for cur in response['data']:
-                record = {
-                    'data': cur,
-                    'included': [],
-                    'meta': {}
-                }
+        Like iterate(), but yields each page as returned by the API instead of splitting
+        it into records, for consumers processing objects in batches. Pagination,
+        prefetching, and rate limit handling are the same as for iterate().
 
-                if 'can_include' in response['meta']:
-                    record['meta']['can_include'] = response['meta']['can_include']
+        Args:
+            url (str): The URL against which to perform the request. Can include
+                what's been set as api_base, which will be ignored if this value is also
+                present in your URL.
+            offset (int): The offset at which to start. Usually going to be 0 (the default).
+            per_page (int): The number of results that should be requested in a single page.
+                Valid values are 1 - 100, defaults to the PCO default of 25.
+            prefetch (bool): If True, use meta.total_count from the first page to fetch
+                subsequent pages concurrently. Pages are still yielded in order. Defaults
+                to False.
+            max_workers (int): The maximum number of pages to fetch concurrently when
+                prefetch is enabled. Defaults to 4.
+            index_includes (bool): If True, yield IndexedPages, which index each page's
+                included objects by (type, id) and find the includes of an object with
+                included_for(). Defaults to False.
+            params: Any additional named arguments will be passed as query parameters. Values must
+                be of type str!
 
-                if 'parent' in response['meta']:
-                    record['meta']['parent'] = response['meta']['parent']
+        Raises:
+            PCORequestTimeoutException: The request to PCO timed out the maximum number of times.
+            PCOUnexpectedRequestException: An unexpected error occurred when making your request.
+            PCORequestException: The response from the PCO API indicated an error with your request.
 
-                if 'relationships' in cur:
-                    for key in cur['relationships']:
-                        relationships = cur['relationships'][key]['data']
+        Yields:
+            dict: Each page returned by the API for this request, with "data", "included",
+            "meta", and "links" nodes. With index_includes, each page is an IndexedPage.
+        """
+
+        if prefetch:
+            pages = self._iterate_prefetched_pages(url, offset, per_page, max_workers, **params)
+        else:
+            pages = self._iterate_sequential_pages(url, offset, per_page, **params)
+
+        if not index_includes:
+            yield from pages
+            return
 
-                        if relationships is not None:
-                            if isinstance(relationships, dict):
-                                for include in response['included']:
-                                    if include['type'] == relationships['type'] and \
-                                            include['id'] == relationships['id']:
-                                        record['included'].append(include)
+        for page in pages:
+            yield IndexedPage(page)
 
-                            elif isinstance(relationships, list):
-                                for relationship in relationships:
-                                    for include in response['included']:
-                                        if include['type'] == relationship['type'] and \
-                                                include['id'] == relationship['id']:
-                                            record['included'].append(include)
+    def _iterate_sequential_pages(
+            self,
+            url: str,
+            offset: int,
+            per_page: int,
+            **params: str
+        ) -> Iterator[dict]:
+        """Fetch pages of a list response one after another.
 
-                yield record
+        Args:
+            url (str): The URL against which to perform the request.
+            offset (int): The offset at which to start.
+            per_page (int): The number of results that should be requested in a single page.
+            params: Any additional named arguments will be passed as query parameters.
+
+        Yields:
+            dict: Each page returned by the API, in order.
+        """
+
+        while True:
+
+            response = self.get(url, offset=offset, per_page=per_page, **params)
+
+            if response is None:
+                return
+
+            yield response
 
             offset += per_page
 
             if 'next' not in response['links']:
                 break
 
-    def upload(self, file_path: str, **params) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
-        """Upload the file at the specified path to PCO.
+    def _iterate_prefetched_pages(  # pylint: disable=too-many-arguments
+            self,
+            url: str,
+            offset: int,
+            per_page: int,
+            max_workers: int,
+            **params: str
+        ) -> Iterator[dict]:
+        """Fetch pages of a list response concurrently, yielding them in order.
+
+        The first page is fetched on its own to learn meta.total_count, after which the
+        offsets of the remaining pages are known up front. At most max_workers pages are
+        in flight (or waiting to be consumed) at any time.
 
         Args:
-            file_path (str): The path to the file to be uploaded to PCO.
+            url (str): The URL against which to perform the request.
+            offset (int): The offset at which to start.
+            per_page (int): The number of results that should be requested in a single page.
+            max_workers (int): The maximum number of pages to fetch concurrently.
+            params: Any additional named arguments will be passed as query parameters.
+
+        Yields:
+            dict: Each page returned by the API, in order.
+        """
+
+        response = self.get(url, offset=offset, per_page=per_page, **params)
+
+        if response is None:
+            return
+
+        yield response
+
+        offset += per_page
+
+        if 'next' not in response['links']:
+            return
+
+        total_count = response.get('meta', {}).get('total_count')
+
+        if total_count is not None:
+            self._log.debug("Prefetching %d records from \"%s\" with %d workers.",
+                            total_count, url, max_workers)
+
+            offsets = iter(range(offset, total_count, per_page))
+            pending: Deque[Tuple[int, Future]] = deque()
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                try:
+                    for page_offset in islice(offsets, max_workers):
+                        pending.append((page_offset, executor.submit(
+                            self.get, url, offset=page_offset, per_page=per_page, **params
+                        )))
+
+                    while pending:
+                        page_offset, future = pending.popleft()
+                        response = future.result()
+
+                        for page_offset_next in islice(offsets, 1):
+                            pending.append((page_offset_next, executor.submit(
+                                self.get, url, offset=page_offset_next, per_page=per_page, **params
+                            )))
+
+                        if response is None:
+                            return
+
+                        yield response
+
+                        offset = page_offset + per_page
+
+                        if 'next' not in response['links']:
+                            return
+
+                finally:
+                    for _, future in pending:
+                        future.cancel()
+
+        # Records were added since the first page was fetched (or total_count was
+        # missing), so pick up any remaining pages one at a time.
+        yield from self._iterate_sequential_pages(url, offset, per_page, **params)
+
+    def upload(  # pylint: disable=too-many-arguments
+            self,
+            file_path: UploadSource,
+            filename: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            progress: Optional[Callable[[UploadProgress], None]] = None,  # pylint: disable=unsubscriptable-object
+            **params
+        ) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Upload a file to PCO.
+
+        The request body is streamed in chunks, so files of any size can be uploaded
+        without reading them into memory. If the PCO object has an upload_cache, a file
+        whose content was uploaded recently is not uploaded again; the earlier upload's
+        response is returned instead.
+
+        Args:
+            file_path: The file to be uploaded to PCO: the path to the file, a binary file
+                object (read from its current position), or a bytes-like object (bytes,
+                bytearray, memoryview, or mmap).
+            filename (str): The name of the uploaded file. Defaults to the base name of the
+                path or file object, or "upload" for bytes-like objects.
+            progress (callable): Called with an UploadProgress (bytes sent, total bytes,
+                and elapsed time) as the upload proceeds.
             params: Any named arguments will be passed as query parameters. Values must
                 be of type str!
 
@@ -532,7 +1300,52 @@ class PCO:  # pylint: disable=too-many-instance-attributes
             dict: The PCO response from the file upload.
         """
 
-        return self.request_json('POST', self.upload_url, upload=file_path, **params)
+        upload = FileUpload(file_path, filename=filename, progress=progress)
+
+        try:
+            digest = upload.digest() if self.upload_cache is not None else None
+
+            if digest is None:
+                return self.request_json('POST', self.upload_url, upload=upload, **params)
+
+            return self.upload_cache.get_or_upload(  # type: ignore[union-attr]
+                f'{digest}:{upload.filename}',
+                lambda: self.request_json('POST', self.upload_url, upload=upload, **params)
+            )
+        finally:
+            upload.close()
+
+    def upload_many(
+            self,
+            files: Iterable[UploadSource],
+            max_workers: int = 4,
+            **params
+        ) -> Iterator[BulkResult]:
+        """Upload many files to PCO concurrently.
+
+        Uploads are executed on a pool of max_workers threads, each subject to
+        upload_timeout, and files are read from the input as workers become available.
+        Identical files are only uploaded once if the PCO object has an upload_cache.
+        A failed upload doesn't stop the others.
+
+        Args:
+            files (iterable): The files to upload; anything accepted by upload().
+            max_workers (int): The maximum number of uploads to execute concurrently.
+                Default 4.
+            params: Any named arguments will be passed as query parameters with every
+                upload. Values must be of type str!
+
+        Yields:
+            BulkResult: The outcome of each upload, in order of completion. The payload
+            attribute holds the file, and the result attribute holds the PCO response
+            from the upload.
+        """
+
+        return execute_bulk(
+            lambda url, file: self.upload(file, **params),
+            ((self.upload_url, file) for file in files),
+            max_workers
+        )
 
     def __del__(self):
         """Close the requests session when the PCO object goes out of scope."""
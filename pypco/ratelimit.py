@@ -0,0 +1,283 @@
+"""Client-side rate limiting driven by the PCO API's rate limit headers."""
+
+import abc
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import ContextManager, Iterator, Mapping, Optional
+
+from .auth_config import PCOAuthConfig
+from .file_lock import FileLock
+
+LIMIT_HEADER = 'X-PCO-API-Request-Rate-Limit'
+COUNT_HEADER = 'X-PCO-API-Request-Rate-Count'
+PERIOD_HEADER = 'X-PCO-API-Request-Rate-Period'
+
+
+class RateLimitBackend(abc.ABC):
+    """The base class for rate limiter state storage.
+
+    The state is a dict holding "limit", "period", "tokens", and "updated" keys. It is
+    empty until the first rate limit headers have been seen.
+    """
+
+    @abc.abstractmethod
+    def transaction(self) -> ContextManager[dict]:
+        """Lock the rate limit state for reading and updating.
+
+        Changes made to the yielded dict are saved when the context exits.
+
+        Returns:
+            ContextManager: A context manager yielding the rate limit state (a dict).
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Rate limit state shared by the threads of a single process."""
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._state: dict = {}
+
+    @contextmanager
+    def transaction(self) -> Iterator[dict]:
+
+        with self._lock:
+            yield self._state
+
+
+class FileRateLimitBackend(RateLimitBackend):
+    """Rate limit state shared by all processes on a host, stored in a locked file.
+
+    Use this backend when several processes (e.g. Celery or gunicorn workers) make
+    requests with the same credentials, so that together they stay within a single
+    request budget.
+
+    Args:
+        path (str): The path of the file in which state is stored. It will be created
+            if it doesn't exist.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self._file_lock = FileLock(path)
+
+    @classmethod
+    def for_credentials(  # pylint: disable=too-many-arguments
+            cls,
+            application_id: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            secret: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            token: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            cc_name: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            directory: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+    ) -> 'FileRateLimitBackend':
+        """Get the backend shared by every process using the specified credentials.
+
+        Args:
+            application_id (str): The application_id; secret must also be specified.
+            secret (str): The secret for your app; application_id must also be specified.
+            token (str): OAUTH token for your app.
+            cc_name (str): The vanity name portion of the <vanity_name>.churchcenter.com url.
+            directory (str): The directory in which the state file is stored.
+                Defaults to the system temporary directory.
+
+        Raises:
+            PCOCredentialsException: You have specified invalid authentication information.
+
+        Returns:
+            FileRateLimitBackend: The backend for these credentials.
+        """
+
+        auth_config = PCOAuthConfig(application_id, secret, token, cc_name)
+
+        return cls(os.path.join(
+            directory or tempfile.gettempdir(),
+            f'pypco-ratelimit-{auth_config.credentials_key}.json'
+        ))
+
+    @contextmanager
+    def transaction(self) -> Iterator[dict]:
+
+        with self._file_lock.locked() as state_fh:
+            contents = state_fh.read()
+            state = json.loads(contents) if contents else {}
+
+            yield state
+
+            state_fh.seek(0)
+            state_fh.truncate()
+            state_fh.write(json.dumps(state).encode())
+
+
+class RateLimiter:
+    """A token bucket that spaces requests out before the PCO rate limit is hit.
+
+    PCO reports the request limit, the number of requests made in the current period,
+    and the period length (seconds) on every response. The bucket holds up to "limit"
+    tokens and refills at limit / period tokens per second; each request takes one
+    token, waiting for the bucket to refill if it is empty. Until the first response
+    headers have been seen the limit is unknown and requests are not delayed.
+
+    A RateLimiter is thread-safe, and can be shared between PCO objects using the
+    same credentials. To share a request budget between processes, use a
+    FileRateLimitBackend.
+
+    Args:
+        reserve (int): The number of tokens to hold back, e.g. to leave headroom for
+            other clients using the same credentials. Default 0.
+        backend (RateLimitBackend): Where the rate limit state is stored.
+            Default: a new MemoryRateLimitBackend.
+    """
+
+    def __init__(
+            self,
+            reserve: int = 0,
+            backend: Optional[RateLimitBackend] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        self._log = logging.getLogger(__name__)
+
+        self.reserve = reserve
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+
+    @property
+    def limit(self) -> Optional[int]:  # pylint: disable=unsubscriptable-object
+        """int: The number of requests permitted per period, or None if not yet known."""
+
+        with self.backend.transaction() as state:
+            return state.get('limit')
+
+    @property
+    def period(self) -> Optional[int]:  # pylint: disable=unsubscriptable-object
+        """int: The length of the rate limit period in seconds, or None if not yet known."""
+
+        with self.backend.transaction() as state:
+            return state.get('period')
+
+    @property
+    def remaining(self) -> Optional[int]:  # pylint: disable=unsubscriptable-object
+        """int: The number of requests that can be made right now without waiting.
+
+        None if the limit is not yet known.
+        """
+
+        with self.backend.transaction() as state:
+            if not state:
+                return None
+
+            self._refill(state)
+
+            return max(0, math.floor(state['tokens'] - self.reserve))
+
+    @staticmethod
+    def _refill(state: dict) -> None:
+        """Add the tokens accrued since the state was last updated."""
+
+        now = time.time()
+
+        state['tokens'] = min(
+            float(state['limit']),
+            state['tokens'] + (now - state['updated']) * state['limit'] / state['period']
+        )
+        state['updated'] = now
+
+    def reserve_token(self) -> float:
+        """Take a token from the bucket without waiting for it.
+
+        Returns:
+            float: The number of seconds the caller must wait before making its request.
+        """
+
+        with self.backend.transaction() as state:
+            if not state:
+                return 0.0
+
+            self._refill(state)
+            state['tokens'] -= 1
+
+            if state['tokens'] >= self.reserve:
+                return 0.0
+
+            return (self.reserve - state['tokens']) * state['period'] / state['limit']
+
+    def acquire(self) -> float:
+        """Take a token from the bucket, sleeping until it is available.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+
+        wait = self.reserve_token()
+
+        if wait > 0:
+            self._log.debug("Rate limit budget exhausted. Waiting %.2f sec(s).", wait)
+            time.sleep(wait)
+
+        return wait
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Update the bucket from the rate limit headers of a PCO API response.
+
+        Responses without (valid) rate limit headers are ignored.
+
+        Args:
+            headers (dict): The response headers.
+        """
+
+        try:
+            limit = int(headers[LIMIT_HEADER])
+            count = int(headers[COUNT_HEADER])
+            period = int(headers[PERIOD_HEADER])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        if limit <= 0 or period <= 0:
+            return
+
+        with self.backend.transaction() as state:
+            if not state:
+                state['tokens'] = float(limit)
+                state['updated'] = time.time()
+
+            state['limit'] = limit
+            state['period'] = period
+            self._refill(state)
+
+            # The server's count is authoritative, but responses to concurrent requests
+            # can arrive out of order, so never hand back tokens based on it.
+            state['tokens'] = min(state['tokens'], float(limit - count))
+
+    def penalize(self, retry_after: float) -> bool:
+        """Empty the bucket after a rate limited (429) response.
+
+        Requests made through this limiter will wait at least retry_after seconds.
+
+        Args:
+            retry_after (float): The value of the Retry-After header.
+
+        Returns:
+            bool: True if the wait will be enforced by this limiter, False if the limit
+            isn't known yet and the caller must wait on its own.
+        """
+
+        with self.backend.transaction() as state:
+            if not state:
+                return False
+
+            self._refill(state)
+            state['tokens'] = min(
+                state['tokens'],
+                -retry_after * state['limit'] / state['period']
+            )
+
+            return True
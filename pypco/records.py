@@ -0,0 +1,263 @@
+"""Records and pages of list responses, and lightweight views of them."""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def index_included(included: List[dict]) -> Dict[Tuple[str, str], dict]:
+    """Build a lookup table of included objects keyed by (type, id).
+
+    Args:
+        included (list): The "included" node from a PCO API response.
+
+    Returns:
+        dict: Included objects keyed by a (type, id) tuple. If the same object appears
+        more than once, the first occurrence wins.
+    """
+
+    index: Dict[Tuple[str, str], dict] = {}
+
+    for include in included:
+        index.setdefault((include['type'], include['id']), include)
+
+    return index
+
+
+def resolve_included(data: dict, index: Dict[Tuple[str, str], dict]) -> List[dict]:
+    """Find the included objects related to an object.
+
+    Args:
+        data (dict): An object from the "data" node of a PCO API response.
+        index (dict): The response's included objects, as built by index_included().
+
+    Returns:
+        list: The included objects, in the order of the object's relationships.
+    """
+
+    included = []
+
+    for relationship in data.get('relationships', {}).values():
+        related = relationship['data']
+
+        if related is None:
+            continue
+
+        if isinstance(related, dict):
+            related = [related]
+
+        for identifier in related:
+            include = index.get((identifier['type'], identifier['id']))
+
+            if include is not None:
+                included.append(include)
+
+    return included
+
+
+def iterate_page_records(page: dict) -> Iterator[dict]:
+    """Split a page of a list response into individual records.
+
+    Objects specified as includes are injected into their associated record.
+
+    Args:
+        page (dict): A page returned by the PCO API.
+
+    Yields:
+        dict: Each object on the page with "data", "included", and "meta" nodes.
+    """
+
+    included_index = index_included(page.get('included', []))
+
+    for cur in page['data']:
+        record = {
+            'data': cur,
+            'included': resolve_included(cur, included_index),
+            'meta': {}
+        }
+
+        if 'can_include' in page['meta']:
+            record['meta']['can_include'] = page['meta']['can_include']
+
+        if 'parent' in page['meta']:
+            record['meta']['parent'] = page['meta']['parent']
+
+        yield record
+
+
+class RecordPage:
+    """The page-level state shared by the RecordViews of one page.
+
+    Args:
+        page (dict): A page returned by the PCO API.
+
+    Attributes:
+        meta (dict): The meta node shared by the page's records: the page's can_include
+            and parent, if present.
+    """
+
+    __slots__ = ('meta', '_included', '_index')
+
+    def __init__(self, page: dict):
+
+        page_meta = page.get('meta', {})
+
+        self.meta = {key: page_meta[key] for key in ('can_include', 'parent') if key in page_meta}
+        self._included = page.get('included', [])
+        self._index: Optional[Dict[Tuple[str, str], dict]] = None  # pylint: disable=unsubscriptable-object
+
+    @property
+    def index(self) -> Dict[Tuple[str, str], dict]:
+        """dict: The page's included objects keyed by (type, id), built on first use."""
+
+        if self._index is None:
+            self._index = index_included(self._included)
+
+        return self._index
+
+
+class RecordView(Mapping):
+    """A read-only, dict-compatible view of one record of a list response.
+
+    Record views are what PCO.iterate() yields with record_views=True. They behave like
+    the {"data": ..., "included": [...], "meta": {...}} dicts iterate() yields by default
+    (record['data'], record.get('included'), iteration, comparison with dicts), but
+    hold only a reference to the object and to state shared by the whole page, so
+    streaming many records allocates much less. Included objects are resolved the first
+    time they're accessed.
+
+    The meta node is shared by every record of the page and mustn't be modified. Use
+    to_dict() where a real dict is needed, e.g. for json.dumps().
+
+    Args:
+        data (dict): The object, from the page's data node.
+        page (RecordPage): The page's shared state.
+
+    Attributes:
+        data (dict): The object.
+    """
+
+    __slots__ = ('data', '_page', '_included')
+
+    _KEYS = ('data', 'included', 'meta')
+
+    def __init__(self, data: dict, page: RecordPage):
+
+        self.data = data
+        self._page = page
+        self._included: Optional[List[dict]] = None  # pylint: disable=unsubscriptable-object
+
+    @property
+    def included(self) -> List[dict]:
+        """list: The included objects related to the object."""
+
+        if self._included is None:
+            self._included = resolve_included(self.data, self._page.index)
+
+        return self._included
+
+    @property
+    def meta(self) -> dict:
+        """dict: The page's can_include and parent meta, shared by its records."""
+
+        return self._page.meta
+
+    def __getitem__(self, key: str) -> Any:
+
+        if key == 'data':
+            return self.data
+
+        if key == 'included':
+            return self.included
+
+        if key == 'meta':
+            return self._page.meta
+
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+
+        return f"RecordView({self.data.get('type')} {self.data.get('id')})"
+
+    def to_dict(self) -> dict:
+        """Copy the record into a dict, as yielded by iterate() without record_views.
+
+        Returns:
+            dict: The record with "data", "included", and "meta" nodes.
+        """
+
+        return {'data': self.data, 'included': list(self.included), 'meta': dict(self.meta)}
+
+
+class IndexedPage(Mapping):
+    """A page of a list response with its included objects indexed by (type, id).
+
+    Indexed pages are what PCO.iterate_pages() yields with index_includes=True. They
+    are read-only mappings of the page's nodes ("data", "included", "meta", and
+    "links"), so they can be used like the page dict.
+
+    Args:
+        page (dict): A page returned by the PCO API.
+
+    Attributes:
+        page (dict): The page.
+        index (dict): The page's included objects keyed by (type, id).
+    """
+
+    __slots__ = ('page', 'index')
+
+    def __init__(self, page: dict):
+
+        self.page = page
+        self.index = index_included(page.get('included', []))
+
+    def __getitem__(self, key: str) -> Any:
+
+        return self.page[key]
+
+    def __iter__(self) -> Iterator[str]:
+
+        return iter(self.page)
+
+    def __len__(self) -> int:
+
+        return len(self.page)
+
+    def __repr__(self) -> str:
+
+        return f"IndexedPage({len(self.page['data'])} objects, {len(self.index)} included)"
+
+    def included_for(self, data: dict) -> List[dict]:
+        """Find the included objects related to an object on the page.
+
+        Args:
+            data (dict): An object from the page's data node.
+
+        Returns:
+            list: The included objects, in the order of the object's relationships.
+        """
+
+        return resolve_included(data, self.index)
+
+
+def iterate_page_views(page: dict) -> Iterator[RecordView]:
+    """Split a page of a list response into record views.
+
+    Args:
+        page (dict): A page returned by the PCO API.
+
+    Yields:
+        RecordView: A view of each object on the page.
+    """
+
+    shared = RecordPage(page)
+
+    for data in page['data']:
+        yield RecordView(data, shared)
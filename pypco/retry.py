@@ -0,0 +1,170 @@
+"""Retry policies for failed requests."""
+
+import random
+
+from enum import Enum, auto
+from typing import Collection, Optional
+
+
+class RetryReason(Enum):  # pylint: disable=R0903
+    """Why a request failed."""
+
+    TIMEOUT = auto()
+    CONNECTION_ERROR = auto()
+    STATUS = auto()
+
+
+class RetryPolicy:  # pylint: disable=too-many-instance-attributes
+    """Decides which failed requests are retried, and how long to wait before retrying.
+
+    The default policy retries only timeouts, immediately, up to three attempts in
+    total. To ride out PCO incidents, retry server errors and connection errors as well,
+    with exponential backoff:
+
+        >>> policy = RetryPolicy(
+        >>>     max_attempts=8,
+        >>>     backoff=0.5,
+        >>>     retry_statuses=RetryPolicy.SERVER_ERRORS,
+        >>>     retry_connection_errors=True,
+        >>>     max_elapsed=300,
+        >>>     idempotent_methods=RetryPolicy.IDEMPOTENT_METHODS,
+        >>> )
+        >>> pco = PCO('app_id', 'secret', retry_policy=policy)
+
+    The wait before retry n is backoff * multiplier ** (n - 1) seconds, capped at
+    max_backoff. With jitter, a random wait between zero and that is used instead, so
+    clients that failed together don't retry together. A Retry-After header sent with
+    a retryable status is honored. Rate limited (429) responses are handled separately
+    and aren't subject to the policy.
+
+    A failed request that may have been processed by PCO (a response timed out, a
+    connection dropped, or an error status was returned) is only retried if its method is
+    idempotent, as repeating e.g. a POST could create a duplicate object. Requests that
+    were never sent (the connection couldn't be opened) are retried for any method.
+
+    Args:
+        max_attempts (int): The maximum number of attempts per request, including the
+            first. Default 3.
+        backoff (float): The wait (seconds) before the first retry. Default 0 (retry
+            immediately).
+        multiplier (float): The factor by which the wait grows with each retry.
+            Default 2.
+        max_backoff (float): The longest wait (seconds) between attempts. Default 30.
+        jitter (bool): Whether to randomize waits. Default True.
+        retry_timeouts (bool): Whether to retry requests that timed out. Default True.
+        retry_connection_errors (bool): Whether to retry requests whose connection failed
+            (refused, reset, or dropped). Default False.
+        retry_statuses (collection): The HTTP statuses for which requests are retried
+            (e.g. SERVER_ERRORS, or range(500, 600)). Default: none.
+        max_elapsed (float): Don't retry once this many seconds would have passed since
+            the first attempt. Default None (no limit).
+        idempotent_methods (collection): The HTTP methods that are safe to repeat.
+            Default None (every method, including POST).
+    """
+
+    SERVER_ERRORS = frozenset({500, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            max_attempts: int = 3,
+            backoff: float = 0.0,
+            multiplier: float = 2.0,
+            max_backoff: float = 30.0,
+            jitter: bool = True,
+            retry_timeouts: bool = True,
+            retry_connection_errors: bool = False,
+            retry_statuses: Collection[int] = (),
+            max_elapsed: Optional[float] = None,  # pylint: disable=unsubscriptable-object
+            idempotent_methods: Optional[Collection[str]] = None,  # pylint: disable=unsubscriptable-object
+    ):
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_timeouts = retry_timeouts
+        self.retry_connection_errors = retry_connection_errors
+        self.retry_statuses = retry_statuses
+        self.max_elapsed = max_elapsed
+        self.idempotent_methods = idempotent_methods
+
+    def is_idempotent(self, method: str) -> bool:
+        """Check whether requests with a method are safe to repeat.
+
+        Args:
+            method (str): The HTTP method.
+
+        Returns:
+            bool: True if the method is idempotent.
+        """
+
+        return self.idempotent_methods is None or method.upper() in self.idempotent_methods
+
+    def retry_delay(  # pylint: disable=too-many-arguments
+            self,
+            method: str,
+            attempt: int,
+            elapsed: float,
+            reason: RetryReason,
+            status: Optional[int] = None,  # pylint: disable=unsubscriptable-object
+            sent: bool = True,
+            retry_after: Optional[float] = None,  # pylint: disable=unsubscriptable-object
+    ) -> Optional[float]:  # pylint: disable=unsubscriptable-object
+        """Decide whether to retry a failed request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            attempt (int): The number of attempts made so far (1 after the first failure).
+            elapsed (float): The number of seconds since the first attempt started.
+            reason (RetryReason): Why the attempt failed.
+            status (int): The HTTP status of the response (RetryReason.STATUS).
+            sent (bool): False if the request certainly wasn't sent, so it is safe to
+                repeat regardless of its method. Default True.
+            retry_after (float): The wait (seconds) requested by the server, if any.
+
+        Returns:
+            float: How long (seconds) to wait before retrying, or None if the request
+            shouldn't be retried.
+        """
+
+        if attempt >= self.max_attempts:
+            return None
+
+        if reason == RetryReason.TIMEOUT:
+            retryable = self.retry_timeouts
+        elif reason == RetryReason.CONNECTION_ERROR:
+            retryable = self.retry_connection_errors
+        else:
+            retryable = status in self.retry_statuses
+
+        if not retryable or (sent and not self.is_idempotent(method)):
+            return None
+
+        delay = self.delay(attempt)
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if self.max_elapsed is not None and elapsed + delay > self.max_elapsed:
+            return None
+
+        return delay
+
+    def delay(self, attempt: int) -> float:
+        """Compute the wait before a retry.
+
+        Args:
+            attempt (int): The number of attempts made so far.
+
+        Returns:
+            float: The wait in seconds.
+        """
+
+        if self.backoff <= 0:
+            return 0.0
+
+        delay = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+
+        return random.uniform(0, delay) if self.jitter else delay
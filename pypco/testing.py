@@ -0,0 +1,615 @@
+"""A local stand-in for the PCO API, for load testing and benchmarks.
+
+FakePCOServer serves synthetic collections shaped like PCO API responses (with
+"included", "links", and "meta" nodes), emulates PCO's rate limiting, and can inject
+latency and errors, so client throughput can be measured without touching the real API:
+
+    >>> with FakePCOServer(records=5000, latency=0.02) as server:
+    >>>     pco = PCO('app_id', 'secret', api_base=server.url, upload_url=server.upload_url)
+    >>>     people = list(pco.iterate('/people/v2/people', include='emails'))
+
+It can also be run on its own (e.g. for load testing with other tools):
+
+    python -m pypco.testing --port 8000 --records 10000 --rate-limit 100
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import socketserver
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Relationships of the synthetic records: include name -> (object type, objects per record)
+DEFAULT_INCLUDES = {
+    'emails': ('Email', 2),
+    'phone_numbers': ('PhoneNumber', 1),
+    'addresses': ('Address', 1),
+}
+
+_COLLECTION_PATH = re.compile(r'^/(\w+)/v2/(\w+)(?:/(\w+)(?:/(\w+))?)?/?$')
+_WHERE = re.compile(r'^where\[(\w+)\](?:\[(gt|gte|lt|lte)\])?$')
+_FILENAME = re.compile(rb'filename="((?:[^"\\]|\\.)*)"')
+
+_EPOCH = 1767225600  # 2026-01-01T00:00:00Z
+
+
+def _timestamp(seconds: float) -> str:
+    """Format seconds since the epoch as a PCO timestamp."""
+
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(seconds))
+
+
+def _object_type(collection: str) -> str:
+    """Guess the object type of a collection from its name (e.g. phone_numbers -> PhoneNumber)."""
+
+    if collection == 'people':
+        return 'Person'
+
+    name = collection[:-1] if collection.endswith('s') else collection
+
+    return ''.join(part.capitalize() for part in name.split('_'))
+
+
+class FakePCOServer:  # pylint: disable=too-many-instance-attributes
+    """A local HTTP server standing in for the PCO API.
+
+    Any path shaped like /<app>/v2/<collection> is served as a collection of synthetic
+    records, created the first time it is requested. Collections support offset and
+    per_page pagination (links.next and meta.next are set when there are more records),
+    include (see DEFAULT_INCLUDES), order (by any attribute, "-" for descending), and
+    where[attribute] / where[attribute][gt|gte|lt|lte] filters. Single records and their
+    related objects (/<app>/v2/<collection>/<id>/<include>) can be requested as well.
+    POST, PATCH, and DELETE requests change the in-memory records, and files can be
+    uploaded to upload_url.
+
+    Rate limiting follows PCO: each set of credentials (Authorization header) may make
+    rate_limit requests per rate_limit_period seconds. Every response carries the
+    X-PCO-API-Request-Rate-* headers, and requests over the limit get a 429 response with
+    a Retry-After header.
+
+    Args:
+        records (int): The number of records in each collection. Default 1000.
+        includes (dict): The related objects of each record, as include name ->
+            (object type, objects per record). Default: DEFAULT_INCLUDES.
+        latency (float): Seconds to wait before each response. Default 0.
+        latency_jitter (float): Up to this many more seconds are added to the latency at
+            random. Default 0.
+        error_rate (float): The fraction of requests (0 - 1) that fail with error_status.
+            Default 0.
+        error_status (int): The status of injected errors. Default 503.
+        rate_limit (int): The number of requests allowed per rate_limit_period, or None
+            for no rate limiting. Default None.
+        rate_limit_period (int): The length (seconds) of a rate limit window. Default 20.
+        seed (int): The seed for random latency and errors, for repeatable runs. Default 0.
+        host (str): The address to listen on. Default 127.0.0.1.
+        port (int): The port to listen on. Default: any free port.
+
+    Attributes:
+        url (str): The base URL of the server; use it as the PCO api_base.
+        upload_url (str): The URL to which files can be uploaded.
+        requests (int): The number of requests received.
+        rate_limited (int): The number of requests rejected by the rate limit.
+        errors (int): The number of injected errors.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            records: int = 1000,
+            includes: Optional[Dict[str, Tuple[str, int]]] = None,  # pylint: disable=unsubscriptable-object
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            error_rate: float = 0.0,
+            error_status: int = 503,
+            rate_limit: Optional[int] = None,  # pylint: disable=unsubscriptable-object
+            rate_limit_period: int = 20,
+            seed: int = 0,
+            host: str = '127.0.0.1',
+            port: int = 0,
+    ):
+
+        self.records = records
+        self.includes = DEFAULT_INCLUDES if includes is None else includes
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._collections: Dict[str, Dict[str, dict]] = {}
+        self._next_ids: Dict[str, int] = {}
+        self._windows: Dict[str, Tuple[float, int]] = {}
+
+        self._server = _ThreadingHTTPServer((host, port), _FakePCOHandler)
+        self._server.fake = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None  # pylint: disable=unsubscriptable-object
+
+        self.url = f'http://{host}:{self._server.server_address[1]}'
+        self.upload_url = f'{self.url}/upload/v2/files'
+
+    def __enter__(self) -> 'FakePCOServer':
+
+        self.start()
+
+        return self
+
+    def __exit__(self, *_) -> None:
+
+        self.stop()
+
+    def start(self) -> None:
+        """Start serving requests on a background thread."""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self) -> None:
+        """Reset the request counters and rate limit windows."""
+
+        with self._lock:
+            self.requests = 0
+            self.rate_limited = 0
+            self.errors = 0
+            self._windows.clear()
+
+    def collection(self, app: str, name: str) -> Dict[str, dict]:
+        """Get a collection's records by id, creating them if needed.
+
+        Args:
+            app (str): The app (e.g. "people").
+            name (str): The collection (e.g. "people").
+
+        Returns:
+            dict: The records, keyed by id. Changes are visible to later requests.
+        """
+
+        key = f'{app}/{name}'
+
+        with self._lock:
+            records = self._collections.get(key)
+
+            if records is None:
+                object_type = _object_type(name)
+                records = {
+                    str(number): self._generate(object_type, number)
+                    for number in range(1, self.records + 1)
+                }
+                self._collections[key] = records
+                self._next_ids[key] = self.records + 1
+
+            return records
+
+    def _generate(self, object_type: str, number: int) -> dict:
+        """Generate a synthetic record."""
+
+        record_id = str(number)
+
+        return {
+            'type': object_type,
+            'id': record_id,
+            'attributes': {
+                'name': f'{object_type} {number}',
+                'first_name': f'First{number}',
+                'last_name': f'Last{number % 997}',
+                'status': 'active' if number % 10 else 'inactive',
+                'created_at': _timestamp(_EPOCH + number),
+                'updated_at': _timestamp(_EPOCH + number * 60),
+            },
+            'relationships': {
+                include: {'data': [
+                    {'type': include_type, 'id': f'{record_id}{index:02d}'}
+                    for index in range(count)
+                ]}
+                for include, (include_type, count) in self.includes.items()
+            },
+            'links': {},
+        }
+
+    def _related(self, record: dict, include: str) -> List[dict]:
+        """Build a record's related objects for an include."""
+
+        include_type = self.includes[include][0]
+
+        return [
+            {
+                'type': include_type,
+                'id': related['id'],
+                'attributes': {
+                    'address': f'person{record["id"]}-{related["id"]}@example.com',
+                    'number': f'555-{related["id"][-4:].zfill(4)}',
+                    'primary': related['id'].endswith('00'),
+                },
+                'links': {},
+            }
+            for related in record['relationships'][include]['data']
+        ]
+
+    def _admit(self, credentials: str) -> Tuple[Optional[int], Dict[str, str]]:  # pylint: disable=unsubscriptable-object
+        """Apply the rate limit and pick injected latency and errors for a request.
+
+        Returns:
+            tuple: The status with which to fail the request (or None), and the rate
+            limit headers to send.
+        """
+
+        with self._lock:
+            self.requests += 1
+            headers = {}
+
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                start, count = self._windows.get(credentials, (now, 0))
+
+                if now - start >= self.rate_limit_period:
+                    start, count = now, 0
+
+                count += 1
+                self._windows[credentials] = (start, count)
+
+                headers = {
+                    'X-PCO-API-Request-Rate-Limit': str(self.rate_limit),
+                    'X-PCO-API-Request-Rate-Count': str(min(count, self.rate_limit)),
+                    'X-PCO-API-Request-Rate-Period': str(self.rate_limit_period),
+                }
+
+                if count > self.rate_limit:
+                    self.rate_limited += 1
+                    headers['Retry-After'] = str(
+                        max(1, math.ceil(start + self.rate_limit_period - now))
+                    )
+
+                    return 429, headers
+
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+
+            if failed:
+                self.errors += 1
+
+        if delay > 0:
+            time.sleep(delay)
+
+        return (self.error_status if failed else None), headers
+
+    def _list(self, url: str, objects: List[dict], params: Dict[str, str],
+              records: Optional[List[dict]] = None) -> dict:  # pylint: disable=unsubscriptable-object
+        """Build a page of a list response."""
+
+        for param, value in params.items():
+            match = _WHERE.match(param)
+
+            if match:
+                attribute, operator = match.groups()
+                objects = [
+                    item for item in objects
+                    if _compare(item['attributes'].get(attribute), operator, value)
+                ]
+
+        if 'order' in params:
+            attribute = params['order'].lstrip('-')
+            objects = sorted(
+                objects,
+                key=lambda item: (str(item['attributes'].get(attribute, '')), int(item['id'])),
+                reverse=params['order'].startswith('-')
+            )
+
+        offset = int(params.get('offset', 0))
+        per_page = min(int(params.get('per_page', 25)), 100)
+        page = objects[offset:offset + per_page]
+
+        body: Dict[str, Any] = {
+            'links': {'self': f'{url}?{urlencode(params)}' if params else url},
+            'data': page,
+            'included': self._included(page, params.get('include'), records),
+            'meta': {
+                'total_count': len(objects),
+                'count': len(page),
+                'can_order_by': ['name', 'first_name', 'last_name', 'created_at', 'updated_at'],
+                'can_query_by': ['name', 'first_name', 'last_name', 'status'],
+                'can_include': list(self.includes) if records is None else [],
+                'parent': {'id': '1', 'type': 'Organization'},
+            },
+        }
+
+        if offset + per_page < len(objects):
+            next_params = dict(params, offset=str(offset + per_page))
+            body['links']['next'] = f'{url}?{urlencode(next_params)}'
+            body['meta']['next'] = {'offset': offset + per_page}
+
+        if offset > 0:
+            body['meta']['prev'] = {'offset': max(0, offset - per_page)}
+
+        return body
+
+    def _included(self, page: List[dict], include: Optional[str],  # pylint: disable=unsubscriptable-object
+                  records: Optional[List[dict]]) -> List[dict]:  # pylint: disable=unsubscriptable-object
+        """Build the included objects of a page."""
+
+        if not include or records is not None:
+            return []
+
+        return [
+            related
+            for name in include.split(',') if name in self.includes
+            for record in page
+            for related in self._related(record, name)
+        ]
+
+    def respond(self, method: str, path: str, params: Dict[str, str],
+                payload: Optional[dict]) -> Tuple[int, Optional[dict]]:  # pylint: disable=unsubscriptable-object,too-many-return-statements
+        """Handle an API request.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the request.
+            params (dict): The query string parameters.
+            payload (dict): The decoded request body, if any.
+
+        Returns:
+            tuple: The status and body of the response.
+        """
+
+        match = _COLLECTION_PATH.match(path)
+
+        if match is None:
+            return 404, {'errors': [{'status': '404', 'title': 'Not Found'}]}
+
+        app, name, record_id, include = match.groups()
+        records = self.collection(app, name)
+        url = f'{self.url}/{app}/v2/{name}'
+
+        if record_id is None:
+            if method == 'GET':
+                with self._lock:
+                    objects = list(records.values())
+
+                return 200, self._list(url, objects, params)
+
+            if method == 'POST':
+                return 201, {'data': self._create(app, name, payload)}
+
+            return 405, {'errors': [{'status': '405', 'title': 'Method Not Allowed'}]}
+
+        with self._lock:
+            record = records.get(record_id)
+
+        if record is None or (include is not None and include not in self.includes):
+            return 404, {'errors': [{'status': '404', 'title': 'Not Found'}]}
+
+        if include is not None:
+            related = self._related(record, include)
+            return 200, self._list(f'{url}/{record_id}/{include}', related, params, related)
+
+        if method == 'DELETE':
+            with self._lock:
+                records.pop(record_id, None)
+
+            return 204, None
+
+        if method == 'PATCH':
+            with self._lock:
+                record['attributes'].update((payload or {}).get('data', {}).get('attributes', {}))
+                record['attributes']['updated_at'] = _timestamp(time.time())
+        elif method != 'GET':
+            return 405, {'errors': [{'status': '405', 'title': 'Method Not Allowed'}]}
+
+        return 200, {
+            'data': record,
+            'included': self._included([record], params.get('include'), None),
+            'meta': {'can_include': list(self.includes), 'parent': {'id': '1', 'type': 'Organization'}},
+        }
+
+    def _create(self, app: str, name: str, payload: Optional[dict]) -> dict:  # pylint: disable=unsubscriptable-object
+        """Create a record from a POST payload."""
+
+        data = (payload or {}).get('data', {})
+        records = self.collection(app, name)
+        key = f'{app}/{name}'
+
+        with self._lock:
+            record_id = str(self._next_ids[key])
+            self._next_ids[key] += 1
+
+            now = _timestamp(time.time())
+            record = {
+                'type': data.get('type', _object_type(name)),
+                'id': record_id,
+                'attributes': dict(data.get('attributes', {}), created_at=now, updated_at=now),
+                'relationships': {},
+                'links': {},
+            }
+            records[record_id] = record
+
+        return record
+
+    def upload(self, body: bytes) -> dict:
+        """Handle a file upload.
+
+        Args:
+            body (bytes): The multipart/form-data request body.
+
+        Returns:
+            dict: The upload response.
+        """
+
+        match = _FILENAME.search(body)
+
+        return {'data': [{
+            'type': 'File',
+            'id': uuid.uuid4().hex,
+            'attributes': {
+                'name': match.group(1).decode('utf-8', 'replace') if match else 'upload',
+                'file_size': len(body),
+                'expires_at': _timestamp(time.time() + 3600),
+            },
+        }]}
+
+
+def _compare(value: Any, operator: Optional[str], expected: str) -> bool:  # pylint: disable=unsubscriptable-object
+    """Evaluate a where[] filter against an attribute value."""
+
+    value = '' if value is None else str(value)
+
+    if operator is None:
+        return value == expected
+    if operator == 'gt':
+        return value > expected
+    if operator == 'gte':
+        return value >= expected
+    if operator == 'lt':
+        return value < expected
+
+    return value <= expected
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """An HTTP server handling each connection on its own thread."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (e.g. on timeouts) are expected under load
+        pass
+
+
+class _FakePCOHandler(BaseHTTPRequestHandler):
+    """Handles requests for a FakePCOServer."""
+
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately; with Nagle's algorithm, keep-alive
+    # responses would stall on the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def _read_body(self) -> bytes:
+        """Read the request body, whether it has a Content-Length or is chunked."""
+
+        if 'Content-Length' in self.headers:
+            return self.rfile.read(int(self.headers['Content-Length']))
+
+        if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+            return b''
+
+        chunks = []
+
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            chunk = self.rfile.read(size + 2)[:size]
+
+            if not size:
+                return b''.join(chunks)
+
+            chunks.append(chunk)
+
+    def _send(self, status: int, body: Optional[dict], headers: Dict[str, str]) -> None:  # pylint: disable=unsubscriptable-object
+        """Send a JSON response."""
+
+        encoded = b'' if body is None else json.dumps(body).encode()
+
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/vnd.api+json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _handle(self) -> None:
+        """Handle a request of any method."""
+
+        fake: FakePCOServer = self.server.fake  # type: ignore[attr-defined]
+        body = self._read_body()
+
+        status, headers = fake._admit(self.headers.get('Authorization', ''))  # pylint: disable=protected-access
+
+        if status is not None:
+            self._send(status, {'errors': [{'status': str(status)}]}, headers)
+            return
+
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query))
+
+        if parts.path.rstrip('/') == urlsplit(fake.upload_url).path:
+            self._send(200, fake.upload(body), headers)
+            return
+
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            self._send(400, {'errors': [{'status': '400', 'title': 'Bad Request'}]}, headers)
+            return
+
+        status, response = fake.respond(self.command, parts.path, params, payload)
+        self._send(status, response, headers)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PATCH = _handle
+    do_PUT = _handle
+    do_DELETE = _handle
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pylint: disable=unsubscriptable-object
+    """Run a FakePCOServer until interrupted."""
+
+    parser = argparse.ArgumentParser(description='Run a local stand-in for the PCO API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--records', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--rate-limit', type=int, default=None)
+    parser.add_argument('--rate-limit-period', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    server = FakePCOServer(
+        records=args.records,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit,
+        rate_limit_period=args.rate_limit_period,
+        host=args.host,
+        port=args.port,
+    )
+
+    print(f'Serving a fake PCO API at {server.url} (uploads: {server.upload_url})')
+
+    try:
+        server._server.serve_forever()  # pylint: disable=protected-access
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()  # pylint: disable=protected-access
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,450 @@
+"""Streaming multipart file uploads."""
+
+import hashlib
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import IO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+from .exceptions import PCOUnexpectedRequestException
+
+UploadSource = Union[str, bytes, bytearray, memoryview, mmap.mmap, IO[bytes]]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class UploadProgress:  # pylint: disable=too-few-public-methods
+    """The progress of an upload, as reported to progress callbacks.
+
+    Attributes:
+        sent (int): The number of bytes of the request body sent so far.
+        total (int): The total size of the request body in bytes, or None if unknown.
+        elapsed (float): The number of seconds since the upload started.
+    """
+
+    __slots__ = ('sent', 'total', 'elapsed')
+
+    def __init__(
+            self,
+            sent: int,
+            total: Optional[int],  # pylint: disable=unsubscriptable-object
+            elapsed: float,
+    ):
+
+        self.sent = sent
+        self.total = total
+        self.elapsed = elapsed
+
+    @property
+    def fraction(self) -> Optional[float]:  # pylint: disable=unsubscriptable-object
+        """float: The fraction of the upload completed (0 - 1), or None if unknown."""
+
+        if not self.total:
+            return None
+
+        return self.sent / self.total
+
+    @property
+    def rate(self) -> float:
+        """float: The average throughput so far, in bytes per second."""
+
+        if self.elapsed <= 0:
+            return 0.0
+
+        return self.sent / self.elapsed
+
+    def __repr__(self) -> str:
+
+        return f'UploadProgress(sent={self.sent}, total={self.total}, elapsed={self.elapsed:.2f})'
+
+
+class FileUpload:
+    """A file to be uploaded to PCO as a streamed multipart/form-data request body.
+
+    The body is produced in chunks as it is sent, so only one chunk of the file is held
+    in memory at a time regardless of the file's size. Bytes-like sources (including
+    memory-mapped files) are read through a memoryview without being copied as a whole.
+
+    Args:
+        source: The file to upload: a path, a binary file object, or a bytes-like object
+            (bytes, bytearray, memoryview, or mmap). File objects are read from their
+            current position; they must be seekable for the upload to be retried after a
+            timeout, and for its size to be known in advance.
+        filename (str): The name of the uploaded file. Defaults to the base name of the
+            path or file object, or "upload" for bytes-like sources.
+        content_type (str): The MIME type of the file. Guessed from the file name by
+            default.
+        progress (callable): Called with an UploadProgress after every chunk is sent.
+        chunk_size (int): The size of the chunks in which the body is sent. Default 64 KiB.
+    """
+
+    field_name = 'file'
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self,
+            source: UploadSource,
+            filename: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            content_type: Optional[str] = None,  # pylint: disable=unsubscriptable-object
+            progress: Optional[Callable[[UploadProgress], None]] = None,  # pylint: disable=unsubscriptable-object
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+
+        self._owns_file = False
+        self._buffer: Optional[memoryview] = None  # pylint: disable=unsubscriptable-object
+        self._file: Optional[IO[bytes]] = None  # pylint: disable=unsubscriptable-object
+        self._start = 0
+        self._read = False
+
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')  # pylint: disable=consider-using-with
+            self._owns_file = True
+            default_name = os.path.basename(source)
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer = memoryview(source).cast('B')
+            default_name = 'upload'
+        else:
+            self._file = source
+            name = getattr(source, 'name', None)
+            default_name = os.path.basename(name) if isinstance(name, str) else 'upload'
+
+            try:
+                self._start = source.tell()
+            except (AttributeError, OSError):
+                self._start = None
+
+        self.filename = filename or default_name
+        self.content_type = content_type or \
+            mimetypes.guess_type(self.filename)[0] or 'application/octet-stream'
+        self.progress = progress
+        self.chunk_size = chunk_size
+
+        self.boundary = uuid.uuid4().hex
+
+        disposition_name = self.filename.replace('\\', '\\\\').replace('"', '\\"')
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{self.field_name}"; '
+            f'filename="{disposition_name}"\r\n'
+            f'Content-Type: {self.content_type}\r\n\r\n'
+        ).encode()
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode()
+
+    @property
+    def headers(self) -> dict:
+        """dict: The request headers describing the body."""
+
+        return {'Content-Type': f'multipart/form-data; boundary={self.boundary}'}
+
+    @property
+    def file_size(self) -> Optional[int]:  # pylint: disable=unsubscriptable-object
+        """int: The number of bytes of the file to upload, or None if unknown."""
+
+        if self._buffer is not None:
+            return self._buffer.nbytes
+
+        if self._start is None:
+            return None
+
+        try:
+            return os.fstat(self._file.fileno()).st_size - self._start  # type: ignore[union-attr]
+        except (AttributeError, OSError, TypeError, ValueError):
+            pass
+
+        try:
+            position = self._file.tell()  # type: ignore[union-attr]
+            end = self._file.seek(0, os.SEEK_END)  # type: ignore[union-attr]
+            self._file.seek(position)  # type: ignore[union-attr]
+
+            return int(end - self._start)
+        except (AttributeError, OSError, TypeError, ValueError):
+            return None
+
+    @property
+    def size(self) -> Optional[int]:  # pylint: disable=unsubscriptable-object
+        """int: The total size of the request body in bytes, or None if unknown."""
+
+        file_size = self.file_size
+
+        if file_size is None:
+            return None
+
+        return len(self._head) + file_size + len(self._tail)
+
+    def body(self) -> Union['MultipartBody', Iterator[bytes]]:  # pylint: disable=unsubscriptable-object
+        """Create a reader for the request body, starting from the beginning of the file.
+
+        Raises:
+            PCOUnexpectedRequestException: The file isn't seekable and has already been
+                (partly) read, so the body can't be produced again, e.g. to retry the
+                upload.
+
+        Returns:
+            MultipartBody: A file-like object producing the request body, or an iterator
+            over the chunks of the body if its size is unknown (so that it is sent with
+            chunked transfer encoding).
+        """
+
+        if self._file is not None:
+            if self._start is not None:
+                self._file.seek(self._start)
+            elif self._read:
+                raise PCOUnexpectedRequestException(
+                    f"Can't send \"{self.filename}\" again: the file isn't seekable."
+                )
+
+        body = MultipartBody(self)
+
+        return body if body.size is not None else iter(body)
+
+    def chunks(self) -> Iterator[bytes]:
+        """Produce the parts of the request body (without progress reporting)."""
+
+        yield self._head
+
+        if self._buffer is not None:
+            for offset in range(0, self._buffer.nbytes, self.chunk_size):
+                yield bytes(self._buffer[offset:offset + self.chunk_size])
+        else:
+            self._read = True
+
+            while True:
+                chunk = self._file.read(self.chunk_size)  # type: ignore[union-attr]
+
+                if not chunk:
+                    break
+
+                yield chunk
+
+        yield self._tail
+
+    def digest(self) -> Optional[str]:  # pylint: disable=unsubscriptable-object
+        """Compute the SHA-256 hash of the file's content.
+
+        The file is read in chunks and its position is restored afterwards.
+
+        Returns:
+            str: The hex digest, or None if the file can't be read twice (it isn't
+            seekable).
+        """
+
+        if self._file is not None and self._start is None:
+            return None
+
+        sha256 = hashlib.sha256()
+
+        if self._buffer is not None:
+            sha256.update(self._buffer)
+        else:
+            self._file.seek(self._start)  # type: ignore[union-attr]
+
+            for chunk in iter(lambda: self._file.read(self.chunk_size), b''):  # type: ignore[union-attr]
+                sha256.update(chunk)
+
+            self._file.seek(self._start)  # type: ignore[union-attr]
+
+        return sha256.hexdigest()
+
+    def close(self) -> None:
+        """Close the file, if it was opened from a path."""
+
+        if self._owns_file and self._file is not None:
+            self._file.close()
+
+
+class MultipartBody:
+    """A file-like reader producing a FileUpload's multipart request body in chunks.
+
+    It supports read() and iteration, and has a length when the size of the file is
+    known, so requests sends it with a Content-Length header without buffering it.
+
+    Args:
+        upload (FileUpload): The upload whose body to produce.
+    """
+
+    def __init__(self, upload: FileUpload):
+
+        self._upload = upload
+        self._chunks = upload.chunks()
+        self._pending = b''
+        self.size = upload.size
+        self._sent = 0
+        self._started: Optional[float] = None  # pylint: disable=unsubscriptable-object
+
+    def __len__(self) -> int:
+
+        if self.size is None:
+            raise TypeError('The size of the upload is unknown')
+
+        return self.size
+
+    def __iter__(self) -> Iterator[bytes]:
+
+        while True:
+            chunk = self.read(self._upload.chunk_size)
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes of the body (the whole remaining body if size < 0)."""
+
+        if self._started is None:
+            self._started = time.monotonic()
+
+        parts = [self._pending]
+        length = len(self._pending)
+
+        while size < 0 or length < size:
+            chunk = next(self._chunks, None)
+
+            if chunk is None:
+                break
+
+            parts.append(chunk)
+            length += len(chunk)
+
+        data = b''.join(parts)
+
+        if 0 <= size < len(data):
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = b''
+
+        if data:
+            self._sent += len(data)
+
+            if self._upload.progress is not None:
+                self._upload.progress(UploadProgress(
+                    self._sent, self.size, time.monotonic() - self._started
+                ))
+
+        return data
+
+
+class UploadCache:
+    """Remembers uploaded files by content hash, so identical files aren't uploaded again.
+
+    PCO keeps uploaded files for a limited time before they must be attached to an
+    object, so cached uploads expire after ttl seconds; set it to no more than the
+    server's retention window. The cache is thread-safe, and concurrent uploads of
+    identical content are coalesced into a single upload.
+
+    Args:
+        ttl (float): How long (seconds) an upload can be reused. Default 3600.
+        max_entries (int): The maximum number of uploads to remember. Default 10000.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 10000):
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[float, dict]]' = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+
+    def __len__(self) -> int:
+
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Get the response to an earlier upload of the same content, if still reusable.
+
+        Args:
+            digest (str): The content hash of the file (see FileUpload.digest()).
+
+        Returns:
+            dict: The upload response, or None if the content hasn't been uploaded
+            within the TTL.
+        """
+
+        with self._lock:
+            return self._get(digest)
+
+    def set(self, digest: str, response: dict) -> None:
+        """Remember an upload.
+
+        Args:
+            digest (str): The content hash of the file (see FileUpload.digest()).
+            response (dict): The upload response.
+        """
+
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._entries[digest] = (time.time(), response)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_upload(self, digest: str, upload: Callable[[], dict]) -> dict:
+        """Reuse an earlier upload of the same content, or upload it.
+
+        If the same content is being uploaded by another thread, wait for that upload
+        instead of starting another one.
+
+        Args:
+            digest (str): The content hash of the file (see FileUpload.digest()).
+            upload (callable): Uploads the file and returns the upload response.
+
+        Returns:
+            dict: The upload response.
+        """
+
+        with self._lock:
+            response = self._get(digest)
+
+            if response is not None:
+                self.hits += 1
+                return response
+
+            in_flight = self._in_flight.get(digest)
+
+            if in_flight is None:
+                self.misses += 1
+                future: Future = Future()
+                self._in_flight[digest] = future
+
+        if in_flight is not None:
+            with self._lock:
+                self.hits += 1
+
+            return in_flight.result()
+
+        try:
+            response = upload()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            self.set(digest, response)
+            future.set_result(response)
+        finally:
+            with self._lock:
+                del self._in_flight[digest]
+
+        return response
+
+    def _get(self, digest: str) -> Optional[dict]:  # pylint: disable=unsubscriptable-object
+        """Get an unexpired entry. Must be called with the lock held."""
+
+        entry = self._entries.get(digest)
+
+        if entry is None:
+            return None
+
+        if time.time() - entry[0] >= self.ttl:
+            del self._entries[digest]
+            return None
+
+        return entry[1]
@@ -38,13 +38,19 @@ def get_browser_redirect_url(client_id: str, redirect_uri: str, scopes: List[str
     return f"{url}{urllib.parse.urlencode(params)}"
 
 
-def _do_oauth_post(url: str, **kwargs) -> requests.Response:
+def _do_oauth_post(
+        url: str,
+        session: Optional[requests.Session] = None,  # pylint: disable=unsubscriptable-object
+        **kwargs
+    ) -> requests.Response:
     """Do a Post request to facilitate the OAUTH process.
 
     Handles error handling appropriately and raises pypco exceptions.
 
     Args:
         url (str): The url to which the request should be made.
+        session (requests.Session): The session with which to make the request, so its
+            connections can be reused. Default: a new connection.
         **kwargs: Data fields sent as the request payload.
 
     Raises:
@@ -57,7 +63,7 @@ def _do_oauth_post(url: str, **kwargs) -> requests.Response:
     """
 
     try:
-        response = requests.post(
+        response = (session.post if session is not None else requests.post)(
             url,
             data={
                 **kwargs
@@ -115,7 +121,12 @@ def get_oauth_access_token(client_id: str, client_secret: str, code: int, redire
     ).json()
 
 
-def get_oauth_refresh_token(client_id: str, client_secret: str, refresh_token: str) -> dict:
+def get_oauth_refresh_token(
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        session: Optional[requests.Session] = None,  # pylint: disable=unsubscriptable-object
+    ) -> dict:
     """Refresh the access token.
 
     This assumes you have already completed steps 1, 2, and 3 as described at:
@@ -125,6 +136,8 @@ def get_oauth_refresh_token(client_id: str, client_secret: str, refresh_token: s
         client_id (str): The client id for your app.
         client_secret (str): The client secret for your app.
         refresh_token (str): The refresh token for the user.
+        session (requests.Session): The session with which to make the request, so its
+            connections can be reused across refreshes. Default: a new connection.
 
     Raises:
         PCORequestTimeoutException: The request timed out.
@@ -137,6 +150,7 @@ def get_oauth_refresh_token(client_id: str, client_secret: str, refresh_token: s
 
     return _do_oauth_post(
         'https://api.planningcenteronline.com/oauth/token',
+        session,
         client_id=client_id,
         client_secret=client_secret,
         refresh_token=refresh_token,
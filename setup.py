@@ -27,6 +27,23 @@ setup(
     install_requires=[
         'requests'
     ],
+    extras_require={
+        'async': [
+            'aiohttp'
+        ],
+        'orjson': [
+            'orjson'
+        ],
+        'msgspec': [
+            'msgspec'
+        ],
+        'arrow': [
+            'pyarrow'
+        ],
+        'zstd': [
+            'zstandard'
+        ],
+    },
     zip_safe=True,
     classifiers=[
         'Development Status :: 5 - Production/Stable',
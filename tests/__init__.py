@@ -3,7 +3,11 @@
 import os
 import logging
 import logging.handlers
+import socketserver
+import sys
+import threading
 import unittest
+from http.server import HTTPServer
 import vcr_unittest
 import pypco
 
@@ -128,3 +132,40 @@ class BasePCOVCRTestCase(vcr_unittest.VCRTestCase):
         )
 
         return custom_vcr
+
+class LocalServer:
+    """A local HTTP server running on a background thread.
+
+    Used as a stand-in for the PCO API in tests that exercise real HTTP requests.
+
+    Args:
+        handler_class (BaseHTTPRequestHandler): The request handler for the server.
+
+    Attributes:
+        url (str): The base URL of the running server.
+    """
+
+    class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            # Clients hanging up early (e.g. on timeouts) are expected in tests
+            if not isinstance(sys.exc_info()[1], ConnectionError):
+                super().handle_error(request, client_address)
+
+    def __init__(self, handler_class):
+
+        self._server = LocalServer._ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def __enter__(self):
+
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *_):
+
+        self._server.shutdown()
+        self._server.server_close()
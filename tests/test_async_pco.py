@@ -0,0 +1,413 @@
+"""Test the asyncio entry point to pypco -- the AsyncPCO object"""
+
+#pylint: disable=protected-access
+
+import asyncio
+import cgi
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from pypco.auth_config import ORG_TOKEN_CACHE
+from pypco.codec import StdlibJSONCodec
+from pypco.exceptions import PCORequestTimeoutException, \
+    PCORequestException, PCOUnexpectedRequestException
+from pypco.ratelimit import FileRateLimitBackend, RateLimiter
+from pypco.records import RecordView
+from pypco.retry import RetryPolicy
+from tests import BasePCOTestCase, LocalServer
+
+if aiohttp is not None:
+    from pypco.async_pco import AsyncPCO
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO API."""
+
+    people_count = 30
+    rate_limited = 0
+    failures = 0
+    requests = []
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def _send_json(self, status, body, headers=None):
+        """Send a json response."""
+
+        encoded = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _people_page(self, query):
+        """Build a page of people with included emails."""
+
+        offset = int(query.get('offset', ['0'])[0])
+        per_page = int(query.get('per_page', ['25'])[0])
+
+        ids = range(offset, min(offset + per_page, self.people_count))
+
+        page = {
+            'data': [
+                {
+                    'type': 'Person',
+                    'id': str(ndx),
+                    'attributes': {'name': f'Person {ndx}'},
+                    'relationships': {'emails': {'data': [{'type': 'Email', 'id': str(ndx)}]}},
+                } for ndx in ids
+            ],
+            'included': [{'type': 'Email', 'id': str(ndx)} for ndx in ids],
+            'meta': {'total_count': self.people_count, 'can_include': ['emails']},
+            'links': {},
+        }
+
+        if offset + per_page < self.people_count:
+            page['links']['next'] = 'next'
+
+        return page
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle GET requests."""
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        StandInHandler.requests.append(('GET', parsed.path, query, self.headers))
+
+        if parsed.path == '/people/v2/people':
+            self._send_json(200, self._people_page(query))
+        elif parsed.path == '/people/v2/people/1':
+            self._send_json(200, {'data': {'type': 'Person', 'id': '1'}})
+        elif parsed.path == '/ratelimited':
+            if StandInHandler.rate_limited > 0:
+                StandInHandler.rate_limited -= 1
+                self._send_json(429, {'errors': []}, {'Retry-After': '1'})
+            else:
+                self._send_json(200, {'hello': 'world'})
+        elif parsed.path == '/flaky':
+            if StandInHandler.failures > 0:
+                StandInHandler.failures -= 1
+                self._send_json(503, {'errors': []})
+            else:
+                self._send_json(200, {'hello': 'world'})
+        elif parsed.path == '/slow':
+            time.sleep(0.5)
+            self._send_json(200, {})
+        elif parsed.path == '/org':
+            if self.headers['Authorization'] == 'OrganizationToken fresh':
+                self._send_json(200, {'hello': 'world'})
+            else:
+                self._send_json(401, {'errors': [{'status': '401'}]})
+        elif parsed.path == '/empty':
+            self.send_response(204)
+            self.end_headers()
+        else:
+            self._send_json(404, {'errors': [{'status': '404'}]})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle POST requests, including file uploads."""
+
+        StandInHandler.requests.append(('POST', self.path, {}, self.headers))
+
+        if self.path == '/upload':
+            form = cgi.FieldStorage(
+                fp=self.rfile,
+                headers=self.headers,
+                environ={'REQUEST_METHOD': 'POST'}
+            )
+            self._send_json(200, {'data': [{
+                'type': 'File',
+                'id': 'abc',
+                'attributes': {'name': form['file'].filename, 'size': len(form['file'].value)},
+            }]})
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        body['data']['id'] = '1'
+        self._send_json(201, body)
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        """Handle PATCH requests."""
+
+        StandInHandler.requests.append(('PATCH', self.path, {}, self.headers))
+
+        self._send_json(200, json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Handle DELETE requests."""
+
+        StandInHandler.requests.append(('DELETE', self.path, {}, self.headers))
+
+        self.send_response(204)
+        self.end_headers()
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncPCO(BasePCOTestCase):
+    """Test the AsyncPCO object against a local stand-in server."""
+
+    def setUp(self):
+
+        StandInHandler.requests = []
+        StandInHandler.rate_limited = 0
+        StandInHandler.failures = 0
+
+        self.server = LocalServer(StandInHandler).__enter__()
+        self.loop = asyncio.new_event_loop()
+        self.pco = AsyncPCO(
+            'app_id',
+            'secret',
+            api_base=self.server.url,
+            upload_url=f'{self.server.url}/upload',
+        )
+
+    def tearDown(self):
+
+        self.loop.run_until_complete(self.pco.close())
+        self.loop.close()
+        self.server.__exit__()
+
+    def run_async(self, coro):
+        """Run a coroutine to completion on the test event loop."""
+
+        return self.loop.run_until_complete(coro)
+
+    def test_get(self):
+        """Test the get function."""
+
+        result = self.run_async(self.pco.get('//people/v2/people/1', include='emails'))
+
+        self.assertEqual(result['data']['id'], '1')
+
+        method, path, query, headers = StandInHandler.requests[-1]
+        self.assertEqual('GET', method)
+        self.assertEqual('/people/v2/people/1', path)
+        self.assertEqual({'include': ['emails']}, query)
+        self.assertEqual('pypco', headers['User-Agent'])
+        self.assertEqual('Basic YXBwX2lkOnNlY3JldA==', headers['Authorization'])
+
+    def test_write_requests(self):
+        """Test the post, patch, and delete functions."""
+
+        payload = AsyncPCO.template('Person', {'first_name': 'Paul'})
+
+        result = self.run_async(self.pco.post('/people/v2/people', payload))
+        self.assertEqual(result['data']['attributes']['first_name'], 'Paul')
+        self.assertEqual(result['data']['id'], '1')
+
+        result = self.run_async(self.pco.patch('/people/v2/people/1', payload))
+        self.assertEqual(result['data']['attributes']['first_name'], 'Paul')
+
+        response = self.run_async(self.pco.delete('/people/v2/people/1'))
+        self.assertEqual(response.status, 204)
+
+        self.assertIsNone(self.run_async(self.pco.get('/empty')))
+
+    def test_request_exceptions(self):
+        """Test errors returned by the API are raised as pypco exceptions."""
+
+        with self.assertRaises(PCORequestException) as exception_ctxt:
+            self.run_async(self.pco.get('/bogus'))
+
+        self.assertEqual(exception_ctxt.exception.status_code, 404)
+        self.assertEqual(exception_ctxt.exception.response_body, '{"errors": [{"status": "404"}]}')
+
+        pco = AsyncPCO('app_id', 'secret', api_base='http://127.0.0.1:1')
+
+        with self.assertRaises(PCOUnexpectedRequestException):
+            self.run_async(pco.get('/test'))
+
+        self.run_async(pco.close())
+
+    def test_timeout(self):
+        """Test requests that time out are retried and then raise an exception."""
+
+        self.pco.timeout = 0.1
+        self.pco.timeout_retries = 2
+
+        # As with the PCO object, the timeout is wrapped by request_response()
+        with self.assertRaises(PCOUnexpectedRequestException) as exception_ctxt:
+            self.run_async(self.pco.get('/slow'))
+
+        self.assertIsInstance(exception_ctxt.exception.__cause__, PCORequestTimeoutException)
+        self.assertEqual(2, len(StandInHandler.requests))
+
+    def test_ratelimit(self):
+        """Test rate limited requests are paused without blocking the event loop."""
+
+        StandInHandler.rate_limited = 2
+        real_sleep = asyncio.sleep
+        sleeps = []
+
+        async def fake_sleep(delay, *args, **kwargs):
+            sleeps.append(delay)
+            await real_sleep(0, *args, **kwargs)
+
+        with patch('pypco.async_pco.asyncio.sleep', side_effect=fake_sleep):
+            result = self.run_async(self.pco.get('/ratelimited'))
+
+        self.assertEqual({'hello': 'world'}, result)
+        self.assertEqual([1, 1], sleeps)
+        self.assertEqual(3, len(StandInHandler.requests))
+
+    def test_file_ratelimit_backend(self):
+        """Verify a file backed rate limiter is only used off the event loop's thread."""
+
+        StandInHandler.rate_limited = 1
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(delay, *args, **kwargs):  # pylint: disable=unused-argument
+            await real_sleep(0, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as directory:
+            backend = FileRateLimitBackend(os.path.join(directory, 'ratelimit.json'))
+            transaction = backend.transaction
+            threads = []
+
+            def recording_transaction():
+                threads.append(threading.current_thread())
+                return transaction()
+
+            backend.transaction = recording_transaction
+
+            pco = AsyncPCO(
+                'app_id',
+                'secret',
+                api_base=self.server.url,
+                rate_limiter=RateLimiter(backend=backend),
+            )
+
+            with patch('pypco.async_pco.asyncio.sleep', side_effect=fake_sleep):
+                result = self.run_async(pco.get('/ratelimited'))
+
+            self.run_async(pco.close())
+
+        self.assertEqual({'hello': 'world'}, result)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_retry_policy(self):
+        """Verify server errors are retried per the retry policy."""
+
+        StandInHandler.failures = 2
+
+        pco = AsyncPCO(
+            'app_id',
+            'secret',
+            api_base=self.server.url,
+            retry_policy=RetryPolicy(backoff=0.01, retry_statuses=RetryPolicy.SERVER_ERRORS)
+        )
+
+        try:
+            self.assertEqual({'hello': 'world'}, self.run_async(pco.get('/flaky')))
+        finally:
+            self.run_async(pco.close())
+
+        self.assertEqual(3, len(StandInHandler.requests))
+
+    def test_json_codec(self):
+        """Verify responses are decoded and payloads encoded by the JSON codec."""
+
+        codec = StdlibJSONCodec()
+        pco = AsyncPCO('app_id', 'secret', api_base=self.server.url, json_codec=codec)
+        payload = AsyncPCO.template('Person', {'first_name': 'Paul'})
+
+        try:
+            with patch.object(codec, 'decode', wraps=codec.decode) as mock_decode, \
+                    patch.object(codec, 'encode', wraps=codec.encode) as mock_encode:
+                result = self.run_async(pco.post('/people/v2/people', payload))
+        finally:
+            self.run_async(pco.close())
+
+        self.assertEqual('Paul', result['data']['attributes']['first_name'])
+        mock_encode.assert_called_once_with(payload)
+        mock_decode.assert_called_once()
+        self.assertEqual('application/json', StandInHandler.requests[-1][3]['Content-Type'])
+
+    @patch('pypco.auth_config.get_cc_org_token', side_effect=['stale', 'fresh'])
+    def test_org_token_refresh(self, mock_get_token):
+        """Verify expired org tokens are fetched lazily and refreshed on 401."""
+
+        ORG_TOKEN_CACHE.clear()
+        self.addCleanup(ORG_TOKEN_CACHE.clear)
+
+        pco = AsyncPCO(cc_name='async', api_base=self.server.url)
+        mock_get_token.assert_not_called()
+
+        try:
+            self.assertEqual({'hello': 'world'}, self.run_async(pco.get('/org')))
+        finally:
+            self.run_async(pco.close())
+
+        self.assertEqual(2, mock_get_token.call_count)
+        self.assertEqual(
+            ['OrganizationToken stale', 'OrganizationToken fresh'],
+            [request[3]['Authorization'] for request in StandInHandler.requests]
+        )
+
+    def test_iterate(self):
+        """Test the iterate function."""
+
+        async def collect():
+            return [record async for record in self.pco.iterate('/people/v2/people', per_page=7)]
+
+        records = self.run_async(collect())
+
+        self.assertEqual([str(ndx) for ndx in range(30)], [rec['data']['id'] for rec in records])
+        self.assertEqual(5, len(StandInHandler.requests))
+
+        for record in records:
+            self.assertEqual(record['data']['id'], record['included'][0]['id'])
+            self.assertEqual(['emails'], record['meta']['can_include'])
+
+        async def collect_views():
+            return [
+                record async for record in
+                self.pco.iterate('/people/v2/people', per_page=7, record_views=True)
+            ]
+
+        views = self.run_async(collect_views())
+
+        self.assertIsInstance(views[0], RecordView)
+        self.assertEqual(records, views)
+
+        async def collect_pages():
+            return [
+                page async for page in
+                self.pco.iterate_pages('/people/v2/people', per_page=7, index_includes=True)
+            ]
+
+        pages = self.run_async(collect_pages())
+
+        self.assertEqual([7, 7, 7, 7, 2], [len(page['data']) for page in pages])
+        self.assertEqual(
+            [record['included'] for record in records],
+            [page.included_for(person) for page in pages for person in page['data']]
+        )
+
+    def test_upload(self):
+        """Test the file upload function."""
+
+        file_path = f'{os.path.dirname(os.path.abspath(__file__))}/assets/test_upload.jpg'
+
+        result = self.run_async(self.pco.upload(file_path))
+
+        self.assertEqual('test_upload.jpg', result['data'][0]['attributes']['name'])
+        self.assertEqual(os.path.getsize(file_path), result['data'][0]['attributes']['size'])
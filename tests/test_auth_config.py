@@ -1,6 +1,10 @@
 """Test the PCO auth configuration module."""
 
-from pypco.auth_config import PCOAuthConfig, PCOAuthType
+import threading
+import time
+from unittest.mock import patch
+
+from pypco.auth_config import ORG_TOKEN_CACHE, OrgTokenCache, PCOAuthConfig, PCOAuthType
 from pypco.exceptions import PCOCredentialsException
 from tests import BasePCOTestCase
 
@@ -77,6 +81,28 @@ class TestPCOAuthConfig(BasePCOTestCase):
         with self.assertRaises(PCOCredentialsException):
             PCOAuthConfig().auth_type  # pylint: disable=W0106
 
+    def test_credentials_key(self):
+        """Verify credentials keys are stable and don't expose credentials."""
+
+        key = PCOAuthConfig('app_id', 'secret').credentials_key
+
+        self.assertEqual(key, PCOAuthConfig('app_id', 'secret').credentials_key)
+        self.assertNotIn('app_id', key)
+        self.assertNotEqual(key, PCOAuthConfig('other_app_id', 'secret').credentials_key)
+        self.assertNotEqual(key, PCOAuthConfig(token='app_id').credentials_key)
+
+        # OAuth tokens with an identity keep their key when refreshed
+        first = PCOAuthConfig(token='first-token')
+        first.identity = 'client:user'
+        second = PCOAuthConfig(token='second-token')
+        second.identity = 'client:user'
+
+        self.assertEqual(first.credentials_key, second.credentials_key)
+        self.assertNotEqual(first.credentials_key, PCOAuthConfig(token='first-token').credentials_key)
+
+        with self.assertRaises(PCOCredentialsException):
+            PCOAuthConfig().credentials_key  # pylint: disable=W0106
+
     def test_auth_headers(self):
         """Verify that we get the correct authentication headers."""
 
@@ -94,3 +120,61 @@ class TestPCOAuthConfig(BasePCOTestCase):
         auth_config = PCOAuthConfig(cc_name="carlsbad")
         self.assertIn('OrganizationToken', auth_config.auth_header,
                          "Invalid ORGTOKEN authentication header.")
+
+
+class TestOrgTokenCache(BasePCOTestCase):
+    """Test caching Church Center OrganizationTokens."""
+
+    def setUp(self):
+
+        ORG_TOKEN_CACHE.clear()
+        self.addCleanup(ORG_TOKEN_CACHE.clear)
+
+    @patch('pypco.auth_config.get_cc_org_token', side_effect=['token1', 'token2'])
+    def test_cached_per_cc_name(self, mock_get_token):
+        """Verify tokens are fetched once per organization and shared between configs."""
+
+        self.assertEqual('OrganizationToken token1', PCOAuthConfig(cc_name='org').auth_header)
+        self.assertEqual('OrganizationToken token1', PCOAuthConfig(cc_name='org').auth_header)
+        mock_get_token.assert_called_once_with('org')
+
+        self.assertEqual('OrganizationToken token2', PCOAuthConfig(cc_name='other').auth_header)
+
+    @patch('pypco.auth_config.get_cc_org_token')
+    def test_single_fetch(self, mock_get_token):
+        """Verify concurrent first requests share a single fetch."""
+
+        def slow_fetch(cc_name):  # pylint: disable=unused-argument
+            time.sleep(0.05)
+            return 'token'
+
+        mock_get_token.side_effect = slow_fetch
+        cache = OrgTokenCache()
+
+        threads = [threading.Thread(target=cache.get, args=('org',)) for _ in range(5)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        mock_get_token.assert_called_once_with('org')
+
+    @patch('pypco.auth_config.get_cc_org_token', side_effect=['token1', 'token2'])
+    def test_refresh_auth_header(self, mock_get_token):  # pylint: disable=unused-argument
+        """Verify rejected org tokens are refreshed, unless already refreshed."""
+
+        auth_config = PCOAuthConfig(cc_name='org')
+        rejected = auth_config.auth_header
+
+        self.assertTrue(auth_config.refresh_auth_header(rejected))
+        self.assertEqual('OrganizationToken token2', auth_config.auth_header)
+
+        # Another request rejected with the old token doesn't discard the new one
+        self.assertTrue(auth_config.refresh_auth_header(rejected))
+        self.assertEqual('OrganizationToken token2', auth_config.auth_header)
+
+        # Other credentials can't be refreshed
+        self.assertFalse(PCOAuthConfig('app_id', 'secret').refresh_auth_header('Basic abc'))
+        self.assertFalse(PCOAuthConfig(token='abc').refresh_auth_header('Bearer abc'))
@@ -0,0 +1,330 @@
+"""Test concurrent bulk operations."""
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import Mock, patch
+
+import pypco
+from pypco.bulk import BulkResult, WritePipeline, execute_bulk
+from pypco.exceptions import PCORequestException
+from tests import BasePCOTestCase
+
+
+class TestExecuteBulk(BasePCOTestCase):
+    """Test the execute_bulk function."""
+
+    def test_results(self):
+        """Verify every request produces a result, and failures don't stop the others."""
+
+        def function(url, payload):
+            if payload['fail']:
+                raise PCORequestException(400, 'Bad request', '{}')
+            return {'url': url}
+
+        requests = [(f'/test/{index}', {'fail': index % 3 == 0}) for index in range(10)]
+
+        results = sorted(execute_bulk(function, requests, max_workers=3), key=lambda r: r.index)
+
+        self.assertEqual(list(range(10)), [result.index for result in results])
+
+        for index, result in enumerate(results):
+            self.assertEqual(f'/test/{index}', result.url)
+            self.assertIs(requests[index][1], result.payload)
+
+            if index % 3 == 0:
+                self.assertFalse(result.ok)
+                self.assertIsNone(result.result)
+                self.assertEqual(400, result.error.status_code)
+            else:
+                self.assertTrue(result.ok)
+                self.assertEqual({'url': f'/test/{index}'}, result.result)
+                self.assertIsNone(result.error)
+
+    def test_no_payload(self):
+        """Verify the function is called without a payload when there is none."""
+
+        results = list(execute_bulk(lambda url: url.upper(), [('/test', None)]))
+
+        self.assertEqual('/TEST', results[0].result)
+        self.assertIsNone(results[0].payload)
+
+    def test_concurrency(self):
+        """Verify requests are executed concurrently, up to max_workers at once."""
+
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def function(url):
+            with lock:
+                running.append(url)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(url)
+
+        list(execute_bulk(function, ((str(index), None) for index in range(20)), max_workers=4))
+
+        self.assertEqual(4, max(peak))
+
+    def test_lazy_input(self):
+        """Verify input is consumed lazily, so unbounded generators can be used."""
+
+        consumed = []
+
+        def requests():
+            for index in itertools.count():
+                consumed.append(index)
+                yield (f'/test/{index}', None)
+
+        results = execute_bulk(lambda url: url, requests(), max_workers=2)
+        first = list(itertools.islice(results, 5))
+        results.close()
+
+        self.assertEqual(5, len(first))
+        self.assertLess(len(consumed), 20)
+
+    def test_repr(self):
+        """Verify results have a useful representation."""
+
+        self.assertEqual("BulkResult(index=1, url='/test', ok)", repr(BulkResult(1, '/test')))
+        self.assertIn('error=', repr(BulkResult(1, '/test', error=PCORequestException(400, ''))))
+
+
+class TestPCOBulk(BasePCOTestCase):
+    """Test the PCO object's bulk write functions."""
+
+    @patch('pypco.PCO.request_json')
+    def test_post_many(self, mock_request_json):
+        """Verify many objects are created through post()."""
+
+        pco = pypco.PCO('app_id', 'secret')
+
+        def request_json(method, url, payload, **params):  # pylint: disable=unused-argument
+            if payload['data']['attributes']['last_name'] == 'Fail':
+                raise PCORequestException(422, 'Unprocessable entity', '{}')
+            return {'data': {'id': url}}
+
+        mock_request_json.side_effect = request_json
+
+        requests = [
+            ('/people/v2/people', pco.template('Person', {'last_name': last_name}))
+            for last_name in ('Smith', 'Fail', 'Jones')
+        ]
+
+        results = sorted(pco.post_many(requests, include='emails'), key=lambda r: r.index)
+
+        self.assertEqual([True, False, True], [result.ok for result in results])
+        self.assertEqual(422, results[1].error.status_code)
+        self.assertEqual({'data': {'id': '/people/v2/people'}}, results[0].result)
+        self.assertEqual(3, mock_request_json.call_count)
+
+        for call in mock_request_json.call_args_list:
+            self.assertEqual('POST', call[0][0])
+            self.assertEqual({'include': 'emails'}, call[1])
+
+    @patch('pypco.PCO.request_json')
+    def test_patch_many(self, mock_request_json):
+        """Verify many objects are updated through patch()."""
+
+        pco = pypco.PCO('app_id', 'secret')
+        mock_request_json.return_value = {'data': {}}
+
+        requests = [(f'/people/v2/people/{index}', pco.template('Person')) for index in range(5)]
+
+        results = list(pco.patch_many(requests, max_workers=2))
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(
+            sorted(url for url, _ in requests),
+            sorted(call[0][1] for call in mock_request_json.call_args_list)
+        )
+        self.assertTrue(all(
+            call[0][0] == 'PATCH' for call in mock_request_json.call_args_list
+        ))
+
+    @patch('pypco.PCO.request_json')
+    def test_no_payload(self, mock_request_json):
+        """Verify requests without a payload are made with post_many() and patch_many()."""
+
+        pco = pypco.PCO('app_id', 'secret')
+        mock_request_json.return_value = {'data': {}}
+
+        for bulk_function, method in ((pco.post_many, 'POST'), (pco.patch_many, 'PATCH')):
+            mock_request_json.reset_mock()
+
+            results = list(bulk_function([('/services/v2/service_types/1/unarchive', None)]))
+
+            self.assertTrue(results[0].ok, results[0].error)
+            mock_request_json.assert_called_once_with(
+                method, '/services/v2/service_types/1/unarchive', None
+            )
+
+    @patch('pypco.PCO.request_response')
+    def test_delete_many(self, mock_request_response):
+        """Verify many objects are deleted through delete()."""
+
+        pco = pypco.PCO('app_id', 'secret')
+        response = Mock()
+        mock_request_response.side_effect = [
+            response,
+            PCORequestException(404, 'Not found'),
+        ]
+
+        results = sorted(
+            pco.delete_many(['/people/v2/people/1', '/people/v2/people/2'], max_workers=1),
+            key=lambda r: r.index
+        )
+
+        self.assertIs(response, results[0].result)
+        self.assertEqual(404, results[1].error.status_code)
+        self.assertIsNone(results[1].payload)
+        mock_request_response.assert_any_call('DELETE', '/people/v2/people/1')
+
+
+class TestWritePipeline(BasePCOTestCase):
+    """Test pipelining dependent writes."""
+
+    def setUp(self):
+
+        self.lock = threading.Lock()
+        self.calls = []
+        self.next_id = itertools.count(1)
+
+        self.pco = Mock()
+        self.pco.post.side_effect = self.post
+        self.pco.delete.side_effect = lambda url, **params: self.record('DELETE', url)
+
+    def record(self, method, url):
+        """Record a request."""
+
+        with self.lock:
+            self.calls.append((method, url))
+
+    def post(self, url, payload, **params):  # pylint: disable=unused-argument
+        """Stand in for PCO.post()."""
+
+        time.sleep(0.01)
+        self.record('POST', url)
+
+        if payload.get('fail'):
+            raise PCORequestException(422, 'Unprocessable entity')
+
+        return {'data': {'id': str(next(self.next_id))}}
+
+    def test_children_after_parents(self):
+        """Verify children are created with their parent's id."""
+
+        with WritePipeline(self.pco, max_workers=4) as pipeline:
+            people = [pipeline.post('/people/v2/people', {}) for _ in range(5)]
+            emails = [
+                pipeline.post('/people/v2/people/{id}/emails', {}, after=person)
+                for person in people
+            ]
+            deleted = pipeline.delete(
+                lambda email: f'/people/v2/emails/{email["data"]["id"]}',
+                after=emails[0]
+            )
+
+        for person, email in zip(people, emails):
+            self.assertTrue(email.done())
+
+            url = f'/people/v2/people/{person.result()["data"]["id"]}/emails'
+            self.assertIn(('POST', url), self.calls)
+            self.assertLess(
+                self.calls.index(('POST', '/people/v2/people')),
+                self.calls.index(('POST', url))
+            )
+
+        self.assertIsNone(deleted.result())
+        self.assertIn(
+            ('DELETE', f'/people/v2/emails/{emails[0].result()["data"]["id"]}'),
+            self.calls
+        )
+
+    def test_overlap(self):
+        """Verify children run while later parents are being created."""
+
+        with WritePipeline(self.pco, max_workers=4) as pipeline:
+            for _ in range(8):
+                person = pipeline.post('/people/v2/people', {})
+                pipeline.post('/people/v2/people/{id}/emails', {}, after=person)
+
+        last_parent = max(
+            index for index, call in enumerate(self.calls) if call[1] == '/people/v2/people'
+        )
+        first_child = min(
+            index for index, call in enumerate(self.calls) if call[1].endswith('/emails')
+        )
+
+        self.assertLess(first_child, last_parent)
+        self.assertEqual(16, len(self.calls))
+
+    def test_failed_parent(self):
+        """Verify children of a failed parent aren't executed and fail with its error."""
+
+        with WritePipeline(self.pco) as pipeline:
+            person = pipeline.post('/people/v2/people', {'fail': True})
+            email = pipeline.post('/people/v2/people/{id}/emails', {}, after=person)
+            phone = pipeline.post('/people/v2/people/{id}/phone_numbers', {}, after=email)
+
+        self.assertEqual(422, person.exception().status_code)
+        self.assertIs(person.exception(), email.exception())
+        self.assertIs(person.exception(), phone.exception())
+        self.assertEqual([('POST', '/people/v2/people')], self.calls)
+
+    def test_cancelled_parent(self):
+        """Verify children of a cancelled parent are cancelled."""
+
+        parent = Future()
+
+        with WritePipeline(self.pco) as pipeline:
+            child = pipeline.post('/people/v2/people/{id}/emails', {}, after=parent)
+            parent.cancel()
+
+        self.assertTrue(child.cancelled())
+        self.assertEqual([], self.calls)
+
+    def test_max_pending(self):
+        """Verify submitting blocks while too many requests are outstanding."""
+
+        release = threading.Event()
+        self.pco.post.side_effect = lambda url, payload: release.wait()
+
+        pipeline = WritePipeline(self.pco, max_workers=1, max_pending=2)
+        pipeline.post('/test', {})
+        pipeline.post('/test', {})
+
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (pipeline.post('/test', {}), submitted.set())
+        )
+        thread.start()
+
+        self.assertFalse(submitted.wait(0.1))
+
+        release.set()
+        self.assertTrue(submitted.wait(5))
+
+        thread.join()
+        pipeline.close()
+
+    @patch('pypco.PCO.request_json')
+    def test_pco_pipeline(self, mock_request_json):
+        """Verify PCO.pipeline() makes requests through the PCO object."""
+
+        mock_request_json.return_value = {'data': {'id': '42'}}
+
+        pco = pypco.PCO('app_id', 'secret')
+
+        with pco.pipeline() as pipeline:
+            person = pipeline.post('/people/v2/people', pco.template('Person'))
+            email = pipeline.post('/people/v2/people/{id}/emails', pco.template('Email'),
+                                  after=person)
+
+        self.assertEqual({'data': {'id': '42'}}, email.result())
+        mock_request_json.assert_called_with(
+            'POST', '/people/v2/people/42/emails', pco.template('Email')
+        )
@@ -0,0 +1,447 @@
+"""Test GET response caching."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pypco
+from pypco.auth_config import PCOAuthConfig
+from pypco.cache import CachedResponse, MemoryResponseCache, ResponseCache, SQLiteResponseCache, \
+    cache_key
+from pypco.exceptions import PCORequestException
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase, LocalServer
+
+CREDENTIALS = PCOAuthConfig('app_id', 'secret').credentials_key
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO API that supports conditional requests."""
+
+    version = 1
+    requests = []
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Respond with the current version of a resource, or 304 if unchanged."""
+
+        ETagHandler.requests.append((self.path, dict(self.headers)))
+
+        etag = f'"v{ETagHandler.version}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        body = json.dumps({
+            'data': {'type': 'List', 'id': '1', 'attributes': {'version': ETagHandler.version}}
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if not self.path.startswith('/uncacheable'):
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        """Change the resource."""
+
+        ETagHandler.requests.append((self.path, dict(self.headers)))
+        ETagHandler.version += 1
+
+        body = self.rfile.read(int(self.headers['Content-Length']))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestMemoryResponseCache(BasePCOTestCase):
+    """Test the in-memory LRU response cache."""
+
+    def test_cache_key(self):
+        """Verify cache keys don't depend on parameter order."""
+
+        self.assertEqual('https://api/people', cache_key('https://api/people', {}))
+        self.assertEqual(
+            cache_key('https://api/people', {'per_page': 100, 'include': 'emails'}),
+            cache_key('https://api/people', {'include': 'emails', 'per_page': '100'})
+        )
+        self.assertEqual(
+            'https://api/people?include=emails&per_page=100',
+            cache_key('https://api/people', {'per_page': 100, 'include': 'emails'})
+        )
+        self.assertEqual('abc:https://api/people', cache_key('https://api/people', {}, 'abc'))
+
+    def test_incomplete_cache(self):
+        """Verify caches must implement get(), set(), and invalidate()."""
+
+        class IncompleteCache(ResponseCache):  # pylint: disable=abstract-method
+            """A cache without an invalidate() method."""
+
+            def get(self, key):
+                return None
+
+            def set(self, key, response):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteCache()  # pylint: disable=abstract-class-instantiated
+
+    def test_validators(self):
+        """Verify conditional request headers are built from cached validators."""
+
+        self.assertEqual({}, CachedResponse('url', b'').validators)
+        self.assertEqual(
+            {'If-None-Match': '"abc"', 'If-Modified-Since': 'Tue, 13 Oct 2026 10:00:00 GMT'},
+            CachedResponse('url', b'', '"abc"', 'Tue, 13 Oct 2026 10:00:00 GMT').validators
+        )
+
+    def test_lru_eviction_by_entries(self):
+        """Verify the least recently used entries are evicted first."""
+
+        cache = MemoryResponseCache(max_entries=2)
+
+        cache.set('a', CachedResponse('a', b'a'))
+        cache.set('b', CachedResponse('b', b'b'))
+        cache.get('a')
+        cache.set('c', CachedResponse('c', b'c'))
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_lru_eviction_by_bytes(self):
+        """Verify entries are evicted to stay within the byte budget."""
+
+        cache = MemoryResponseCache(max_bytes=10)
+
+        cache.set('a', CachedResponse('a', b'1234'))
+        cache.set('b', CachedResponse('b', b'1234'))
+        self.assertEqual(8, cache.size)
+
+        cache.set('c', CachedResponse('c', b'1234'))
+        self.assertEqual(8, cache.size)
+        self.assertIsNone(cache.get('a'))
+
+        # Replacing an entry accounts for the old body
+        cache.set('c', CachedResponse('c', b'12'))
+        self.assertEqual(6, cache.size)
+
+        # Bodies larger than the budget aren't cached at all
+        cache.set('d', CachedResponse('d', b'12345678901'))
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(2, len(cache))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
+
+    def test_invalidate(self):
+        """Verify changes to an object invalidate related responses."""
+
+        cache = MemoryResponseCache()
+
+        urls = [
+            'https://api/people/v2/people',
+            'https://api/people/v2/people/1',
+            'https://api/people/v2/people/1/emails',
+            'https://api/people/v2/people/12',
+        ]
+
+        for url in urls:
+            cache.set(cache_key(url, {'per_page': 1}), CachedResponse(url, b''))
+
+        cache.invalidate('https://api/people/v2/people/1')
+
+        self.assertEqual(
+            ['https://api/people/v2/people/12'],
+            [url for url in urls if cache.get(cache_key(url, {'per_page': 1})) is not None]
+        )
+
+
+class TestSQLiteResponseCache(BasePCOTestCase):
+    """Test the persistent SQLite response cache."""
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+
+    def test_ttl_for(self):
+        """Verify endpoint TTLs use the longest matching path prefix."""
+
+        cache = SQLiteResponseCache(
+            self.path,
+            ttl=5,
+            ttls={'/people/v2': 60, '/people/v2/field_definitions': 3600}
+        )
+
+        self.assertEqual(5, cache.ttl_for('https://api/services/v2/songs'))
+        self.assertEqual(60, cache.ttl_for('https://api/people/v2/people'))
+        self.assertEqual(3600, cache.ttl_for('https://api/people/v2/field_definitions/1'))
+
+    def test_persistence(self):
+        """Verify responses are persisted and shared between cache objects."""
+
+        cache = SQLiteResponseCache(self.path)
+        cache.set('key', CachedResponse('url', b'{"a": 1}', '"v1"', None, 1000.0))
+
+        other = SQLiteResponseCache(self.path)
+        cached = other.get('key')
+
+        self.assertEqual(1, len(other))
+        self.assertEqual('url', cached.url)
+        self.assertEqual(b'{"a": 1}', cached.body)
+        self.assertEqual('"v1"', cached.etag)
+        self.assertIsNone(cached.last_modified)
+        self.assertEqual(1000.0, cached.stored_at)
+        self.assertIsNone(other.get('bogus'))
+
+        # Connections are per thread
+        results = []
+        thread = threading.Thread(target=lambda: results.append(cache.get('key')))
+        thread.start()
+        thread.join()
+        self.assertEqual(b'{"a": 1}', results[0].body)
+
+        other.purge(60)
+        self.assertIsNone(cache.get('key'))
+
+        cache.close()
+        other.close()
+
+    def test_invalidate(self):
+        """Verify changes to an object invalidate related responses."""
+
+        cache = SQLiteResponseCache(self.path)
+
+        urls = [
+            'https://api/people/v2/people',
+            'https://api/people/v2/people/1',
+            'https://api/people/v2/people/1/emails',
+            'https://api/people/v2/people/12',
+        ]
+
+        for url in urls:
+            cache.set(cache_key(url, {'per_page': 1}), CachedResponse(url, b''))
+
+        cache.invalidate('https://api/people/v2/people/1')
+
+        self.assertEqual(
+            ['https://api/people/v2/people/12'],
+            [url for url in urls if cache.get(cache_key(url, {'per_page': 1})) is not None]
+        )
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+
+class TestPCOResponseCache(BasePCOTestCase):
+    """Test the PCO object with a response cache."""
+
+    def setUp(self):
+
+        ETagHandler.version = 1
+        ETagHandler.requests = []
+
+        self.server = LocalServer(ETagHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.cache = MemoryResponseCache()
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, cache=self.cache)
+
+    def test_conditional_get(self):
+        """Verify cached responses are revalidated and reused."""
+
+        first = self.pco.get('/people/v2/lists/1', per_page=1)
+        self.assertEqual(1, first['data']['attributes']['version'])
+        self.assertNotIn('If-None-Match', ETagHandler.requests[-1][1])
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+
+        second = self.pco.get('/people/v2/lists/1', per_page=1)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual('"v1"', ETagHandler.requests[-1][1]['If-None-Match'])
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+        # A changed resource is downloaded again
+        ETagHandler.version = 2
+
+        third = self.pco.get('/people/v2/lists/1', per_page=1)
+        self.assertEqual(2, third['data']['attributes']['version'])
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+
+        # Different params are cached separately
+        self.pco.get('/people/v2/lists/1', per_page=2)
+        self.assertNotIn('If-None-Match', ETagHandler.requests[-1][1])
+
+    def test_shared_between_credentials(self):
+        """Verify a cache shared by different credentials keeps their responses apart."""
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        cache = SQLiteResponseCache(os.path.join(directory.name, 'cache.sqlite'), ttl=60)
+        first = pypco.PCO(token='first-token', api_base=self.server.url, cache=cache)
+        second = pypco.PCO(token='second-token', api_base=self.server.url, cache=cache)
+
+        first.get('/people/v2/lists/1')
+        first.get('/people/v2/lists/1')
+        self.assertEqual(1, len(ETagHandler.requests))
+
+        # The second credentials' request isn't answered from the first's response
+        second.get('/people/v2/lists/1')
+        self.assertEqual(2, len(ETagHandler.requests))
+        self.assertEqual('Bearer second-token', ETagHandler.requests[-1][1]['Authorization'])
+        self.assertNotIn('If-None-Match', ETagHandler.requests[-1][1])
+        self.assertEqual(2, len(cache))
+
+    def test_uncacheable(self):
+        """Verify responses without validators aren't cached."""
+
+        self.pco.get('/uncacheable')
+        self.pco.get('/uncacheable')
+
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+
+    def test_write_invalidates(self):
+        """Verify writing to an object invalidates its cached responses."""
+
+        self.pco.get('/people/v2/lists/1')
+        self.assertEqual(1, len(self.cache))
+
+        self.pco.patch('/people/v2/lists/1', self.pco.template('List'))
+        self.assertEqual(0, len(self.cache))
+
+        result = self.pco.get('/people/v2/lists/1')
+        self.assertEqual(2, result['data']['attributes']['version'])
+
+    def test_delete_invalidates(self):
+        """Verify deleting an object invalidates its and its collection's cached responses."""
+
+        with FakePCOServer(records=10) as server:
+            cache = MemoryResponseCache(ttl=600)
+            pco = pypco.PCO('app_id', 'secret', api_base=server.url, cache=cache)
+
+            pco.get('/people/v2/people/5')
+            self.assertEqual(10, pco.get('/people/v2/people')['meta']['total_count'])
+
+            # A failed write doesn't invalidate anything
+            with self.assertRaises(PCORequestException):
+                pco.delete('/people/v2/people/99')
+
+            self.assertEqual(2, len(cache))
+
+            pco.delete('/people/v2/people/5')
+
+            self.assertEqual(0, len(cache))
+            self.assertEqual(9, pco.get('/people/v2/people')['meta']['total_count'])
+
+            with self.assertRaises(PCORequestException) as exception_ctxt:
+                pco.get('/people/v2/people/5')
+
+            self.assertEqual(404, exception_ctxt.exception.status_code)
+
+    def test_delete_invalidates_persistent_cache(self):
+        """Verify deleted objects aren't served from a persistent cache in later runs."""
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'cache.sqlite')
+
+        with FakePCOServer(records=10) as server:
+            pco = pypco.PCO('app_id', 'secret', api_base=server.url,
+                            cache=SQLiteResponseCache(path, ttl=600))
+            pco.get('/people/v2/people/5')
+            pco.get('/people/v2/people')
+            pco.delete('/people/v2/people/5')
+
+            cache = SQLiteResponseCache(path, ttl=600)
+            pco = pypco.PCO('app_id', 'secret', api_base=server.url, cache=cache)
+
+            self.assertEqual(0, len(cache))
+            self.assertEqual(9, pco.get('/people/v2/people')['meta']['total_count'])
+
+            with self.assertRaises(PCORequestException):
+                pco.get('/people/v2/people/5')
+
+    def test_ttl(self):
+        """Verify fresh responses are used without a request."""
+
+        cache = MemoryResponseCache(ttl=60)
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, cache=cache)
+
+        first = pco.get('/uncacheable')
+        second = pco.get('/uncacheable')
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(ETagHandler.requests))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_ttl_expired(self):
+        """Verify expired responses are revalidated."""
+
+        cache = MemoryResponseCache(ttl=60)
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, cache=cache)
+
+        pco.get('/people/v2/lists/1')
+        cache.get(cache_key(f'{self.server.url}/people/v2/lists/1', {}, CREDENTIALS)).stored_at -= 120
+
+        pco.get('/people/v2/lists/1')
+
+        self.assertEqual(2, len(ETagHandler.requests))
+        self.assertEqual('"v1"', ETagHandler.requests[-1][1]['If-None-Match'])
+
+        # Revalidating resets the response's age
+        pco.get('/people/v2/lists/1')
+        self.assertEqual(2, len(ETagHandler.requests))
+
+    def test_stale_while_revalidate(self):
+        """Verify stale responses are used while being revalidated in the background."""
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        cache = SQLiteResponseCache(
+            os.path.join(directory.name, 'cache.sqlite'),
+            ttl=60,
+            stale_while_revalidate=86400
+        )
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, cache=cache)
+
+        pco.get('/people/v2/lists/1')
+
+        # Yesterday's response is used, while the new version is fetched in the background
+        key = cache_key(f'{self.server.url}/people/v2/lists/1', {}, CREDENTIALS)
+        cached = cache.get(key)
+        cached.stored_at -= 3600
+        cache.set(key, cached)
+        ETagHandler.version = 2
+
+        result = pco.get('/people/v2/lists/1')
+        self.assertEqual(1, result['data']['attributes']['version'])
+
+        for _ in range(100):
+            if json.loads(cache.get(key).body)['data']['attributes']['version'] == 2:
+                break
+            time.sleep(0.05)
+
+        result = pco.get('/people/v2/lists/1')
+        self.assertEqual(2, result['data']['attributes']['version'])
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
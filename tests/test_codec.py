@@ -0,0 +1,124 @@
+"""Test the pluggable JSON codecs."""
+
+import sys
+from unittest.mock import patch
+
+import pypco
+from pypco.codec import JSONCodec, MsgspecCodec, OrjsonCodec, StdlibJSONCodec, \
+    available_codecs, fastest_codec
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase
+
+
+class RecordingCodec(StdlibJSONCodec):
+    """A codec that records the documents it decodes and the objects it encodes."""
+
+    name = 'recording'
+
+    def __init__(self):
+
+        self.decoded = []
+        self.encoded = []
+
+    def decode(self, data):
+
+        self.decoded.append(data)
+
+        return super().decode(data)
+
+    def encode(self, obj):
+
+        self.encoded.append(obj)
+
+        return super().encode(obj)
+
+
+class TestCodecs(BasePCOTestCase):
+    """Test the codec classes."""
+
+    def test_stdlib_codec(self):
+        """Verify the standard library codec round trips documents as UTF-8."""
+
+        codec = StdlibJSONCodec()
+        document = {'data': {'attributes': {'name': 'Zoë', 'age': 3, 'child': None}}}
+
+        encoded = codec.encode(document)
+
+        self.assertIsInstance(encoded, bytes)
+        self.assertIn('Zoë'.encode('utf-8'), encoded)
+        self.assertEqual(document, codec.decode(encoded))
+
+        with self.assertRaises(ValueError):
+            codec.decode(b'{"data": ')
+
+        class DecodeOnlyCodec(JSONCodec):  # pylint: disable=abstract-method
+            """A codec without an encode() method."""
+
+            def decode(self, data):
+                return StdlibJSONCodec().decode(data)
+
+        with self.assertRaises(TypeError):
+            DecodeOnlyCodec()  # pylint: disable=abstract-class-instantiated
+
+    def test_available_codecs(self):
+        """Verify codecs are only available if their backend is installed."""
+
+        with patch.dict(sys.modules, {'orjson': None, 'msgspec': None}):
+            with self.assertRaises(ImportError):
+                OrjsonCodec()
+
+            with self.assertRaises(ImportError):
+                MsgspecCodec()
+
+            self.assertEqual(['json'], [codec.name for codec in available_codecs()])
+            self.assertIsInstance(fastest_codec(), StdlibJSONCodec)
+
+        self.assertEqual('json', available_codecs()[-1].name)
+
+
+class TestPCOCodec(BasePCOTestCase):
+    """Test PCO objects using a JSON codec."""
+
+    def setUp(self):
+
+        self.server = FakePCOServer(records=30).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.codec = RecordingCodec()
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, json_codec=self.codec)
+
+    def test_decode(self):
+        """Verify responses, including cached responses, are decoded by the codec."""
+
+        self.assertEqual('1', self.pco.get('/people/v2/people/1')['data']['id'])
+        self.assertEqual(30, len(list(self.pco.iterate('/people/v2/people', per_page=10))))
+        self.assertEqual(4, len(self.codec.decoded))
+
+        self.pco.cache = pypco.MemoryResponseCache(ttl=60)
+        self.pco.get('/people/v2/people/2')
+        self.pco.get('/people/v2/people/2')
+
+        self.assertEqual(6, len(self.codec.decoded))
+
+    def test_encode(self):
+        """Verify payloads are encoded by the codec."""
+
+        payload = self.pco.template('Person', {'first_name': 'Ada'})
+
+        person = self.pco.post('/people/v2/people', payload)['data']
+        self.pco.patch(f'/people/v2/people/{person["id"]}', payload)
+
+        self.assertEqual('Ada', person['attributes']['first_name'])
+        self.assertEqual([payload, payload], self.codec.encoded)
+
+        # Requests without a payload send no body
+        self.pco.delete(f'/people/v2/people/{person["id"]}')
+        self.assertEqual(2, len(self.codec.encoded))
+
+    def test_default(self):
+        """Verify PCO objects use requests' JSON handling by default."""
+
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url)
+
+        self.assertIsNone(pco.json_codec)
+        self.assertEqual('1', pco.get('/people/v2/people/1')['data']['id'])
@@ -0,0 +1,200 @@
+"""Test columnar exports of PCO collections."""
+
+import csv
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+import pypco
+from pypco.export import ArrowIPCWriter, Column, ColumnarExporter, CSVWriter, ExportWriter, \
+    ParquetWriter
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase
+
+COLUMNS = [
+    Column('id', type='int'),
+    Column('first_name'),
+    Column('state', 'status'),
+    Column('updated_at', type='timestamp'),
+    Column('email', 'address', include='Email'),
+    Column('emails', 'address', include='Email', join=';'),
+    Column('primary_phone', 'primary', type='bool', include='PhoneNumber'),
+    Column('nickname'),
+]
+
+
+class RecordingWriter(ExportWriter):
+    """Records the batches it's given."""
+
+    def __init__(self):
+
+        self.columns = None
+        self.batches = []
+        self.closed = False
+
+    def open(self, columns):
+
+        self.columns = columns
+
+    def write_batch(self, values):
+
+        self.batches.append(values)
+
+    def close(self):
+
+        self.closed = True
+
+
+class TestColumn(BasePCOTestCase):
+    """Test reading and converting column values."""
+
+    def test_values(self):
+        """Verify attributes and includes are read and converted to the column types."""
+
+        data = {'type': 'Person', 'id': '7', 'attributes': {
+            'birthdate': '1990-02-03', 'created_at': '2020-01-01T12:00:00-05:00',
+            'child': 'false', 'grade': '3.5', 'tags': ['a', 'b'],
+        }}
+        included = [
+            {'type': 'Email', 'id': '1', 'attributes': {'address': 'a@example.com'}},
+            {'type': 'Email', 'id': '2', 'attributes': {'address': None}},
+            {'type': 'Email', 'id': '3', 'attributes': {'address': 'c@example.com'}},
+        ]
+
+        self.assertEqual(7, Column('id', type='int').value(data, []))
+        self.assertEqual('Person', Column('type').value(data, []))
+        self.assertEqual(date(1990, 2, 3), Column('birthdate', type='date').value(data, []))
+        self.assertEqual(
+            datetime(2020, 1, 1, 17, tzinfo=timezone.utc),
+            Column('created_at', type='timestamp').value(data, [])
+        )
+        self.assertFalse(Column('child', type='bool').value(data, []))
+        self.assertEqual(3.5, Column('grade', type='float').value(data, []))
+        self.assertEqual('["a", "b"]', Column('tags').value(data, []))
+        self.assertIsNone(Column('missing').value(data, []))
+        self.assertEqual('a@example.com', Column('e', 'address', include='Email').value(data, included))
+        self.assertEqual(
+            'a@example.com|c@example.com',
+            Column('e', 'address', include='Email', join='|').value(data, included)
+        )
+        self.assertIsNone(Column('e', 'address', include='Address').value(data, included))
+
+        with self.assertRaises(ValueError):
+            Column('grade', type='int').value(data, [])
+
+        with self.assertRaises(ValueError):
+            Column('grade', type='decimal')
+
+
+class TestColumnarExporter(BasePCOTestCase):
+    """Test exporting collections from a fake PCO API."""
+
+    def setUp(self):
+
+        self.server = FakePCOServer(records=250).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url)
+        self.exporter = ColumnarExporter(self.pco, COLUMNS, batch_size=100)
+
+    def test_batches(self):
+        """Verify rows are written in batches of about batch_size rows as pages arrive."""
+
+        writer = RecordingWriter()
+
+        rows = self.exporter.export(
+            '/people/v2/people', writer, per_page=40, include='emails,phone_numbers'
+        )
+
+        self.assertEqual(250, rows)
+        self.assertEqual(COLUMNS, writer.columns)
+        self.assertEqual([120, 120, 10], [len(batch[0]) for batch in writer.batches])
+        self.assertTrue(writer.closed)
+
+        first = [values[0] for values in writer.batches[0]]
+        self.assertEqual([
+            1, 'First1', 'active', datetime(2026, 1, 1, 0, 1, tzinfo=timezone.utc),
+            'person1-100@example.com', 'person1-100@example.com;person1-101@example.com',
+            True, None,
+        ], first)
+
+    def test_csv(self):
+        """Verify CSV files are written with a header row."""
+
+        output = io.StringIO(newline='')
+
+        self.exporter.export('/people/v2/people', CSVWriter(output), include='emails')
+
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+
+        self.assertEqual([column.name for column in COLUMNS], rows[0])
+        self.assertEqual(251, len(rows))
+        self.assertEqual([
+            '250', 'First250', 'inactive', '2026-01-01T04:10:00+00:00',
+            'person250-25000@example.com', 'person250-25000@example.com;person250-25001@example.com',
+            '', '',
+        ], rows[-1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'people.csv')
+            ColumnarExporter(self.pco, [Column('id')]).export('/people/v2/people', CSVWriter(path))
+
+            with open(path, newline='', encoding='utf-8') as file:
+                self.assertEqual(251, len(list(csv.reader(file))))
+
+    def test_conversion_error(self):
+        """Verify the writer is closed if a value can't be converted."""
+
+        writer = RecordingWriter()
+        exporter = ColumnarExporter(self.pco, [Column('first_name', type='int')])
+
+        with self.assertRaises(ValueError):
+            exporter.export('/people/v2/people', writer)
+
+        self.assertTrue(writer.closed)
+
+        with self.assertRaises(ValueError):
+            ColumnarExporter(self.pco, [])
+
+    def test_incomplete_writer(self):
+        """Verify writers must implement open() and write_batch()."""
+
+        class OpenOnlyWriter(ExportWriter):  # pylint: disable=abstract-method
+            """A writer without a write_batch() method."""
+
+            def open(self, columns):
+                pass
+
+        with self.assertRaises(TypeError):
+            OpenOnlyWriter()  # pylint: disable=abstract-class-instantiated
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_arrow(self):  # pragma: no cover
+        """Verify Parquet and Arrow IPC files are written with the export's schema."""
+
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+
+        with tempfile.TemporaryDirectory() as directory:
+            parquet_path = os.path.join(directory, 'people.parquet')
+            arrow_path = os.path.join(directory, 'people.arrow')
+
+            self.exporter.export('/people/v2/people', ParquetWriter(parquet_path),
+                                 include='emails,phone_numbers')
+            self.exporter.export('/people/v2/people', ArrowIPCWriter(arrow_path),
+                                 include='emails,phone_numbers')
+
+            parquet = pyarrow.parquet.read_table(parquet_path)
+            arrow = pyarrow.ipc.open_file(arrow_path).read_all()
+
+            for table in (parquet, arrow):
+                self.assertEqual(250, table.num_rows)
+                self.assertEqual(pyarrow.int64(), table.schema.field('id').type)
+                self.assertEqual(list(range(1, 251)), table.column('id').to_pylist())
+                self.assertEqual([True] * 250, table.column('primary_phone').to_pylist())
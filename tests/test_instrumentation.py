@@ -0,0 +1,219 @@
+"""Test request instrumentation and metrics."""
+
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pypco
+from pypco.instrumentation import EndpointMetrics, RequestEvent, RequestListener, \
+    RequestMetrics, normalize_endpoint
+from pypco.retry import RetryPolicy
+from tests import BasePCOTestCase, LocalServer
+
+
+class PeopleHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO API that can be told to fail or rate limit."""
+
+    failures = 0
+    rate_limited = 0
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def _send_json(self, status, body, headers=None):
+        """Send a json response."""
+
+        encoded = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Respond with a person, after any failures or rate limits."""
+
+        if PeopleHandler.rate_limited > 0:
+            PeopleHandler.rate_limited -= 1
+            self._send_json(429, {'errors': []}, {'Retry-After': '0'})
+        elif PeopleHandler.failures > 0:
+            PeopleHandler.failures -= 1
+            self._send_json(503, {'errors': []})
+        elif self.path.endswith('/missing'):
+            self._send_json(404, {'errors': []})
+        else:
+            self._send_json(200, {'data': {'type': 'Person', 'id': '1'}}, {'ETag': '"v1"'})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Echo the payload."""
+
+        self._send_json(201, json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+
+
+class RecordingListener(RequestListener):
+    """Records the events it is notified of."""
+
+    def __init__(self):
+
+        self.started = []
+        self.finished = []
+
+    def request_started(self, event):
+
+        self.started.append(event)
+
+    def request_finished(self, event):
+
+        self.finished.append(event)
+
+
+class TestRequestEvents(BasePCOTestCase):
+    """Test request events reported to listeners."""
+
+    def setUp(self):
+
+        PeopleHandler.failures = 0
+        PeopleHandler.rate_limited = 0
+
+        self.server = LocalServer(PeopleHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.listener = RecordingListener()
+        self.pco = pypco.PCO(
+            'app_id',
+            'secret',
+            api_base=self.server.url,
+            retry_policy=RetryPolicy(retry_statuses=RetryPolicy.SERVER_ERRORS),
+            listeners=[self.listener],
+        )
+
+    def test_event(self):
+        """Verify a single event describes a request across retries and rate limits."""
+
+        PeopleHandler.failures = 1
+        PeopleHandler.rate_limited = 1
+
+        self.pco.get('/people/v2/people/123')
+
+        self.assertEqual(1, len(self.listener.started))
+        self.assertEqual(self.listener.started, self.listener.finished)
+
+        event = self.listener.finished[0]
+        self.assertEqual('GET', event.method)
+        self.assertEqual('/people/v2/people/{id}', event.endpoint)
+        self.assertEqual(200, event.status)
+        self.assertEqual(3, event.attempts)
+        self.assertEqual(1, event.retries)
+        self.assertEqual(1, event.rate_limited)
+        self.assertGreater(event.bytes_received, 0)
+        self.assertGreater(event.decode_time, 0)
+        self.assertGreater(event.network_time, 0)
+        self.assertGreaterEqual(event.elapsed, event.network_time + event.decode_time)
+        self.assertIsNone(event.error)
+
+    def test_payload_and_error(self):
+        """Verify request bodies are counted and errors are reported."""
+
+        self.pco.post('/people/v2/people', {'data': {'type': 'Person'}})
+        self.assertEqual(
+            len(json.dumps({'data': {'type': 'Person'}})), self.listener.finished[0].bytes_sent
+        )
+
+        with self.assertRaises(pypco.PCORequestException):
+            self.pco.get('/people/v2/people/missing')
+
+        event = self.listener.finished[1]
+        self.assertEqual(404, event.status)
+        self.assertIsInstance(event.error, pypco.PCORequestException)
+
+    def test_cached(self):
+        """Verify responses served from the cache are marked as cached."""
+
+        self.pco.cache = pypco.MemoryResponseCache(ttl=60)
+
+        self.pco.get('/people/v2/people/1')
+        self.pco.get('/people/v2/people/1')
+
+        first, second = self.listener.finished
+        self.assertFalse(first.cached)
+        self.assertEqual(1, first.attempts)
+        self.assertTrue(second.cached)
+        self.assertEqual(0, second.attempts)
+
+    def test_failing_listener(self):
+        """Verify exceptions raised by listeners don't affect requests."""
+
+        class FailingListener(RequestListener):
+            """A listener that always fails."""
+
+            def request_started(self, event):
+                raise RuntimeError('Listener failed')
+
+        self.pco.add_listener(FailingListener())
+
+        with self.assertLogs('pypco.instrumentation', level='ERROR'):
+            self.assertEqual('1', self.pco.get('/people/v2/people/1')['data']['id'])
+
+        self.assertEqual(1, len(self.listener.finished))
+
+        self.pco.remove_listener(self.listener)
+        self.pco.listeners = []
+        self.pco.get('/people/v2/people/1')
+        self.assertEqual(1, len(self.listener.finished))
+
+
+class TestRequestMetrics(BasePCOTestCase):
+    """Test aggregating request metrics."""
+
+    def test_normalize_endpoint(self):
+        """Verify ids, query strings, and the API base are removed from endpoints."""
+
+        self.assertEqual(
+            '/people/v2/people/{id}/emails',
+            normalize_endpoint(
+                'https://api.planningcenteronline.com/people/v2/people/123/emails?per_page=5',
+                'https://api.planningcenteronline.com'
+            )
+        )
+        self.assertEqual(
+            '/v2/files/{id}',
+            normalize_endpoint('https://upload.x/v2/files/0a1b2c3d-0000-1111-2222-333344445555')
+        )
+        self.assertEqual('/people/v2/people', normalize_endpoint('/people/v2/people'))
+
+    def test_aggregate(self):
+        """Verify events are aggregated per endpoint with latency histograms."""
+
+        metrics = RequestMetrics()
+
+        for index, elapsed in enumerate([0.004] * 90 + [0.2] * 9 + [3.0]):
+            event = RequestEvent('GET', f'/people/v2/people/{index}', '/people/v2/people/{id}')
+            event.elapsed = elapsed
+            event.status = 200
+            event.bytes_received = 1000
+            metrics.request_finished(event)
+
+        event = RequestEvent('POST', '/people/v2/people', '/people/v2/people')
+        event.error = RuntimeError()
+        metrics.request_finished(event)
+
+        snapshot = metrics.snapshot()
+        people = snapshot[('GET', '/people/v2/people/{id}')]
+
+        self.assertEqual(100, people.count)
+        self.assertEqual({200: 100}, people.statuses)
+        self.assertEqual(0.005, people.percentile(50))
+        self.assertEqual(0.25, people.percentile(95))
+        self.assertEqual(5.0, people.percentile(100))
+        self.assertAlmostEqual(0.0516, people.mean)
+        self.assertEqual(1, snapshot[('POST', '/people/v2/people')].errors)
+
+        report = metrics.report().splitlines()
+        self.assertTrue(report[0].startswith('endpoint'))
+        self.assertTrue(report[1].startswith('GET /people/v2/people/{id}'))
+
+        metrics.reset()
+        self.assertEqual({}, metrics.snapshot())
+        self.assertEqual(0.0, EndpointMetrics().percentile(50))
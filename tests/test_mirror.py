@@ -0,0 +1,173 @@
+"""Test the SQLite mirror."""
+
+import json
+import os
+import tempfile
+from unittest.mock import Mock
+
+from pypco.mirror import SQLiteMirror
+from tests import BasePCOTestCase
+
+
+class FakePeople:
+    """A stand-in for the people collection, with emails as includes."""
+
+    def __init__(self, count):
+
+        self.people = {
+            str(index): {
+                'name': f'Person {index}',
+                'updated_at': f'2026-01-01T00:00:{index:02d}Z',
+                'emails': [str(1000 + index)],
+            }
+            for index in range(count)
+        }
+        self.requests = []
+
+    def get(self, url, offset, per_page, order, **params):  # pylint: disable=unused-argument
+        """Stand in for PCO.get()."""
+
+        self.requests.append(params)
+
+        since = params.get('where[updated_at][gte]', '')
+        changed = sorted(
+            (person['updated_at'], int(person_id)) for person_id, person in self.people.items()
+            if person['updated_at'] >= since
+        )
+        matching = changed[int(offset):int(offset) + int(per_page)]
+
+        data = []
+        included = []
+
+        for updated_at, person_id in matching:
+            person = self.people[str(person_id)]
+
+            data.append({
+                'type': 'Person',
+                'id': str(person_id),
+                'attributes': {'name': person['name'], 'updated_at': updated_at},
+                'relationships': {
+                    'emails': {
+                        'data': [{'type': 'Email', 'id': email} for email in person['emails']]
+                    },
+                    'primary_campus': {'data': None},
+                },
+            })
+
+            if params.get('include') == 'emails':
+                included.extend(
+                    {'type': 'Email', 'id': email, 'attributes': {'address': f'{email}@x.org'}}
+                    for email in person['emails']
+                )
+
+        return {
+            'data': data,
+            'included': included,
+            'meta': {},
+            'links': {'next': url} if int(offset) + int(per_page) < len(changed) else {},
+        }
+
+
+class TestSQLiteMirror(BasePCOTestCase):
+    """Test the SQLiteMirror class."""
+
+    def setUp(self):
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'mirror.sqlite')
+
+        self.people = FakePeople(30)
+        self.pco = Mock()
+        self.pco.api_base = 'https://api.planningcenteronline.com'
+        self.pco.get.side_effect = self.people.get
+
+        self.mirror = SQLiteMirror(self.pco, self.path)
+        self.addCleanup(self.mirror.close)
+
+    def test_refresh(self):
+        """Verify records, relationships, and includes are mirrored."""
+
+        self.assertEqual(
+            30,
+            self.mirror.refresh('people', '/people/v2/people', per_page=10, include='emails')
+        )
+
+        rows = self.mirror.query(
+            "SELECT id, json_extract(attributes, '$.name') AS name FROM people "
+            "WHERE json_extract(attributes, '$.name') = ?",
+            ('Person 7',)
+        )
+        self.assertEqual([('7', 'Person 7')], [tuple(row) for row in rows])
+
+        rows = self.mirror.query(
+            'SELECT related_type, related_id FROM people_relationships WHERE id = ?', ('7',)
+        )
+        self.assertEqual([('Email', '1007')], [tuple(row) for row in rows])
+
+        rows = self.mirror.query(
+            'SELECT included.attributes FROM people_relationships JOIN included '
+            'ON included.type = related_type AND included.id = related_id '
+            'WHERE people_relationships.id = ?',
+            ('7',)
+        )
+        self.assertEqual({'address': '1007@x.org'}, json.loads(rows[0]['attributes']))
+
+    def test_incremental_refresh(self):
+        """Verify refreshes only request and write changed records."""
+
+        self.mirror.refresh('people', '/people/v2/people', per_page=10)
+        self.people.requests = []
+
+        person = self.people.people['3']
+        person['name'] = 'Renamed'
+        person['updated_at'] = '2026-02-01T00:00:00Z'
+        person['emails'] = ['2000', '2001']
+
+        self.assertEqual(1, self.mirror.refresh('people', '/people/v2/people', per_page=10))
+        self.assertEqual(1, len(self.people.requests))
+
+        rows = self.mirror.query(
+            "SELECT json_extract(attributes, '$.name') FROM people WHERE id = '3'"
+        )
+        self.assertEqual('Renamed', rows[0][0])
+
+        rows = self.mirror.query(
+            "SELECT related_id FROM people_relationships WHERE id = '3' ORDER BY related_id"
+        )
+        self.assertEqual(['2000', '2001'], [row[0] for row in rows])
+
+        # Checkpoints survive reopening the mirror
+        self.mirror.close()
+        self.mirror = SQLiteMirror(self.pco, self.path)
+        self.addCleanup(self.mirror.close)
+        self.people.requests = []
+
+        self.assertEqual(0, self.mirror.refresh('people', '/people/v2/people', per_page=10))
+        self.assertEqual(1, len(self.people.requests))
+        self.assertEqual(30, self.mirror.query('SELECT COUNT(*) FROM people')[0][0])
+
+    def test_full_refresh(self):
+        """Verify a full refresh rebuilds the table, dropping deleted records."""
+
+        self.mirror.refresh('people', '/people/v2/people')
+        del self.people.people['5']
+
+        self.assertEqual(29, self.mirror.refresh('people', '/people/v2/people', full=True))
+        self.assertEqual(29, self.mirror.query('SELECT COUNT(*) FROM people')[0][0])
+        self.assertEqual(
+            [], self.mirror.query("SELECT * FROM people_relationships WHERE id = '5'")
+        )
+
+    def test_invalid_table(self):
+        """Verify table names are validated."""
+
+        with self.assertRaises(ValueError):
+            self.mirror.refresh('people; DROP TABLE included', '/people/v2/people')
+
+        # The mirror's own tables can't be used
+        for table in ('included', 'Mirror_Checkpoints', 'people_relationships', 'sqlite_master'):
+            with self.assertRaises(ValueError):
+                self.mirror.refresh(table, '/people/v2/people')
+
+        self.assertEqual([], self.people.requests)
@@ -0,0 +1,193 @@
+"""Test resumable NDJSON exports."""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+import pypco
+from pypco.ndjson import NDJSONExporter, main
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase
+
+
+class TestNDJSONExporter(BasePCOTestCase):
+    """Test exporting collections from a fake PCO API to NDJSON files."""
+
+    def setUp(self):
+
+        self.server = FakePCOServer(records=250).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url)
+
+    def read_records(self, exporter):
+        """Read the records from an export's files."""
+
+        records = []
+
+        for path in exporter.files():
+            with gzip.open(path, 'rt', encoding='utf-8') as export_fh:
+                records.extend(json.loads(line) for line in export_fh)
+
+        return records
+
+    def interrupt(self, exporter, pages, **params):
+        """Run an export that fails after a number of pages."""
+
+        get = self.pco.get
+        calls = []
+
+        def failing_get(*args, **kwargs):
+            calls.append(args)
+
+            if len(calls) > pages:
+                raise pypco.PCOUnexpectedRequestException('Interrupted')
+
+            return get(*args, **kwargs)
+
+        with patch.object(self.pco, 'get', side_effect=failing_get):
+            with self.assertRaises(pypco.PCOUnexpectedRequestException):
+                exporter.export('/people/v2/people', per_page=25, **params)
+
+    def test_export(self):
+        """Verify records are exported in order to rotated gzip files."""
+
+        exporter = NDJSONExporter(self.pco, self.directory, max_file_size=4000)
+
+        self.assertEqual(250, exporter.export('/people/v2/people', per_page=25, include='emails'))
+
+        records = self.read_records(exporter)
+
+        self.assertEqual([str(number) for number in range(1, 251)],
+                         [record['data']['id'] for record in records])
+        self.assertEqual(['Email', 'Email'], [include['type'] for include in records[0]['included']])
+        self.assertEqual(['can_include', 'parent'], sorted(records[0]['meta']))
+        self.assertGreater(len(exporter.files()), 1)
+        self.assertTrue(all(os.path.getsize(path) <= 4000 for path in exporter.files()))
+
+        checkpoint = exporter.load_checkpoint()
+        self.assertTrue(checkpoint.complete)
+        self.assertEqual(250, checkpoint.records)
+        self.assertEqual('250', checkpoint.last_id)
+
+        # A finished export isn't repeated
+        self.assertEqual(0, exporter.export('/people/v2/people', per_page=25, include='emails'))
+
+        with self.assertRaises(ValueError):
+            exporter.export('/people/v2/households')
+
+        self.assertEqual(250, exporter.export('/people/v2/people', restart=True))
+        self.assertEqual(250, len(self.read_records(exporter)))
+
+    def test_resume(self):
+        """Verify an interrupted export continues after the last checkpoint."""
+
+        exporter = NDJSONExporter(self.pco, self.directory, max_file_size=4000)
+
+        self.interrupt(exporter, 3)
+
+        checkpoint = exporter.load_checkpoint()
+        self.assertEqual(75, checkpoint.offset)
+        self.assertEqual('75', checkpoint.last_id)
+        self.assertFalse(checkpoint.complete)
+
+        # Simulate a page written without its checkpoint
+        with open(exporter.file_path(checkpoint.file_index), 'ab') as export_fh:
+            export_fh.write(gzip.compress(b'{"partial": true}\n')[:20])
+
+        with open(exporter.file_path(checkpoint.file_index + 1), 'wb') as export_fh:
+            export_fh.write(b'garbage')
+
+        self.assertEqual(175, exporter.export('/people/v2/people', per_page=25))
+
+        records = self.read_records(exporter)
+        self.assertEqual([str(number) for number in range(1, 251)],
+                         [record['data']['id'] for record in records])
+
+    def test_resume_after_changes(self):
+        """Verify records inserted or deleted before the checkpoint are handled on resume."""
+
+        exporter = NDJSONExporter(self.pco, self.directory, compression=None)
+
+        self.interrupt(exporter, 2, order='-created_at')
+
+        # Records inserted before the offset aren't exported twice
+        for _ in range(3):
+            self.pco.post('/people/v2/people', self.pco.template('Person', {'first_name': 'New'}))
+
+        self.assertEqual(200, exporter.export('/people/v2/people', per_page=25, order='-created_at'))
+
+        with open(exporter.files()[0], encoding='utf-8') as export_fh:
+            ids = [json.loads(line)['data']['id'] for line in export_fh]
+
+        self.assertEqual([str(number) for number in range(250, 0, -1)], ids)
+
+        # Deleted records are detected
+        exporter = NDJSONExporter(self.pco, self.directory, prefix='deleted', compression=None)
+        self.interrupt(exporter, 2)
+
+        self.pco.delete('/people/v2/people/1')
+        self.pco.delete('/people/v2/people/2')
+
+        with self.assertLogs('pypco.ndjson', level='WARNING'):
+            exporter.export('/people/v2/people', per_page=25)
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):  # pragma: no cover
+        """Verify zstd compressed exports can be read as a stream."""
+
+        exporter = NDJSONExporter(self.pco, self.directory, compression='zstd')
+        self.interrupt(exporter, 2)
+        exporter.export('/people/v2/people', per_page=25)
+
+        with open(exporter.files()[0], 'rb') as export_fh:
+            lines = zstandard.ZstdDecompressor().stream_reader(export_fh).read().splitlines()
+
+        self.assertEqual(250, len(lines))
+
+    def test_invalid_compression(self):
+        """Verify unknown compression formats are rejected."""
+
+        with self.assertRaises(ValueError):
+            NDJSONExporter(self.pco, self.directory, compression='lz4')
+
+    def test_main(self):
+        """Verify exports can be run from the command line."""
+
+        with patch.dict(os.environ, {'PCO_APP_ID': 'app_id', 'PCO_SECRET': 'secret'}), \
+                patch('pypco.ndjson.PCO', wraps=pypco.PCO) as mock_pco, \
+                patch('builtins.print') as mock_print:
+            main([
+                '/people/v2/people', self.directory, '--api-base', self.server.url,
+                '--include', 'emails', '--compression', 'none',
+            ])
+
+        self.assertEqual(('app_id', 'secret'), mock_pco.call_args[0][:2])
+        mock_print.assert_called_once()
+        self.assertIn('Exported 250 records', mock_print.call_args[0][0])
+
+        with open(os.path.join(self.directory, 'export-00000.ndjson'), encoding='utf-8') as export_fh:
+            self.assertEqual(250, len(export_fh.readlines()))
+
+    def test_main_legacy_app_id(self):
+        """Verify the command line still accepts PCO_APPLICATION_ID."""
+
+        with patch.dict(os.environ, {'PCO_APPLICATION_ID': 'app_id', 'PCO_SECRET': 'secret'}), \
+                patch('pypco.ndjson.PCO', wraps=pypco.PCO) as mock_pco, \
+                patch('builtins.print'):
+            os.environ.pop('PCO_APP_ID', None)
+            main(['/people/v2/people', self.directory, '--api-base', self.server.url, '--compression', 'none'])
+
+        self.assertEqual(('app_id', 'secret'), mock_pco.call_args[0][:2])
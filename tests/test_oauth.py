@@ -0,0 +1,300 @@
+"""Test managed OAuth tokens."""
+
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import Mock
+
+import pypco
+from pypco.auth_config import PCOAuthConfig
+from pypco.oauth import FileTokenStore, MemoryTokenStore, OAuthToken, OAuthTokenManager, TokenStore
+from tests import BasePCOTestCase, LocalServer
+
+
+class FakeTokenEndpoint:
+    """A stand-in for a requests session posting to the PCO OAuth token endpoint."""
+
+    def __init__(self, delay=0.05):
+
+        self.delay = delay
+        self.refreshes = []
+        self._lock = threading.Lock()
+
+    def post(self, url, data, headers, timeout):  # pylint: disable=unused-argument
+        """Issue a new token for the posted refresh token."""
+
+        with self._lock:
+            self.refreshes.append(data['refresh_token'])
+            count = len(self.refreshes)
+
+        time.sleep(self.delay)
+
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            'access_token': f'access-{count}',
+            'refresh_token': f'refresh-{count}',
+            'expires_in': 7200,
+            'created_at': int(time.time()),
+            'scope': 'people',
+        }
+
+        return response
+
+
+class BearerHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO API accepting a single access token."""
+
+    valid_token = None
+    seen = []
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Respond 401 unless the request used the valid token."""
+
+        BearerHandler.seen.append(self.headers['Authorization'])
+        ok = self.headers['Authorization'] == f'Bearer {BearerHandler.valid_token}'
+        body = json.dumps({'data': []} if ok else {'errors': []}).encode()
+
+        self.send_response(200 if ok else 401)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def expiring_token(expires_in=10):
+    """Create a token expiring soon."""
+
+    return OAuthToken('access-0', 'refresh-0', time.time() + expires_in, 'people')
+
+
+class TestOAuthTokenManager(BasePCOTestCase):
+    """Test the OAuthTokenManager class."""
+
+    def setUp(self):
+
+        self.endpoint = FakeTokenEndpoint()
+        self.manager = OAuthTokenManager('client', 'secret')
+        self.manager.session = self.endpoint
+        self.addCleanup(self.manager.stop)
+
+    def test_get_token(self):
+        """Verify tokens are only refreshed when about to expire."""
+
+        self.manager.add('user', expiring_token(3600))
+        self.assertEqual('access-0', self.manager.get_token('user').access_token)
+        self.assertEqual([], self.endpoint.refreshes)
+
+        self.manager.add('user', expiring_token(10))
+        token = self.manager.get_token('user')
+
+        self.assertEqual('access-1', token.access_token)
+        self.assertEqual('refresh-1', token.refresh_token)
+        self.assertEqual(['refresh-0'], self.endpoint.refreshes)
+        self.assertEqual(token, self.manager.store.get('user'))
+
+        with self.assertRaises(pypco.PCOCredentialsException):
+            self.manager.get_token('nobody')
+
+    def test_single_refresh_in_flight(self):
+        """Verify concurrent refreshes of a token result in a single request."""
+
+        self.manager.add('user', expiring_token())
+        tokens = []
+
+        threads = [
+            threading.Thread(target=lambda: tokens.append(self.manager.get_token('user')))
+            for _ in range(10)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['refresh-0'], self.endpoint.refreshes)
+        self.assertEqual({'access-1'}, {token.access_token for token in tokens})
+
+    def test_refresh_between_processes(self):
+        """Verify a token being refreshed by another process isn't refreshed again."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tokens.json')
+
+            self.manager.store = FileTokenStore(path)
+            self.manager.add('user', expiring_token())
+
+            # Another process holds the lease...
+            other = FileTokenStore(path)
+            self.assertTrue(other.claim('user', 'other-process', 60))
+            self.assertFalse(self.manager.store.claim('user', 'third-process', 60))
+
+            tokens = []
+            thread = threading.Thread(
+                target=lambda: tokens.append(self.manager.get_token('user'))
+            )
+            thread.start()
+            time.sleep(0.2)
+
+            # ...and stores its refreshed token
+            refreshed = OAuthToken('access-other', 'refresh-other', time.time() + 7200)
+            other.set('user', refreshed)
+            thread.join()
+
+            self.assertEqual([refreshed], tokens)
+            self.assertEqual([], self.endpoint.refreshes)
+
+    def test_expired_lease(self):
+        """Verify a lease abandoned by another process expires."""
+
+        self.manager.add('user', expiring_token())
+        self.manager.store.claim('user', 'crashed-process', 0.2)
+
+        self.assertEqual('access-1', self.manager.get_token('user').access_token)
+        self.assertEqual(['refresh-0'], self.endpoint.refreshes)
+
+    def test_live_pco_updated(self):
+        """Verify PCO objects follow their token as it is refreshed."""
+
+        self.manager.add('user', expiring_token(3600))
+        pco = self.manager.pco('user')
+
+        self.assertEqual('Bearer access-0', pco._auth_header)  # pylint: disable=protected-access
+
+        credentials_key = pco._auth_config.credentials_key  # pylint: disable=protected-access
+
+        self.manager.refresh('user', rejected='access-0')
+        self.assertEqual('Bearer access-1', pco._auth_header)  # pylint: disable=protected-access
+
+        # Cached responses and rate limits stay keyed to the user, not the token
+        self.assertEqual(credentials_key, pco._auth_config.credentials_key)  # pylint: disable=protected-access
+        self.assertNotEqual(
+            credentials_key,
+            PCOAuthConfig(token='access-1').credentials_key
+        )
+
+        # A stale rejected token doesn't trigger another refresh
+        self.manager.refresh('user', rejected='access-0')
+        self.assertEqual(1, len(self.endpoint.refreshes))
+
+    def test_rejected_token_refreshed(self):
+        """Verify requests rejected as unauthorized are retried with a refreshed token."""
+
+        BearerHandler.valid_token = 'access-1'
+        BearerHandler.seen = []
+
+        self.manager.add('user', expiring_token(3600))
+
+        with LocalServer(BearerHandler) as server:
+            pco = self.manager.pco('user', api_base=server.url)
+
+            self.assertEqual({'data': []}, pco.get('/people/v2/people'))
+
+        self.assertEqual(['Bearer access-0', 'Bearer access-1'], BearerHandler.seen)
+        self.assertEqual(['refresh-0'], self.endpoint.refreshes)
+
+    def test_background_refresh(self):
+        """Verify tokens are refreshed in the background before they expire."""
+
+        self.manager.add('first', expiring_token())
+        self.manager.add('second', expiring_token(3600))
+        pco = self.manager.pco('first')
+
+        self.manager.start(interval=0.01)
+
+        deadline = time.time() + 5
+        while self.manager.store.get('first').access_token == 'access-0' and \
+                time.time() < deadline:
+            time.sleep(0.01)
+
+        self.manager.stop()
+
+        self.assertEqual(['refresh-0'], self.endpoint.refreshes)
+        self.assertEqual('Bearer access-1', pco._auth_header)  # pylint: disable=protected-access
+        self.assertEqual('access-0', self.manager.store.get('second').access_token)
+
+
+class TestTokenStores(BasePCOTestCase):
+    """Test OAuth token storage."""
+
+    def test_token_from_response(self):
+        """Verify tokens are created from token endpoint responses."""
+
+        token = OAuthToken.from_response({
+            'access_token': 'access',
+            'refresh_token': 'refresh',
+            'expires_in': 7200,
+            'created_at': 1000,
+            'scope': 'people services',
+        })
+
+        self.assertEqual(8200, token.expires_at)
+        self.assertEqual(token, OAuthToken.from_dict(token.to_dict()))
+
+    def test_memory_store(self):
+        """Verify tokens and leases are stored in memory."""
+
+        store = MemoryTokenStore()
+        token = expiring_token()
+
+        self.assertIsNone(store.get('user'))
+
+        store.set('user', token)
+        self.assertEqual(token, store.get('user'))
+        self.assertEqual(['user'], store.keys())
+
+        self.assertTrue(store.claim('user', 'a', 60))
+        self.assertFalse(store.claim('user', 'b', 60))
+
+        store.release('user', 'b')
+        self.assertFalse(store.claim('user', 'b', 60))
+
+        store.release('user', 'a')
+        self.assertTrue(store.claim('user', 'b', 60))
+
+        store.delete('user')
+        self.assertIsNone(store.get('user'))
+
+    def test_incomplete_store(self):
+        """Verify stores must implement the lease methods as well as token storage."""
+
+        class LeaselessStore(TokenStore):  # pylint: disable=abstract-method
+            """A store without claim() and release() methods."""
+
+            get = MemoryTokenStore.get
+            set = MemoryTokenStore.set
+            delete = MemoryTokenStore.delete
+            keys = MemoryTokenStore.keys
+
+        with self.assertRaises(TypeError):
+            LeaselessStore()  # pylint: disable=abstract-class-instantiated
+
+    def test_file_store(self):
+        """Verify tokens are stored durably in a file readable only by its owner."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tokens.json')
+            token = expiring_token()
+
+            store = FileTokenStore(path)
+            store.set('user', token)
+            self.assertTrue(store.claim('user', 'a', 60))
+
+            other = FileTokenStore(path)
+            self.assertEqual(token, other.get('user'))
+            self.assertFalse(other.claim('user', 'b', 60))
+            self.assertFalse(other.claim('nobody', 'b', 60))
+
+            # Storing a refreshed token releases the lease
+            store.set('user', expiring_token(3600))
+            self.assertTrue(other.claim('user', 'b', 60))
+
+            self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+            self.assertEqual(['tokens.json', 'tokens.json.lock'], sorted(os.listdir(directory)))
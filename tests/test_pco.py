@@ -4,6 +4,8 @@
 
 import os
 import json
+import threading
+from http.server import BaseHTTPRequestHandler
 from unittest.mock import Mock, patch
 
 import requests
@@ -12,8 +14,8 @@ from requests.exceptions import SSLError
 import pypco
 from pypco.exceptions import PCORequestTimeoutException, \
     PCORequestException, PCOUnexpectedRequestException
-from pypco.auth_config import PCOAuthConfig
-from tests import BasePCOTestCase, BasePCOVCRTestCase
+from pypco.auth_config import ORG_TOKEN_CACHE, PCOAuthConfig
+from tests import BasePCOTestCase, BasePCOVCRTestCase, LocalServer
 
 # region Side Effect Functions
 
@@ -342,6 +344,43 @@ class TestPrivateRequestFunctions(BasePCOTestCase):
         mock_sleep.assert_called_with(15)
         self.assertIsNotNone(result, "Didn't get response returned!")
 
+    @patch('requests.Session.request')
+    @patch('pypco.auth_config.get_cc_org_token', side_effect=['stale', 'fresh'])
+    def test_do_auth_managed_request(self, mock_get_token, mock_request):
+        """Test org tokens are fetched lazily and refreshed when rejected."""
+
+        ORG_TOKEN_CACHE.clear()
+        self.addCleanup(ORG_TOKEN_CACHE.clear)
+
+        def respond(method, url, headers, **kwargs):  # pylint: disable=unused-argument
+            response = Mock()
+            response.status_code = 200 if headers['Authorization'] == 'OrganizationToken fresh' \
+                else 401
+            return response
+
+        mock_request.side_effect = respond
+
+        pco = pypco.PCO(cc_name='carlsbad')
+        mock_get_token.assert_not_called()
+
+        response = pco._do_auth_managed_request('GET', '/test')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, mock_request.call_count)
+        self.assertEqual(2, mock_get_token.call_count)
+
+        # The refreshed token is shared with new PCO objects
+        pco = pypco.PCO(cc_name='carlsbad')
+        self.assertEqual('OrganizationToken fresh', pco._auth_header)
+        self.assertEqual(2, mock_get_token.call_count)
+
+        # Credentials that can't be refreshed aren't retried
+        mock_request.reset_mock()
+
+        pco = pypco.PCO('app_id', 'secret')
+        self.assertEqual(401, pco._do_auth_managed_request('GET', '/test').status_code)
+        mock_request.assert_called_once()
+
     @patch('requests.Session.request')
     def test_do_url_managed_request(self, mock_request):
         """Test requests with URL cleanup."""
@@ -691,6 +730,141 @@ class TestPublicRequestFunctions(BasePCOVCRTestCase):
         # No response, should give back an empty list
         self.assertEqual([], list(pco.iterate('/people/v2/people')))
 
+    @patch('pypco.PCO.get')
+    def test_iterate_include_injection(self, get_mock):
+        """Test includes are injected into the objects with which they are associated."""
+
+        get_mock.return_value = {
+            'data': [
+                {
+                    'type': 'Person',
+                    'id': '1',
+                    'relationships': {
+                        'emails': {'data': [
+                            {'type': 'Email', 'id': '10'},
+                            {'type': 'Email', 'id': '11'},
+                        ]},
+                        'primary_campus': {'data': {'type': 'Campus', 'id': '1'}},
+                        'household': {'data': None},
+                    },
+                },
+                {
+                    'type': 'Person',
+                    'id': '2',
+                    'relationships': {
+                        'emails': {'data': [{'type': 'Email', 'id': '20'}]},
+                        'primary_campus': {'data': {'type': 'Campus', 'id': '2'}},
+                    },
+                },
+            ],
+            'included': [
+                {'type': 'Email', 'id': '11'},
+                {'type': 'Campus', 'id': '1'},
+                {'type': 'Email', 'id': '10'},
+                {'type': 'Email', 'id': '20'},
+            ],
+            'meta': {},
+            'links': {},
+        }
+
+        records = list(self.pco.iterate('/people/v2/people', include='emails,primary_campus'))
+
+        self.assertEqual(2, len(records))
+        self.assertEqual(
+            [('Email', '10'), ('Email', '11'), ('Campus', '1')],
+            [(include['type'], include['id']) for include in records[0]['included']]
+        )
+
+        # Campus 2 wasn't included in the response, so it shouldn't be injected
+        self.assertEqual(
+            [('Email', '20')],
+            [(include['type'], include['id']) for include in records[1]['included']]
+        )
+
+    @patch('pypco.PCO.get')
+    def test_iterate_prefetch(self, get_mock):
+        """Test iterate when fetching pages concurrently."""
+
+        total_count = 103
+
+        def get_page(_, offset, per_page, **__):
+            """Mock a page of a list response with total_count records."""
+
+            page = {
+                'data': [
+                    {'type': 'Person', 'id': str(ndx)}
+                    for ndx in range(offset, min(offset + per_page, total_count))
+                ],
+                'included': [],
+                'meta': {'total_count': total_count},
+                'links': {},
+            }
+
+            if offset + per_page < total_count:
+                page['links']['next'] = 'next'
+
+            return page
+
+        get_mock.side_effect = get_page
+
+        pco = self.pco
+
+        records = list(pco.iterate('/people/v2/people', per_page=10, prefetch=True, max_workers=3))
+
+        self.assertEqual(
+            [str(ndx) for ndx in range(total_count)],
+            [record['data']['id'] for record in records],
+            'Records were not returned in order.'
+        )
+        self.assertEqual(11, get_mock.call_count)
+
+        # Start with a non-zero offset
+        get_mock.reset_mock()
+
+        records = list(pco.iterate('/people/v2/people', offset=50, per_page=25, prefetch=True))
+
+        self.assertEqual(
+            [str(ndx) for ndx in range(50, total_count)],
+            [record['data']['id'] for record in records]
+        )
+        self.assertEqual(3, get_mock.call_count)
+
+        # Records added after the first page should still be picked up
+        get_mock.reset_mock()
+
+        def get_growing_page(url, offset, per_page, **params):
+            """Mock a list response that grows after the first page is fetched."""
+
+            nonlocal total_count
+
+            page = get_page(url, offset, per_page, **params)
+            total_count = 113
+
+            return page
+
+        get_mock.side_effect = get_growing_page
+        total_count = 103
+
+        records = list(pco.iterate('/people/v2/people', per_page=10, prefetch=True))
+
+        self.assertEqual(
+            [str(ndx) for ndx in range(113)],
+            [record['data']['id'] for record in records]
+        )
+
+    @patch('pypco.PCO.get')
+    def test_iterate_prefetch_no_total_count(self, get_mock):
+        """Test iterate with prefetch falls back to sequential pages without total_count."""
+
+        get_mock.side_effect = [
+            {'data': [{'type': 'Person', 'id': '1'}], 'meta': {}, 'links': {'next': 'next'}},
+            {'data': [{'type': 'Person', 'id': '2'}], 'meta': {}, 'links': {}},
+        ]
+
+        records = list(self.pco.iterate('/people/v2/people', per_page=1, prefetch=True))
+
+        self.assertEqual(['1', '2'], [record['data']['id'] for record in records])
+
     def test_template(self):
         """Test the template function."""
 
@@ -824,3 +998,104 @@ class TestPCOInitialization(BasePCOTestCase):
         self.assertEqual(pco.upload_url, 'https://upload.files')
         self.assertEqual(pco.upload_timeout, 50)
         self.assertEqual(pco.timeout_retries, 500)
+
+    def test_connection_pool(self):
+        """Verify the connection pool can be sized."""
+
+        adapter = pypco.PCO('app_id', 'app_secret').session.get_adapter('https://x')
+        self.assertEqual(10, adapter._pool_maxsize)
+
+        pco = pypco.PCO('app_id', 'app_secret', pool_connections=2, pool_maxsize=32, pool_block=True)
+
+        for url in ('https://api.planningcenteronline.com', 'http://localhost'):
+            adapter = pco.session.get_adapter(url)
+
+            self.assertEqual(2, adapter._pool_connections)
+            self.assertEqual(32, adapter._pool_maxsize)
+            self.assertTrue(adapter._pool_block)
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """A keep-alive stand-in for the PCO API that echoes requests and counts connections."""
+
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    lock = threading.Lock()
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Echo the path and authorization header."""
+
+        with EchoHandler.lock:
+            EchoHandler.connections.add(self.client_address)
+
+        body = json.dumps({
+            'data': {'path': self.path, 'authorization': self.headers['Authorization']}
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestThreadSafety(BasePCOTestCase):
+    """Test many threads sharing one PCO object."""
+
+    def setUp(self):
+
+        EchoHandler.connections = set()
+
+        self.server = LocalServer(EchoHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def stress(self, pco, threads=32, requests_per_thread=25):
+        """Make requests from many threads at once, verifying every response."""
+
+        errors = []
+        barrier = threading.Barrier(threads)
+
+        def worker(number):
+            barrier.wait()
+
+            try:
+                for index in range(requests_per_thread):
+                    path = f'/people/v2/people/{number}-{index}'
+                    response = pco.get(path)
+
+                    if response['data']['path'] != path:
+                        errors.append(f'{path}: {response}')
+            except Exception as err:  # pylint: disable=broad-except
+                errors.append(repr(err))
+
+        workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+
+        for thread in workers:
+            thread.start()
+
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def test_shared_client(self):
+        """Verify concurrent requests all succeed and reuse pooled connections."""
+
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, pool_maxsize=32)
+
+        self.stress(pco)
+
+        self.assertLessEqual(len(EchoHandler.connections), 32)
+
+    def test_blocking_pool(self):
+        """Verify a blocking pool caps the number of connections per host."""
+
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url, pool_maxsize=4,
+                        pool_block=True)
+
+        self.stress(pco)
+
+        self.assertLessEqual(len(EchoHandler.connections), 4)
@@ -17,6 +17,148 @@ class TestExpectedImports(unittest.TestCase):
         except ImportError as err:
             self.fail(err.msg)
 
+    def test_async_class_available(self):
+        """Verify asyncio PCO class can be resolved."""
+
+        try:
+            from pypco import AsyncPCO
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_rate_limiter_class_available(self):
+        """Verify rate limiter class can be resolved."""
+
+        try:
+            from pypco import RateLimiter
+            from pypco import MemoryRateLimitBackend
+            from pypco import FileRateLimitBackend
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_cache_classes_available(self):
+        """Verify response cache classes can be resolved."""
+
+        try:
+            from pypco import ResponseCache
+            from pypco import MemoryResponseCache
+            from pypco import SQLiteResponseCache
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_bulk_classes_available(self):
+        """Verify bulk operation classes can be resolved."""
+
+        try:
+            from pypco import BulkResult
+            from pypco import WritePipeline
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_sync_classes_available(self):
+        """Verify incremental sync classes can be resolved."""
+
+        try:
+            from pypco import IncrementalSync
+            from pypco import SyncCheckpoint
+            from pypco import CheckpointStore
+            from pypco import MemoryCheckpointStore
+            from pypco import FileCheckpointStore
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_mirror_classes_available(self):
+        """Verify mirror classes can be resolved."""
+
+        try:
+            from pypco import SQLiteMirror
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_upload_classes_available(self):
+        """Verify upload classes can be resolved."""
+
+        try:
+            from pypco import FileUpload
+            from pypco import UploadProgress
+            from pypco import UploadCache
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_oauth_classes_available(self):
+        """Verify OAuth token management classes can be resolved."""
+
+        try:
+            from pypco import OAuthToken
+            from pypco import OAuthTokenManager
+            from pypco import TokenStore
+            from pypco import MemoryTokenStore
+            from pypco import FileTokenStore
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_retry_classes_available(self):
+        """Verify retry policy classes can be resolved."""
+
+        try:
+            from pypco import RetryPolicy
+            from pypco import RetryReason
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_instrumentation_classes_available(self):
+        """Verify instrumentation classes can be resolved."""
+
+        try:
+            from pypco import RequestEvent
+            from pypco import RequestListener
+            from pypco import RequestMetrics
+            from pypco import EndpointMetrics
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_codec_classes_available(self):
+        """Verify JSON codec classes can be resolved."""
+
+        try:
+            from pypco import JSONCodec
+            from pypco import StdlibJSONCodec
+            from pypco import OrjsonCodec
+            from pypco import MsgspecCodec
+            from pypco import fastest_codec
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_records_classes_available(self):
+        """Verify record and page view classes can be resolved."""
+
+        try:
+            from pypco import RecordView
+            from pypco import IndexedPage
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_export_classes_available(self):
+        """Verify export classes can be resolved."""
+
+        try:
+            from pypco import Column
+            from pypco import ColumnarExporter
+            from pypco import ExportWriter
+            from pypco import CSVWriter
+            from pypco import ParquetWriter
+            from pypco import ArrowIPCWriter
+        except ImportError as err:
+            self.fail(err.msg)
+
+    def test_ndjson_classes_available(self):
+        """Verify NDJSON export classes can be resolved."""
+
+        try:
+            from pypco import NDJSONExporter
+            from pypco import ExportCheckpoint
+        except ImportError as err:
+            self.fail(err.msg)
+
     def test_exception_classes_available(self):
         """Verify exception classes can be resolved."""
 
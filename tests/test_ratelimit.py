@@ -0,0 +1,257 @@
+"""Test the client-side rate limiter."""
+
+#pylint: disable=protected-access
+
+import multiprocessing
+import os
+import tempfile
+from unittest.mock import Mock, patch
+
+import pypco
+from pypco.ratelimit import RateLimiter, RateLimitBackend, FileRateLimitBackend
+from tests import BasePCOTestCase
+
+
+def rate_headers(count, limit=100, period=20):
+    """Build PCO rate limit headers."""
+
+    return {
+        'X-PCO-API-Request-Rate-Limit': str(limit),
+        'X-PCO-API-Request-Rate-Count': str(count),
+        'X-PCO-API-Request-Rate-Period': str(period),
+    }
+
+
+class TestRateLimiter(BasePCOTestCase):
+    """Test the RateLimiter class."""
+
+    def setUp(self):
+
+        self.now = 1000.0
+
+        time_patcher = patch('pypco.ratelimit.time')
+        self.mock_time = time_patcher.start()
+        self.mock_time.time.side_effect = lambda: self.now
+        self.addCleanup(time_patcher.stop)
+
+    def test_unknown_limit(self):
+        """Verify requests aren't delayed before rate limit headers have been seen."""
+
+        limiter = RateLimiter()
+
+        self.assertIsNone(limiter.remaining)
+        self.assertIsNone(limiter.limit)
+
+        for _ in range(500):
+            self.assertEqual(0, limiter.acquire())
+
+        self.mock_time.sleep.assert_not_called()
+
+        # Responses without headers are ignored
+        limiter.update({})
+        limiter.update({'X-PCO-API-Request-Rate-Limit': 'bogus'})
+        self.assertIsNone(limiter.remaining)
+
+        # 429s can't be enforced without a known limit
+        self.assertFalse(limiter.penalize(20))
+
+    def test_spacing(self):
+        """Verify requests are spaced out once the budget is exhausted."""
+
+        limiter = RateLimiter()
+        limiter.update(rate_headers(count=95))
+
+        self.assertEqual(100, limiter.limit)
+        self.assertEqual(20, limiter.period)
+        self.assertEqual(5, limiter.remaining)
+
+        for _ in range(5):
+            self.assertEqual(0, limiter.acquire())
+
+        self.assertEqual(0, limiter.remaining)
+        self.mock_time.sleep.assert_not_called()
+
+        # The bucket refills at 5 tokens per second
+        self.assertAlmostEqual(0.2, limiter.acquire())
+        self.mock_time.sleep.assert_called_once()
+        self.assertAlmostEqual(0.4, limiter.acquire())
+
+        self.now += 2
+        self.assertEqual(8, limiter.remaining)
+
+        # Never refills beyond the limit
+        self.now += 3600
+        self.assertEqual(100, limiter.remaining)
+
+    def test_update_never_adds_tokens(self):
+        """Verify a stale count from the server doesn't hand back spent tokens."""
+
+        limiter = RateLimiter()
+        limiter.update(rate_headers(count=50))
+
+        for _ in range(10):
+            limiter.acquire()
+
+        limiter.update(rate_headers(count=51))
+        self.assertEqual(40, limiter.remaining)
+
+        limiter.update(rate_headers(count=70))
+        self.assertEqual(30, limiter.remaining)
+
+    def test_reserve(self):
+        """Verify reserved tokens are held back."""
+
+        limiter = RateLimiter(reserve=10)
+        limiter.update(rate_headers(count=85))
+
+        self.assertEqual(5, limiter.remaining)
+
+        for _ in range(5):
+            self.assertEqual(0, limiter.acquire())
+
+        self.assertAlmostEqual(0.2, limiter.acquire())
+
+    def test_penalize(self):
+        """Verify a 429 response holds requests back for Retry-After seconds."""
+
+        limiter = RateLimiter()
+        limiter.update(rate_headers(count=100))
+
+        self.assertTrue(limiter.penalize(12))
+        self.assertEqual(0, limiter.remaining)
+        self.assertAlmostEqual(12.2, limiter.acquire())
+
+
+def reserve_tokens(path, count, results):
+    """Reserve tokens from a file backed rate limiter in a separate process."""
+
+    limiter = RateLimiter(backend=FileRateLimitBackend(path))
+
+    results.put(sum(1 for _ in range(count) if limiter.reserve_token() == 0))
+
+
+class TestFileRateLimitBackend(BasePCOTestCase):
+    """Test sharing rate limit state through a file."""
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.path = os.path.join(self.directory.name, 'ratelimit.json')
+
+    def test_shared_state(self):
+        """Verify limiters using the same file share a budget."""
+
+        first = RateLimiter(backend=FileRateLimitBackend(self.path))
+        second = RateLimiter(backend=FileRateLimitBackend(self.path))
+
+        self.assertIsNone(second.remaining)
+
+        first.update(rate_headers(count=90, period=3600))
+
+        self.assertEqual(10, second.remaining)
+        self.assertEqual(100, second.limit)
+        self.assertEqual(3600, second.period)
+
+        for _ in range(4):
+            second.reserve_token()
+
+        self.assertEqual(6, first.remaining)
+
+    def test_shared_between_processes(self):
+        """Verify processes sharing a file never exceed the budget together."""
+
+        RateLimiter(backend=FileRateLimitBackend(self.path)).update(
+            rate_headers(count=80, period=3600)
+        )
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=reserve_tokens, args=(self.path, 10, results))
+            for _ in range(4)
+        ]
+
+        for process in processes:
+            process.start()
+
+        granted = sum(results.get(timeout=30) for _ in processes)
+
+        for process in processes:
+            process.join()
+
+        self.assertEqual(20, granted)
+
+    def test_for_credentials(self):
+        """Verify backends are keyed by credentials."""
+
+        backend = FileRateLimitBackend.for_credentials('app_id', 'secret', directory='/tmp')
+        same = FileRateLimitBackend.for_credentials('app_id', 'other', directory='/tmp')
+        other = FileRateLimitBackend.for_credentials(token='token', directory='/tmp')
+
+        self.assertEqual(backend.path, same.path)
+        self.assertNotEqual(backend.path, other.path)
+        self.assertTrue(backend.path.startswith('/tmp/pypco-ratelimit-'))
+        self.assertNotIn('app_id', backend.path)
+
+    def test_incomplete_backend(self):
+        """Verify backends must implement transaction()."""
+
+        class IncompleteBackend(RateLimitBackend):  # pylint: disable=abstract-method
+            """A backend without a transaction() method."""
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()  # pylint: disable=abstract-class-instantiated
+
+
+class TestPCORateLimiter(BasePCOTestCase):
+    """Test the PCO object with a rate limiter."""
+
+    @patch('requests.Session.request')
+    @patch('time.sleep')
+    def test_ratelimit_managed_request(self, mock_sleep, mock_request):
+        """Verify the rate limiter is fed by responses and consulted before requests."""
+
+        limiter = RateLimiter()
+
+        pco = pypco.PCO('app_id', 'secret', rate_limiter=limiter)
+
+        response = Mock()
+        response.status_code = 200
+        response.headers = rate_headers(count=99)
+        mock_request.return_value = response
+
+        pco._do_ratelimit_managed_request('GET', '/test')
+
+        self.assertEqual(1, limiter.remaining)
+        mock_sleep.assert_not_called()
+
+        pco._do_ratelimit_managed_request('GET', '/test')
+        mock_sleep.assert_not_called()
+
+        # The budget is gone, so the next request waits for the bucket to refill
+        pco._do_ratelimit_managed_request('GET', '/test')
+        self.assertEqual(1, mock_sleep.call_count)
+        self.assertGreater(mock_sleep.call_args[0][0], 0)
+
+    @patch('requests.Session.request')
+    @patch('time.sleep')
+    def test_ratelimit_managed_request_429(self, mock_sleep, mock_request):
+        """Verify a 429 response is waited out once, through the rate limiter."""
+
+        limited = Mock()
+        limited.status_code = 429
+        limited.headers = {'Retry-After': '5', **rate_headers(count=101)}
+
+        success = Mock()
+        success.status_code = 200
+        success.headers = rate_headers(count=1)
+
+        mock_request.side_effect = [limited, success]
+
+        pco = pypco.PCO('app_id', 'secret', rate_limiter=RateLimiter())
+
+        self.assertIs(success, pco._do_ratelimit_managed_request('GET', '/test'))
+
+        mock_sleep.assert_called_once()
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 5)
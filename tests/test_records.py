@@ -0,0 +1,143 @@
+"""Test record views of list responses."""
+
+import json
+
+import pypco
+from pypco.records import IndexedPage, RecordView, iterate_page_records, iterate_page_views
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase
+
+PAGE = {
+    'data': [
+        {
+            'type': 'Person',
+            'id': '1',
+            'relationships': {
+                'emails': {'data': [{'type': 'Email', 'id': '10'}, {'type': 'Email', 'id': '11'}]},
+                'household': {'data': {'type': 'Household', 'id': '20'}},
+                'primary_campus': {'data': None},
+                'school': {'data': {'type': 'School', 'id': 'not-included'}},
+            },
+        },
+        {'type': 'Person', 'id': '2'},
+    ],
+    'included': [
+        {'type': 'Email', 'id': '10'},
+        {'type': 'Email', 'id': '11'},
+        {'type': 'Household', 'id': '20'},
+    ],
+    'meta': {'total_count': 2, 'count': 2, 'can_include': ['emails'], 'parent': {'id': '1'}},
+    'links': {},
+}
+
+
+class TestRecordView(BasePCOTestCase):
+    """Test the RecordView class."""
+
+    def test_dict_compatible(self):
+        """Verify record views are equivalent to the dicts iterate() yields by default."""
+
+        records = list(iterate_page_records(PAGE))
+        views = list(iterate_page_views(PAGE))
+
+        self.assertEqual(records, views)
+        self.assertEqual(records, [view.to_dict() for view in views])
+        self.assertEqual(json.dumps(records), json.dumps([view.to_dict() for view in views]))
+
+        view = views[0]
+        self.assertEqual(['data', 'included', 'meta'], list(view))
+        self.assertEqual(3, len(view))
+        self.assertIn('included', view)
+        self.assertIs(PAGE['data'][0], view['data'])
+        self.assertEqual(['10', '11', '20'], [include['id'] for include in view['included']])
+        self.assertEqual({'can_include': ['emails'], 'parent': {'id': '1'}}, view.get('meta'))
+        self.assertIsNone(view.get('links'))
+
+        with self.assertRaises(KeyError):
+            view['links']  # pylint: disable=pointless-statement
+
+        self.assertEqual([], views[1]['included'])
+
+    def test_shared_and_lazy(self):
+        """Verify views share page state and resolve includes only when accessed."""
+
+        first, second = iterate_page_views(PAGE)
+
+        self.assertIs(first.meta, second.meta)
+        self.assertIsNone(first._page._index)  # pylint: disable=protected-access
+
+        self.assertIs(first.included, first['included'])
+        self.assertIsNotNone(first._page._index)  # pylint: disable=protected-access
+
+        self.assertFalse(hasattr(first, '__dict__'))
+
+
+class TestIndexedPage(BasePCOTestCase):
+    """Test the IndexedPage class."""
+
+    def test_indexed_page(self):
+        """Verify indexed pages read like the page and find the includes of objects."""
+
+        page = IndexedPage(PAGE)
+
+        self.assertEqual(PAGE, page)
+        self.assertIs(PAGE['data'], page['data'])
+        self.assertEqual(['data', 'included', 'meta', 'links'], list(page))
+        self.assertEqual(3, len(page.index))
+        self.assertIs(PAGE['included'][2], page.index[('Household', '20')])
+        self.assertEqual(
+            [record['included'] for record in iterate_page_records(PAGE)],
+            [page.included_for(data) for data in page['data']]
+        )
+
+
+class TestIteratePages(BasePCOTestCase):
+    """Test iterating records and pages against a fake PCO API."""
+
+    def setUp(self):
+
+        self.server = FakePCOServer(records=60).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url)
+
+    def test_iterate_pages(self):
+        """Verify iterate_pages() yields whole pages, in order, with or without prefetch."""
+
+        for prefetch in (False, True):
+            pages = list(self.pco.iterate_pages('/people/v2/people', per_page=25,
+                                                prefetch=prefetch))
+
+            self.assertEqual([25, 25, 10], [len(page['data']) for page in pages])
+            self.assertEqual(
+                [str(number) for number in range(1, 61)],
+                [person['id'] for page in pages for person in page['data']]
+            )
+            self.assertTrue(all(isinstance(page, dict) for page in pages))
+            self.assertIn('next', pages[0]['links'])
+
+        self.assertEqual(2, len(list(self.pco.iterate_pages('/people/v2/people', offset=10))))
+
+    def test_index_includes(self):
+        """Verify indexed pages resolve the same includes as iterate()."""
+
+        records = list(self.pco.iterate('/people/v2/people', per_page=25, include='emails'))
+        pages = list(self.pco.iterate_pages('/people/v2/people', per_page=25, include='emails',
+                                            index_includes=True))
+
+        self.assertTrue(all(isinstance(page, IndexedPage) for page in pages))
+        self.assertEqual(
+            [record['included'] for record in records],
+            [page.included_for(person) for page in pages for person in page['data']]
+        )
+
+    def test_record_views(self):
+        """Verify iterate() yields record views equivalent to its default dicts."""
+
+        records = list(self.pco.iterate('/people/v2/people', per_page=25, include='emails'))
+        views = list(self.pco.iterate('/people/v2/people', per_page=25, include='emails',
+                                      record_views=True, prefetch=True))
+
+        self.assertTrue(all(isinstance(view, RecordView) for view in views))
+        self.assertEqual(60, len(views))
+        self.assertEqual(records, views)
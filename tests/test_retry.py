@@ -0,0 +1,237 @@
+"""Test retrying failed requests."""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import requests
+
+import pypco
+from pypco.retry import RetryPolicy, RetryReason
+from tests import BasePCOTestCase, LocalServer
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO API that fails a number of times before succeeding."""
+
+    failures = 0
+    status = 503
+    headers_to_send = {}
+    requests = []
+    lock = threading.Lock()
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def respond(self):
+        """Fail while failures remain, then succeed."""
+
+        with FlakyHandler.lock:
+            FlakyHandler.requests.append(self.command)
+            failing = FlakyHandler.failures > 0
+            FlakyHandler.failures -= 1
+
+        if failing and FlakyHandler.status is None:
+            # Drop the connection without responding
+            self.close_connection = True
+            return
+
+        status = FlakyHandler.status if failing else 200
+        body = json.dumps({'errors': []} if failing else {'data': {'id': '1'}}).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+
+        if failing:
+            for header, value in FlakyHandler.headers_to_send.items():
+                self.send_header(header, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = respond
+    do_POST = respond
+
+
+def unused_port():
+    """Find a local port nothing is listening on."""
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestRetryPolicy(BasePCOTestCase):
+    """Test the RetryPolicy class."""
+
+    def test_default(self):
+        """Verify the default policy only retries timeouts, immediately."""
+
+        policy = RetryPolicy()
+
+        self.assertEqual(0, policy.retry_delay('POST', 1, 0, RetryReason.TIMEOUT))
+        self.assertEqual(0, policy.retry_delay('GET', 2, 0, RetryReason.TIMEOUT))
+        self.assertIsNone(policy.retry_delay('GET', 3, 0, RetryReason.TIMEOUT))
+        self.assertIsNone(policy.retry_delay('GET', 1, 0, RetryReason.CONNECTION_ERROR))
+        self.assertIsNone(policy.retry_delay('GET', 1, 0, RetryReason.STATUS, status=503))
+
+    def test_backoff(self):
+        """Verify waits grow exponentially up to max_backoff, with jitter below them."""
+
+        policy = RetryPolicy(max_attempts=10, backoff=1, max_backoff=5, jitter=False)
+
+        self.assertEqual(
+            [1, 2, 4, 5, 5],
+            [policy.retry_delay('GET', attempt, 0, RetryReason.TIMEOUT) for attempt in range(1, 6)]
+        )
+
+        policy.jitter = True
+
+        for attempt in range(1, 6):
+            delay = policy.retry_delay('GET', attempt, 0, RetryReason.TIMEOUT)
+            self.assertTrue(0 <= delay <= min(2 ** (attempt - 1), 5))
+
+    def test_statuses_and_retry_after(self):
+        """Verify retryable statuses are retried, honoring Retry-After."""
+
+        policy = RetryPolicy(backoff=1, jitter=False, retry_statuses=range(500, 600))
+
+        self.assertEqual(1, policy.retry_delay('GET', 1, 0, RetryReason.STATUS, status=502))
+        self.assertEqual(
+            7, policy.retry_delay('GET', 1, 0, RetryReason.STATUS, status=503, retry_after=7)
+        )
+        self.assertIsNone(policy.retry_delay('GET', 1, 0, RetryReason.STATUS, status=404))
+
+    def test_max_elapsed(self):
+        """Verify requests aren't retried past the maximum elapsed time."""
+
+        policy = RetryPolicy(max_attempts=10, backoff=4, jitter=False, max_elapsed=10)
+
+        self.assertEqual(4, policy.retry_delay('GET', 1, 5, RetryReason.TIMEOUT))
+        self.assertIsNone(policy.retry_delay('GET', 1, 7, RetryReason.TIMEOUT))
+
+    def test_idempotency(self):
+        """Verify non-idempotent requests are only retried if they weren't sent."""
+
+        policy = RetryPolicy(
+            retry_connection_errors=True,
+            retry_statuses=RetryPolicy.SERVER_ERRORS,
+            idempotent_methods=RetryPolicy.IDEMPOTENT_METHODS
+        )
+
+        for reason in RetryReason:
+            self.assertIsNone(policy.retry_delay('POST', 1, 0, reason, status=503))
+            self.assertIsNotNone(policy.retry_delay('delete', 1, 0, reason, status=503))
+
+        self.assertIsNotNone(
+            policy.retry_delay('POST', 1, 0, RetryReason.CONNECTION_ERROR, sent=False)
+        )
+
+
+class TestPCORetries(BasePCOTestCase):
+    """Test PCO objects retrying failed requests against a local server."""
+
+    def setUp(self):
+
+        FlakyHandler.failures = 0
+        FlakyHandler.status = 503
+        FlakyHandler.headers_to_send = {}
+        FlakyHandler.requests = []
+
+        self.server = LocalServer(FlakyHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.policy = RetryPolicy(
+            max_attempts=4,
+            backoff=0.01,
+            retry_statuses=RetryPolicy.SERVER_ERRORS,
+            retry_connection_errors=True,
+            idempotent_methods=RetryPolicy.IDEMPOTENT_METHODS,
+        )
+        self.pco = pypco.PCO('app_id', 'secret', api_base=self.server.url,
+                             retry_policy=self.policy)
+
+    def test_server_errors(self):
+        """Verify server errors are retried until the request succeeds."""
+
+        FlakyHandler.failures = 3
+
+        self.assertEqual({'data': {'id': '1'}}, self.pco.get('/people/v2/people/1'))
+        self.assertEqual(4, len(FlakyHandler.requests))
+
+    def test_attempts_exhausted(self):
+        """Verify the last error is raised once the attempts are exhausted."""
+
+        FlakyHandler.failures = 4
+
+        with self.assertRaises(pypco.PCORequestException) as err:
+            self.pco.get('/people/v2/people/1')
+
+        self.assertEqual(503, err.exception.status_code)
+        self.assertEqual(4, len(FlakyHandler.requests))
+
+    def test_retry_after(self):
+        """Verify Retry-After is honored."""
+
+        FlakyHandler.failures = 1
+        FlakyHandler.headers_to_send = {'Retry-After': '2'}
+
+        with patch('pypco.pco.time.sleep') as mock_sleep:
+            self.pco.get('/people/v2/people/1')
+
+        mock_sleep.assert_called_once_with(2)
+
+    def test_non_idempotent(self):
+        """Verify POST requests that reached the server aren't repeated."""
+
+        FlakyHandler.failures = 1
+
+        with self.assertRaises(pypco.PCORequestException):
+            self.pco.post('/people/v2/people', {'data': {}})
+
+        self.assertEqual(['POST'], FlakyHandler.requests)
+
+    def test_dropped_connection(self):
+        """Verify requests whose connection was dropped are retried."""
+
+        FlakyHandler.failures = 2
+        FlakyHandler.status = None
+
+        self.assertEqual({'data': {'id': '1'}}, self.pco.get('/people/v2/people/1'))
+        self.assertEqual(3, len(FlakyHandler.requests))
+
+    def test_connection_refused(self):
+        """Verify requests that couldn't connect are retried, even if not idempotent."""
+
+        pco = pypco.PCO('app_id', 'secret', api_base=f'http://127.0.0.1:{unused_port()}',
+                        retry_policy=self.policy)
+
+        with patch('pypco.pco.PCO._do_request', wraps=pco._do_request) as mock_request:  # pylint: disable=protected-access
+            with self.assertRaises(pypco.PCOUnexpectedRequestException):
+                pco.post('/people/v2/people', {'data': {}})
+
+        self.assertEqual(4, mock_request.call_count)
+
+    def test_default_policy(self):
+        """Verify server errors and connection errors aren't retried by default."""
+
+        pco = pypco.PCO('app_id', 'secret', api_base=self.server.url)
+        FlakyHandler.failures = 1
+
+        with self.assertRaises(pypco.PCORequestException):
+            pco.get('/people/v2/people/1')
+
+        self.assertEqual(1, len(FlakyHandler.requests))
+
+    def test_ssl_error(self):
+        """Verify certificate errors are never retried."""
+
+        with patch('requests.Session.request', side_effect=requests.exceptions.SSLError()) \
+                as mock_request:
+            with self.assertRaises(pypco.PCOUnexpectedRequestException):
+                self.pco.get('/people/v2/people/1')
+
+        self.assertEqual(1, mock_request.call_count)
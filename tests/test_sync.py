@@ -0,0 +1,224 @@
+"""Test incremental synchronization."""
+
+import os
+import tempfile
+from unittest.mock import Mock
+
+from pypco.sync import CheckpointStore, FileCheckpointStore, IncrementalSync, \
+    MemoryCheckpointStore, SyncCheckpoint
+from tests import BasePCOTestCase
+
+
+class FakeCollection:
+    """A stand-in for a PCO collection supporting updated_at filtering and ordering."""
+
+    def __init__(self, count):
+
+        self.records = {
+            str(index): f'2026-01-01T00:{index // 60:02d}:{index % 60:02d}Z'
+            for index in range(count)
+        }
+        self.requests = 0
+        self.clock = 10000
+
+    def touch(self, record_id):
+        """Update a record."""
+
+        self.clock += 1
+        self.records[record_id] = \
+            f'2026-01-0{1 + self.clock // 3600}T{self.clock // 60 % 60:02d}:' \
+            f'{self.clock % 60:02d}:00Z'
+
+    def get(self, url, offset, per_page, order, **params):  # pylint: disable=unused-argument
+        """Stand in for PCO.get()."""
+
+        self.requests += 1
+        self.assert_order = order
+
+        since = params.get('where[updated_at][gte]', '')
+        matching = sorted(
+            (updated_at, int(record_id)) for record_id, updated_at in self.records.items()
+            if updated_at >= since
+        )
+        per_page = min(int(per_page), 100)
+        page = matching[int(offset):int(offset) + per_page]
+
+        return {
+            'data': [
+                {'type': 'Person', 'id': str(record_id), 'attributes': {'updated_at': updated_at}}
+                for updated_at, record_id in page
+            ],
+            'included': [],
+            'meta': {},
+            'links': {'next': url} if int(offset) + per_page < len(matching) else {},
+        }
+
+
+class TestIncrementalSync(BasePCOTestCase):
+    """Test the IncrementalSync class."""
+
+    def setUp(self):
+
+        self.collection = FakeCollection(250)
+        self.pco = Mock()
+        self.pco.api_base = 'https://api.planningcenteronline.com'
+        self.pco.get.side_effect = self.collection.get
+
+        self.handled = []
+        self.sync = IncrementalSync(self.pco)
+
+    def callback(self, record):
+        """Record a handled record."""
+
+        self.handled.append(record['data']['id'])
+
+    def test_initial_and_incremental(self):
+        """Verify syncs only hand over changed records, with requests proportional to churn."""
+
+        self.assertEqual(250, self.sync.run('/people/v2/people', self.callback))
+        self.assertEqual(sorted(self.collection.records), sorted(self.handled))
+        self.assertEqual('updated_at', self.collection.assert_order)
+
+        # Nothing changed: a single request, nothing handed over
+        self.handled = []
+        self.collection.requests = 0
+
+        self.assertEqual(0, self.sync.run('/people/v2/people', self.callback))
+        self.assertEqual([], self.handled)
+        self.assertEqual(1, self.collection.requests)
+
+        # Only changed records are handed over, in updated_at order
+        for record_id in ('17', '3', '200'):
+            self.collection.touch(record_id)
+
+        self.collection.requests = 0
+
+        self.assertEqual(3, self.sync.run('/people/v2/people', self.callback))
+        self.assertEqual(['17', '3', '200'], self.handled)
+        self.assertEqual(1, self.collection.requests)
+
+    def test_capped_per_page(self):
+        """Verify syncs continue to the last page when per_page is capped by the API."""
+
+        self.assertEqual(250, self.sync.run('/people/v2/people', self.callback, per_page=200))
+        self.assertEqual(sorted(self.collection.records), sorted(self.handled))
+
+    def test_empty_response(self):
+        """Verify an empty response ends the sync."""
+
+        self.pco.get.side_effect = None
+        self.pco.get.return_value = None
+
+        self.assertEqual(0, self.sync.run('/people/v2/people', self.callback))
+        self.assertIsNone(self.sync.store.load(self.sync.checkpoint_key('/people/v2/people')))
+
+    def test_checkpoint_per_collection(self):
+        """Verify collections and parameters are checkpointed separately."""
+
+        self.sync.run('/people/v2/people', self.callback)
+        self.handled = []
+
+        self.sync.run('/people/v2/people', self.callback, include='emails')
+        self.assertEqual(250, len(self.handled))
+
+        self.assertNotEqual(
+            self.sync.checkpoint_key('/people/v2/people'),
+            self.sync.checkpoint_key('/people/v2/people', include='emails')
+        )
+        self.assertEqual(
+            self.sync.checkpoint_key('/people/v2/people'),
+            self.sync.checkpoint_key('https://api.planningcenteronline.com/people/v2/people')
+        )
+
+    def test_ties(self):
+        """Verify records sharing an updated_at timestamp are each handed over once."""
+
+        for record_id in self.collection.records:
+            self.collection.records[record_id] = '2026-01-01T00:00:00Z'
+
+        self.sync.run('/people/v2/people', self.callback, per_page=30)
+        self.assertEqual(sorted(self.collection.records), sorted(self.handled))
+
+        self.handled = []
+        self.collection.touch('42')
+
+        self.sync.run('/people/v2/people', self.callback, per_page=30)
+        self.assertEqual(['42'], self.handled)
+
+    def test_resume_after_failure(self):
+        """Verify a sync interrupted by the callback resumes without losing records."""
+
+        def failing_callback(record):
+            if record['data']['id'] == '120':
+                raise RuntimeError('Database unavailable')
+            self.callback(record)
+
+        with self.assertRaises(RuntimeError):
+            self.sync.run('/people/v2/people', failing_callback)
+
+        self.assertEqual([str(index) for index in range(120)], self.handled)
+
+        self.sync.run('/people/v2/people', self.callback)
+        self.assertEqual(sorted(self.collection.records), sorted(self.handled))
+        self.assertEqual(250, len(self.handled))
+
+    def test_updates_during_sync(self):
+        """Verify records updated mid-sync don't cause other records to be skipped."""
+
+        def touching_callback(record):
+            if record['data']['id'] == '10':
+                for record_id in ('1', '2', '3', '4', '5'):
+                    self.collection.touch(record_id)
+            self.callback(record)
+
+        self.sync.run('/people/v2/people', touching_callback, per_page=25)
+
+        self.assertEqual(sorted(self.collection.records), sorted(set(self.handled)))
+
+
+class TestCheckpointStores(BasePCOTestCase):
+    """Test checkpoint storage."""
+
+    def test_memory_store(self):
+        """Verify checkpoints are stored in memory."""
+
+        store = MemoryCheckpointStore()
+
+        self.assertIsNone(store.load('key'))
+
+        store.save('key', SyncCheckpoint('2026-01-01T00:00:00Z', ['1', '2']))
+        self.assertEqual(SyncCheckpoint('2026-01-01T00:00:00Z', ['2', '1']), store.load('key'))
+
+    def test_incomplete_store(self):
+        """Verify stores must implement load() and save()."""
+
+        class IncompleteStore(CheckpointStore):  # pylint: disable=abstract-method
+            """A store without a save() method."""
+
+            def load(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            IncompleteStore()  # pylint: disable=abstract-class-instantiated
+
+    def test_file_store(self):
+        """Verify checkpoints are stored durably and atomically in a file."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoints.json')
+
+            store = FileCheckpointStore(path)
+            self.assertIsNone(store.load('people'))
+
+            store.save('people', SyncCheckpoint('2026-01-01T00:00:00Z', ['1']))
+            store.save('emails', SyncCheckpoint('2026-01-02T00:00:00Z', []))
+
+            other = FileCheckpointStore(path)
+            self.assertEqual(SyncCheckpoint('2026-01-01T00:00:00Z', ['1']), other.load('people'))
+            self.assertEqual(SyncCheckpoint('2026-01-02T00:00:00Z'), other.load('emails'))
+
+            # No temporary files are left behind
+            self.assertEqual(
+                ['checkpoints.json', 'checkpoints.json.lock'],
+                sorted(os.listdir(directory))
+            )
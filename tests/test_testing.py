@@ -0,0 +1,147 @@
+"""Test the fake PCO API server."""
+
+import time
+
+import requests
+
+import pypco
+from pypco.testing import FakePCOServer
+from tests import BasePCOTestCase
+
+
+class TestFakePCOServer(BasePCOTestCase):
+    """Test the FakePCOServer class."""
+
+    def setUp(self):
+
+        self.server = FakePCOServer(records=120).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.pco = pypco.PCO(
+            'app_id', 'secret', api_base=self.server.url, upload_url=self.server.upload_url
+        )
+
+    def test_pagination(self):
+        """Verify collections are paginated with links and meta like PCO."""
+
+        page = self.pco.get('/people/v2/people', per_page=50, offset=100)
+
+        self.assertEqual(20, len(page['data']))
+        self.assertEqual('Person', page['data'][0]['type'])
+        self.assertEqual(120, page['meta']['total_count'])
+        self.assertNotIn('next', page['links'])
+
+        page = self.pco.get('/people/v2/people', per_page=50)
+
+        self.assertEqual({'offset': 50}, page['meta']['next'])
+        self.assertIn('offset=50', page['links']['next'])
+        self.assertEqual({'id': '1', 'type': 'Organization'}, page['meta']['parent'])
+
+        records = list(self.pco.iterate('/people/v2/people', include='emails,addresses'))
+
+        self.assertEqual(120, len(records))
+        self.assertEqual(
+            ['Email', 'Email', 'Address'],
+            [include['type'] for include in records[0]['included']]
+        )
+
+    def test_filters(self):
+        """Verify where[] filters and ordering."""
+
+        page = self.pco.get('/people/v2/people', **{'where[status]': 'inactive', 'order': '-name'})
+
+        self.assertEqual(12, page['meta']['total_count'])
+        self.assertEqual(
+            sorted((person['attributes']['name'] for person in page['data']), reverse=True),
+            [person['attributes']['name'] for person in page['data']]
+        )
+
+        cutoff = self.pco.get('/people/v2/people/100')['data']['attributes']['updated_at']
+        page = self.pco.get(
+            '/people/v2/people', order='updated_at', **{'where[updated_at][gt]': cutoff}
+        )
+        self.assertEqual(
+            [str(number) for number in range(101, 121)], [person['id'] for person in page['data']]
+        )
+
+    def test_records(self):
+        """Verify records can be read, created, updated, and deleted."""
+
+        emails = self.pco.get('/people/v2/people/7/emails')
+        self.assertEqual(['700', '701'], [email['id'] for email in emails['data']])
+
+        person = self.pco.post(
+            '/people/v2/people', self.pco.template('Person', {'first_name': 'Ada'})
+        )['data']
+        self.assertEqual('121', person['id'])
+
+        updated = self.pco.patch(
+            f'/people/v2/people/{person["id"]}', self.pco.template('Person', {'last_name': 'L'})
+        )
+        self.assertEqual(
+            {'Ada', 'L'},
+            {updated['data']['attributes']['first_name'], updated['data']['attributes']['last_name']}
+        )
+
+        self.pco.delete(f'/people/v2/people/{person["id"]}')
+
+        with self.assertRaises(pypco.PCORequestException) as err:
+            self.pco.get(f'/people/v2/people/{person["id"]}')
+
+        self.assertEqual(404, err.exception.status_code)
+
+    def test_upload(self):
+        """Verify files can be uploaded."""
+
+        response = self.pco.upload(b'hello', filename='hello.txt')
+
+        self.assertEqual('File', response['data'][0]['type'])
+        self.assertEqual('hello.txt', response['data'][0]['attributes']['name'])
+
+
+class TestFakePCOServerBehavior(BasePCOTestCase):
+    """Test rate limiting, latency, and error injection."""
+
+    def test_rate_limit(self):
+        """Verify requests over the rate limit get 429 responses with PCO's headers."""
+
+        with FakePCOServer(records=10, rate_limit=3, rate_limit_period=20) as server:
+            url = f'{server.url}/people/v2/people'
+            responses = [requests.get(url, headers={'Authorization': 'a'}) for _ in range(4)]
+
+            self.assertEqual([200, 200, 200, 429], [response.status_code for response in responses])
+            self.assertEqual('3', responses[2].headers['X-PCO-API-Request-Rate-Count'])
+            self.assertEqual('3', responses[2].headers['X-PCO-API-Request-Rate-Limit'])
+            self.assertEqual('20', responses[2].headers['X-PCO-API-Request-Rate-Period'])
+            self.assertLessEqual(int(responses[3].headers['Retry-After']), 20)
+
+            # Other credentials have their own budget
+            self.assertEqual(200, requests.get(url, headers={'Authorization': 'b'}).status_code)
+            self.assertEqual(1, server.rate_limited)
+
+    def test_rate_limiter(self):
+        """Verify a client-side rate limiter keeps clients within the emulated limit."""
+
+        with FakePCOServer(records=10, rate_limit=5, rate_limit_period=1) as server:
+            pco = pypco.PCO('app_id', 'secret', api_base=server.url,
+                            rate_limiter=pypco.RateLimiter())
+
+            for _ in range(12):
+                pco.get('/people/v2/people/1')
+
+            self.assertLessEqual(server.rate_limited, 1)
+            self.assertGreaterEqual(server.requests, 12)
+
+    def test_latency_and_errors(self):
+        """Verify latency and errors are injected."""
+
+        with FakePCOServer(records=10, latency=0.1, error_rate=1.0, error_status=502) as server:
+            start = time.monotonic()
+            response = requests.get(f'{server.url}/people/v2/people')
+
+            self.assertGreaterEqual(time.monotonic() - start, 0.1)
+            self.assertEqual(502, response.status_code)
+            self.assertEqual(1, server.errors)
+
+            server.reset_stats()
+            self.assertEqual(0, server.requests)
@@ -0,0 +1,414 @@
+"""Test streaming multipart file uploads."""
+
+import io
+import json
+import mmap
+import os
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import Mock, patch
+
+import pypco
+from pypco.upload import FileUpload, UploadCache, UploadProgress
+from tests import BasePCOTestCase, LocalServer
+
+
+def parse_multipart(content_type, body):
+    """Extract the headers and content of the single part of a multipart body."""
+
+    boundary = content_type.split('boundary=')[1].encode()
+
+    assert body.startswith(b'--' + boundary + b'\r\n')
+    assert body.endswith(b'\r\n--' + boundary + b'--\r\n')
+
+    part = body[len(boundary) + 4:-(len(boundary) + 8)]
+    head, content = part.split(b'\r\n\r\n', 1)
+
+    return head.decode(), content
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """A stand-in for the PCO upload endpoint that echoes what it received."""
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        """Silence request logging."""
+
+    def read_body(self):
+        """Read the request body, whether it has a Content-Length or is chunked."""
+
+        if 'Content-Length' in self.headers:
+            return self.rfile.read(int(self.headers['Content-Length']))
+
+        chunks = []
+
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            chunk = self.rfile.read(size + 2)[:size]
+
+            if not size:
+                return b''.join(chunks)
+
+            chunks.append(chunk)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Echo the uploaded file's headers and size."""
+
+        chunked = 'Content-Length' not in self.headers
+        head, content = parse_multipart(self.headers['Content-Type'], self.read_body())
+
+        body = json.dumps({
+            'data': [{
+                'type': 'File',
+                'id': 'abc',
+                'attributes': {
+                    'head': head,
+                    'size': len(content),
+                    'content': content.decode('latin-1'),
+                    'chunked': chunked,
+                },
+            }]
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class RecordingFile(io.BytesIO):
+    """A file object recording the largest read."""
+
+    largest_read = 0
+
+    def read(self, size=-1):
+        self.largest_read = max(self.largest_read, size)
+        return super().read(size)
+
+
+class UnseekableFile(io.RawIOBase):
+    """A file object that can't seek, like a pipe."""
+
+    def __init__(self, data):
+
+        super().__init__()
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+    def tell(self):
+        raise OSError('Unseekable')
+
+
+class TestFileUpload(BasePCOTestCase):
+    """Test the FileUpload class."""
+
+    def test_body(self):
+        """Verify the multipart body is produced in chunks no larger than chunk_size."""
+
+        data = os.urandom(100000)
+        source = RecordingFile(data)
+
+        upload = FileUpload(source, filename='photo.jpg', chunk_size=4096)
+        body = upload.body()
+
+        self.assertEqual(upload.size, len(body))
+
+        chunks = list(body)
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+        self.assertEqual(4096, source.largest_read)
+
+        head, content = parse_multipart(upload.headers['Content-Type'], b''.join(chunks))
+        self.assertEqual(data, content)
+        self.assertIn('filename="photo.jpg"', head)
+        self.assertIn('Content-Type: image/jpeg', head)
+
+        # A new body starts again from the beginning (e.g. to retry after a timeout)
+        self.assertEqual(b''.join(chunks), upload.body().read())
+
+    def test_sources(self):
+        """Verify paths, file objects, bytes-like objects, and mmaps can be uploaded."""
+
+        data = b'0123456789' * 1000
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.txt')
+
+            with open(path, 'wb') as file_fh:
+                file_fh.write(data)
+
+            with open(path, 'rb') as file_fh:
+                file_fh.seek(10)
+
+                sources = [
+                    (path, 'notes.txt', data),
+                    (file_fh, 'notes.txt', data[10:]),
+                    (data, 'upload', data),
+                    (bytearray(data), 'upload', data),
+                    (memoryview(data), 'upload', data),
+                    (mmap.mmap(file_fh.fileno(), 0, access=mmap.ACCESS_READ), 'upload', data),
+                ]
+
+                for source, filename, expected in sources:
+                    upload = FileUpload(source, chunk_size=999)
+                    body = upload.body().read()
+
+                    head, content = parse_multipart(upload.headers['Content-Type'], body)
+
+                    self.assertEqual(len(body), upload.size)
+                    self.assertEqual(expected, content)
+                    self.assertIn(f'filename="{filename}"', head)
+
+                    upload.close()
+
+    def test_unknown_size(self):
+        """Verify bodies of unseekable files are produced as an iterator."""
+
+        upload = FileUpload(UnseekableFile(b'abc'))
+
+        self.assertIsNone(upload.size)
+        self.assertNotIsInstance(upload.body(), io.IOBase)
+        self.assertEqual(
+            b'abc',
+            parse_multipart(upload.headers['Content-Type'], b''.join(upload.body()))[1]
+        )
+
+        # Once read, the body can't be produced again
+        with self.assertRaises(pypco.PCOUnexpectedRequestException):
+            upload.body()
+
+    def test_progress(self):
+        """Verify progress is reported as the body is read."""
+
+        reports = []
+
+        upload = FileUpload(b'x' * 10000, progress=reports.append, chunk_size=1000)
+        upload.body().read(4000)
+
+        self.assertEqual(4000, reports[-1].sent)
+        self.assertEqual(upload.size, reports[-1].total)
+
+        progress = UploadProgress(500, 1000, 2.0)
+        self.assertEqual(0.5, progress.fraction)
+        self.assertEqual(250, progress.rate)
+        self.assertIsNone(UploadProgress(500, None, 0).fraction)
+        self.assertEqual(0, UploadProgress(500, None, 0).rate)
+
+
+class TestPCOUpload(BasePCOTestCase):
+    """Test uploading files with the PCO object."""
+
+    def setUp(self):
+
+        self.server = LocalServer(UploadHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.pco = pypco.PCO('app_id', 'secret', upload_url=f'{self.server.url}/v2/files')
+
+    def test_upload_file_object(self):
+        """Verify file objects are streamed with a Content-Length."""
+
+        data = os.urandom(300000)
+        reports = []
+
+        response = self.pco.upload(io.BytesIO(data), filename='song.mp3', progress=reports.append)
+        attributes = response['data'][0]['attributes']
+
+        self.assertEqual(len(data), attributes['size'])
+        self.assertEqual(data, attributes['content'].encode('latin-1'))
+        self.assertFalse(attributes['chunked'])
+        self.assertIn('filename="song.mp3"', attributes['head'])
+
+        self.assertEqual(reports[-1].total, reports[-1].sent)
+        self.assertGreater(len(reports), 1)
+
+    def test_upload_bytes(self):
+        """Verify bytes are uploaded."""
+
+        response = self.pco.upload(b'hello', filename='hello.txt')
+
+        self.assertEqual('hello', response['data'][0]['attributes']['content'])
+
+    def test_upload_unseekable(self):
+        """Verify files of unknown size are uploaded with chunked transfer encoding."""
+
+        response = self.pco.upload(UnseekableFile(b'hello'))
+        attributes = response['data'][0]['attributes']
+
+        self.assertEqual('hello', attributes['content'])
+        self.assertTrue(attributes['chunked'])
+
+    def test_upload_many_missing_file(self):
+        """Verify a file that can't be opened doesn't stop the other uploads."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hello.txt')
+
+            with open(path, 'wb') as upload_fh:
+                upload_fh.write(b'hello')
+
+            files = [os.path.join(directory, 'missing.txt'), path, b'bytes']
+            results = sorted(self.pco.upload_many(files, max_workers=1), key=lambda r: r.index)
+
+        self.assertEqual(3, len(results))
+        self.assertIsInstance(results[0].error, FileNotFoundError)
+        self.assertIsNone(results[0].result)
+        self.assertEqual('hello', results[1].result['data'][0]['attributes']['content'])
+        self.assertEqual('bytes', results[2].result['data'][0]['attributes']['content'])
+
+    def test_retry_unseekable(self):
+        """Verify unseekable files aren't sent again truncated when the upload is retried."""
+
+        RateLimitedUploadHandler.requests = 0
+
+        with LocalServer(RateLimitedUploadHandler) as server:
+            pco = pypco.PCO('app_id', 'secret', upload_url=f'{server.url}/v2/files')
+
+            with self.assertRaises(pypco.PCOUnexpectedRequestException):
+                pco.upload(UnseekableFile(os.urandom(300000)))
+
+            self.assertEqual(1, RateLimitedUploadHandler.requests)
+
+            # Seekable files are sent again in full
+            RateLimitedUploadHandler.requests = 0
+            data = os.urandom(300000)
+            response = pco.upload(io.BytesIO(data))
+
+            self.assertEqual(len(data), response['data'][0]['attributes']['size'])
+            self.assertEqual(2, RateLimitedUploadHandler.requests)
+
+
+class RateLimitedUploadHandler(UploadHandler):
+    """An upload endpoint that rate limits every other request."""
+
+    requests = 0
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Rate limit odd requests, echo even ones."""
+
+        RateLimitedUploadHandler.requests += 1
+
+        if RateLimitedUploadHandler.requests % 2:
+            self.read_body()
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        super().do_POST()
+
+
+class CountingUploadHandler(UploadHandler):
+    """An upload endpoint that counts uploads and responds slowly."""
+
+    uploads = 0
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Count the upload, then echo it."""
+
+        CountingUploadHandler.uploads += 1
+        time.sleep(0.05)
+        super().do_POST()
+
+
+class TestUploadCache(BasePCOTestCase):
+    """Test deduplicating uploads by content hash."""
+
+    def setUp(self):
+
+        CountingUploadHandler.uploads = 0
+
+        self.server = LocalServer(CountingUploadHandler).__enter__()
+        self.addCleanup(self.server.__exit__)
+
+        self.upload_cache = UploadCache(ttl=60)
+        self.pco = pypco.PCO(
+            'app_id',
+            'secret',
+            upload_url=f'{self.server.url}/v2/files',
+            upload_cache=self.upload_cache
+        )
+
+    def test_digest(self):
+        """Verify content hashes don't depend on the kind of source."""
+
+        data = b'abc' * 1000
+        source = io.BytesIO(b'xx' + data)
+        source.seek(2)
+
+        upload = FileUpload(source, chunk_size=100)
+
+        self.assertEqual(FileUpload(data).digest(), upload.digest())
+        self.assertEqual(2, source.tell())
+        self.assertIsNone(FileUpload(UnseekableFile(data)).digest())
+
+    def test_reuse(self):
+        """Verify identical content is only uploaded once within the TTL."""
+
+        first = self.pco.upload(b'same', filename='a.txt')
+        second = self.pco.upload(io.BytesIO(b'same'), filename='a.txt')
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, CountingUploadHandler.uploads)
+        self.assertEqual((1, 1), (self.upload_cache.hits, self.upload_cache.misses))
+
+        # Different content or file names are uploaded
+        self.pco.upload(b'different', filename='a.txt')
+        self.pco.upload(b'same', filename='b.txt')
+        self.assertEqual(3, CountingUploadHandler.uploads)
+
+    def test_expiry(self):
+        """Verify uploads are not reused after the TTL."""
+
+        cache = UploadCache(ttl=60)
+        cache.set('digest', {'data': []})
+        self.assertEqual({'data': []}, cache.get('digest'))
+
+        with patch('pypco.upload.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get('digest'))
+
+        self.assertEqual(0, len(cache))
+
+    def test_max_entries(self):
+        """Verify the oldest uploads are forgotten first."""
+
+        cache = UploadCache(max_entries=2)
+
+        for digest in ('a', 'b', 'c'):
+            cache.set(digest, {'digest': digest})
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual({'digest': 'c'}, cache.get('c'))
+
+    def test_upload_many(self):
+        """Verify files are uploaded concurrently, and duplicates only once."""
+
+        files = [b'one', b'two', b'one', b'three', b'one', b'two']
+
+        start = time.monotonic()
+        results = sorted(self.pco.upload_many(files, max_workers=6), key=lambda r: r.index)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(
+            [file.decode() for file in files],
+            [result.result['data'][0]['attributes']['content'] for result in results]
+        )
+        self.assertEqual(3, CountingUploadHandler.uploads)
+        self.assertLess(elapsed, 6 * 0.05)
+
+    def test_failed_upload_not_cached(self):
+        """Verify failed uploads are retried next time."""
+
+        cache = UploadCache()
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_upload('digest', Mock(side_effect=RuntimeError('Failed')))
+
+        self.assertEqual({'data': []}, cache.get_or_upload('digest', lambda: {'data': []}))
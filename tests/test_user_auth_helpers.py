@@ -334,6 +334,21 @@ class TestGetOAuthRefreshToken(unittest.TestCase):
             timeout=30
         )
 
+    @mock.patch('requests.post', side_effect=mock_oauth_response)
+    def test_refresh_token_session(self, mock_post):
+        """Verify refreshes can be made over a session."""
+
+        session = mock.Mock()
+        session.post.side_effect = mock_oauth_response
+
+        self.assertIn(
+            'access_token',
+            pypco.get_oauth_refresh_token('id', 'secret', 'refresh_good', session=session)
+        )
+
+        session.post.assert_called_once()
+        mock_post.assert_not_called()
+
     @mock.patch('requests.post', side_effect=mock_oauth_response)
     def test_invalid_refresh_token(self, mock_post):
         """Verify refresh fails with invalid token."""
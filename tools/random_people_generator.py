@@ -12,6 +12,8 @@ import os
 import random
 import sys
 
+from concurrent.futures import as_completed
+
 # Not quite sure why we're needing to do this for this import,
 # but it makes the import work.
 sys.path.append('..')
@@ -20,7 +22,7 @@ sys.path.append('.')
 PCO_APP_ID = os.environ['PCO_APP_ID']
 PCO_SECRET = os.environ['PCO_SECRET']
 
-from pypco import PCO #pylint: disable=wrong-import-position
+from pypco import PCO, RateLimiter #pylint: disable=wrong-import-position
 
 def generate_rand_string(length):
     """Generate a random string of the requested length.
@@ -46,43 +48,51 @@ def generate_people(num_people):
 
     Also generates the emails for the random people using the Mailinator service
     (https://www.mailinator.com/)
+
+    Each person's email is created as soon as the person has been created, while
+    the next people are being created.
     """
 
-    pco = PCO(PCO_APP_ID, PCO_SECRET)
-
-    for ndx in range(num_people):
-
-        new_person = PCO.template(
-            'Person',
-            {
-                'first_name': generate_rand_string(6).title(),
-                'last_name': generate_rand_string(8).title(),
-            }
-        )
-
-        person = pco.post(
-            '/people/v2/people',
-            new_person
-        )
-
-        person_id = person['data']['id']
-
-        new_email = PCO.template(
-            'Email',
-            {
-                'address': f'{generate_rand_string(8)}@mailinator.com',
-                'location': 'Home',
-                'primary': True,
-            }
-        )
-
-        pco.post(
-            f'/people/v2/people/{person_id}/emails',
-            new_email
-        )
-
-        sys.stdout.write(f'Created {ndx+1} of {num_people}\r')
-        sys.stdout.flush()
+    pco = PCO(PCO_APP_ID, PCO_SECRET, rate_limiter=RateLimiter())
+
+    emails = []
+
+    with pco.pipeline() as pipeline:
+        for ndx in range(num_people): #pylint: disable=unused-variable
+
+            new_person = PCO.template(
+                'Person',
+                {
+                    'first_name': generate_rand_string(6).title(),
+                    'last_name': generate_rand_string(8).title(),
+                }
+            )
+
+            person = pipeline.post(
+                '/people/v2/people',
+                new_person
+            )
+
+            new_email = PCO.template(
+                'Email',
+                {
+                    'address': f'{generate_rand_string(8)}@mailinator.com',
+                    'location': 'Home',
+                    'primary': True,
+                }
+            )
+
+            emails.append(pipeline.post(
+                '/people/v2/people/{id}/emails',
+                new_email,
+                after=person
+            ))
+
+        for ndx, email in enumerate(as_completed(emails)):
+            email.result()
+
+            sys.stdout.write(f'Created {ndx+1} of {num_people}\r')
+            sys.stdout.flush()
 
     sys.stdout.write('\n')
 